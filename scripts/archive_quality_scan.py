@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Mira — Archive Quality Scan (Batch)
+-----------------------------------
+Bewertet alle Porträts in data/archive/self (oder einen Zeitraum) in einem
+ProcessPool (Größe = verfügbare Kerne):
+
+  - Qualitätskennzahlen wie portrait_quality_gate.py (measure/assess)
+  - Render-Kennzahlen wie tools/eval_render.py (nur wenn cv2 verfügbar)
+
+Ausgabe: data/self/quality_scan.jsonl (eine Zeile pro Bild), optional CSV.
+Inkrementell: Bilder, deren sha256 schon gemessen wurde, werden nicht neu
+dekodiert. ok/notes werden bei jedem Lauf mit den aktuellen THRESHOLDS neu
+berechnet — nach einer Schwellenänderung genügt also ein erneuter Aufruf.
+Zeilen ohne Render-Kennzahlen (z. B. aus einem --no-render-Lauf) werden
+nachgemessen, sobald cv2 verfügbar ist; Zeilen zu gelöschten Dateien entfallen.
+
+Aufruf:
+  python scripts/archive_quality_scan.py [--since YYYY-MM-DD] [--until YYYY-MM-DD]
+                                         [--csv out.csv] [--workers N] [--downscale N]
+"""
+
+from __future__ import annotations
+import os, sys, csv, json, glob, hashlib, argparse, importlib.util
+from pathlib import Path
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+
+from portrait_quality_gate import measure, assess, THRESHOLDS
+
+ARCHIVE_DIR = Path("data/archive/self")
+OUT_JSONL = Path(os.getenv("MIRA_QUALITY_SCAN", "data/self/quality_scan.jsonl"))
+TOOLS_DIR = Path(__file__).resolve().parent.parent / "tools"
+
+def now_iso():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def sha256_file(p: Path) -> str:
+    h = hashlib.sha256()
+    with p.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def image_date(p: Path) -> str:
+    """YYYY-MM-DD aus dem Archivnamen (YYYY-MM-DD_HH.png), sonst aus mtime."""
+    stem = p.stem
+    try:
+        datetime.strptime(stem[:10], "%Y-%m-%d")
+        return stem[:10]
+    except ValueError:
+        return datetime.fromtimestamp(p.stat().st_mtime, timezone.utc).strftime("%Y-%m-%d")
+
+def list_images(since: str | None, until: str | None) -> list[Path]:
+    paths = []
+    for ext in ("*.png", "*.jpg", "*.jpeg", "*.webp"):
+        paths += [Path(p) for p in glob.glob(str(ARCHIVE_DIR / ext))]
+    out = []
+    for p in sorted(set(paths)):
+        if p.is_symlink() or p.stem == "latest":
+            continue
+        d = image_date(p)
+        if (since and d < since) or (until and d > until):
+            continue
+        out.append(p)
+    return out
+
+def load_rows() -> dict[str, dict]:
+    rows = {}
+    try:
+        with OUT_JSONL.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except Exception:
+                    continue
+                if row.get("sha256"):
+                    rows[row["sha256"]] = row
+    except FileNotFoundError:
+        pass
+    return rows
+
+def _render_metrics(path: str):
+    # tools/eval_render.py braucht cv2 + numpy; ohne sie bleibt "render" leer.
+    # evaluate_path nutzt den gemeinsamen eval_cache (sha256 Bild + Schema + Version).
+    try:
+        if str(TOOLS_DIR) not in sys.path:
+            sys.path.insert(0, str(TOOLS_DIR))
+        from eval_render import evaluate_path
+    except Exception:
+        return None
+    metrics, _ = evaluate_path(path, str(TOOLS_DIR / "schema.json"))
+    return metrics
+
+def render_available() -> bool:
+    return all(importlib.util.find_spec(m) is not None for m in ("cv2", "numpy"))
+
+def score_render(path: str, sha: str) -> tuple[str, dict | None]:
+    """Worker: nur die Render-Kennzahlen nachtragen."""
+    return sha, _render_metrics(path)
+
+def score(path: str, sha: str, downscale: int, with_render: bool) -> dict:
+    """Worker: misst ein Bild (läuft im ProcessPool)."""
+    from PIL import Image, ImageOps
+    row = {"image": path, "sha256": sha, "date": image_date(Path(path)), "scanned": now_iso()}
+    try:
+        with Image.open(path) as im:
+            img = ImageOps.exif_transpose(im).convert("RGB")
+        row["metrics"] = measure(img, downscale)
+    except Exception as e:
+        row["metrics"] = {}
+        row["error"] = f"open_error:{type(e).__name__}"
+    row["render"] = _render_metrics(path) if with_render and "error" not in row else None
+    return row
+
+def write_csv(rows: list[dict], path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    keys = ["image", "date", "sha256", "ok", "notes"]
+    m_keys = sorted({k for r in rows for k in (r.get("metrics") or {}) if k != "histogram"})
+    r_keys = sorted({k for r in rows for k in (r.get("render") or {})})
+    with path.open("w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(keys + m_keys + [f"render_{k}" for k in r_keys])
+        for r in rows:
+            m, rm = r.get("metrics") or {}, r.get("render") or {}
+            w.writerow([r.get("image"), r.get("date"), r.get("sha256"), r.get("ok"), ";".join(r.get("notes", []))]
+                       + [m.get(k) for k in m_keys] + [rm.get(k) for k in r_keys])
+
+def main():
+    ap = argparse.ArgumentParser(description="Batch-Qualitätsscan über data/archive/self")
+    ap.add_argument("--since", help="YYYY-MM-DD (inklusive)")
+    ap.add_argument("--until", help="YYYY-MM-DD (inklusive)")
+    ap.add_argument("--csv", type=Path, help="zusätzlich als CSV schreiben")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--downscale", type=int, default=1)
+    ap.add_argument("--no-render", action="store_true", help="eval_render-Kennzahlen überspringen")
+    args = ap.parse_args()
+
+    images = list_images(args.since, args.until)
+    known = load_rows()
+    with_render = not args.no_render and render_available()
+    todo, todo_render = [], []
+    for p in images:
+        sha = sha256_file(p)
+        row = known.get(sha)
+        if row and row.get("metrics") and row.get("metrics", {}).get("downscale", 1) == args.downscale:
+            row["image"] = str(p)  # umbenannt/verschoben → Pfad nachziehen
+            if with_render and not row.get("render") and "error" not in row:
+                todo_render.append((str(p), sha))
+            continue
+        todo.append((str(p), sha))
+
+    print(f"[scan] {len(images)} images, {len(todo)} to score, {len(todo_render)} render-only, "
+          f"{len(images) - len(todo) - len(todo_render)} cached")
+    if todo or todo_render:
+        with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            futures = [pool.submit(score, p, sha, args.downscale, with_render) for p, sha in todo]
+            renders = [pool.submit(score_render, p, sha) for p, sha in todo_render]
+            for fut in futures:
+                row = fut.result()
+                known[row["sha256"]] = row
+            for fut in renders:
+                sha, metrics = fut.result()
+                known[sha]["render"] = metrics
+
+    # Zeilen zu Dateien, die nicht mehr im Archiv liegen, verwerfen
+    gone = [sha for sha, r in known.items() if not Path(r.get("image") or "").is_file()]
+    for sha in gone:
+        del known[sha]
+
+    # ok/notes immer mit aktuellen Schwellen neu bewerten
+    rows = sorted(known.values(), key=lambda r: (r.get("date") or "", r.get("image") or ""))
+    for r in rows:
+        if r.get("metrics"):
+            r["ok"], r["notes"] = assess(r["metrics"])
+        else:
+            r["ok"], r["notes"] = False, [r.get("error", "no_metrics")]
+
+    OUT_JSONL.parent.mkdir(parents=True, exist_ok=True)
+    tmp = OUT_JSONL.with_name(OUT_JSONL.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        for r in rows:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    os.replace(tmp, OUT_JSONL)
+    if args.csv:
+        write_csv(rows, args.csv)
+
+    bad = sum(1 for r in rows if not r["ok"])
+    print(f"[scan] wrote {len(rows)} rows to {OUT_JSONL} ({bad} not ok, {len(gone)} removed; thresholds {json.dumps(THRESHOLDS, ensure_ascii=False)})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
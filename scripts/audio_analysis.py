@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Mira — Audio Analysis (WAV)
+---------------------------
+Kennzahlen für Audio-Manifeste, ohne das Audio auszuliefern oder zu dekodieren:
+
+  duration_s            Dauer in Sekunden
+  rms_dbfs / peak_dbfs  Lautheit (RMS) und Spitzenpegel, dBFS
+  lead_silence_s        Stille am Anfang (unter SILENCE_DBFS)
+  trail_silence_s       Stille am Ende
+  envelope              grobe Hüllkurve: ENVELOPE_BINS Spitzenwerte [0..1]
+                        (genug, damit das Dashboard eine Wellenform zeichnet)
+
+Die WAV-Datei wird per mmap eingeblendet und als NumPy-Sicht gelesen (keine
+Kopie in Python-Bytes). Ohne NumPy gibt es nur Dauer/Format aus dem Header.
+
+Ergebnisse werden nach sha256 der Datei (+ ANALYZER_VERSION) gecacht:
+  <MIRA_CACHE_DIR>/audio/<schlüssel>.json  (Standard: .cache/mira)
+
+Aufruf:
+  python scripts/audio_analysis.py <datei.wav> [...]   # JSON auf stdout
+"""
+
+from __future__ import annotations
+import os, sys, json, mmap, struct, hashlib
+from pathlib import Path
+
+from lazy_import import lazy, available
+
+np = lazy("numpy") if available("numpy") else None  # NumPy optional → nur Header-Werte
+
+# Erhöhen, sobald sich eine Kennzahl ändert (invalidiert den Cache)
+ANALYZER_VERSION = "audio_analysis/1"
+CACHE_DIR = Path(os.getenv("MIRA_CACHE_DIR", ".cache/mira")) / "audio"
+ENVELOPE_BINS = 120
+SILENCE_DBFS = -50.0
+
+def sha256_file(p) -> str:
+    h = hashlib.sha256()
+    with open(p, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _chunks(buf) -> tuple[dict, int, int]:
+    """(fmt, data_offset, data_bytes) aus dem RIFF-Header; Längenfelder von Streams werden gekappt."""
+    if buf[:4] != b"RIFF" or buf[8:12] != b"WAVE":
+        raise ValueError("not a RIFF/WAVE file")
+    pos, fmt = 12, None
+    while pos + 8 <= len(buf):
+        cid, size = buf[pos:pos + 4], struct.unpack_from("<I", buf, pos + 4)[0]
+        if cid == b"fmt ":
+            tag, channels, rate = struct.unpack_from("<HHI", buf, pos + 8)
+            bits = struct.unpack_from("<H", buf, pos + 22)[0]
+            if tag == 0xFFFE and size >= 40:  # WAVE_FORMAT_EXTENSIBLE → Subformat
+                tag = struct.unpack_from("<H", buf, pos + 32)[0]
+            fmt = {"tag": tag, "channels": channels, "rate": rate, "bits": bits}
+        elif cid == b"data" and fmt:
+            avail = len(buf) - pos - 8
+            return fmt, pos + 8, size if 0 < size <= avail else avail
+        pos += 8 + size + (size & 1)
+    raise ValueError("no data chunk")
+
+def _samples(buf, fmt: dict, offset: int, nbytes: int):
+    """NumPy-Sicht [frames × channels] und Vollaussteuerung."""
+    tag, bits, ch = fmt["tag"], fmt["bits"], fmt["channels"]
+    if tag == 3 and bits in (32, 64):
+        dtype, full = (np.float32 if bits == 32 else np.float64), 1.0
+    elif tag == 1 and bits in (8, 16, 32):
+        dtype, full = {8: np.uint8, 16: np.int16, 32: np.int32}[bits], float(2 ** (bits - 1))
+    else:
+        raise ValueError(f"unsupported WAV format tag={tag} bits={bits}")
+    width = bits // 8
+    frames = nbytes // (width * ch)
+    a = np.frombuffer(buf, dtype=dtype, count=frames * ch, offset=offset).reshape(frames, ch)
+    return a, full
+
+def _dbfs(x: float) -> float | None:
+    return round(20.0 * float(np.log10(x)), 2) if x > 0 else None
+
+def analyze_wav(path) -> dict:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        fmt, offset, nbytes = _chunks(mm)
+        frames = nbytes // max(1, fmt["bits"] // 8 * fmt["channels"])
+        out = {
+            "format": "wav", "rate": fmt["rate"], "channels": fmt["channels"], "bits": fmt["bits"],
+            "duration_s": round(frames / float(fmt["rate"] or 1), 3),
+        }
+        if np is None or frames == 0:
+            return out
+        a, full = _samples(mm, fmt, offset, nbytes)
+        if a.dtype == np.uint8:
+            a = a.astype(np.int16) - 128
+        # ein Betrag über alle Kanäle (lautester Kanal je Frame), normiert auf [0..1]
+        mag = np.abs(a.astype(np.float32)).max(axis=1) / full
+        del a
+    peak = float(mag.max())
+    rms = float(np.sqrt(np.mean(np.square(mag, dtype=np.float64))))
+    loud = np.flatnonzero(mag >= 10 ** (SILENCE_DBFS / 20.0))
+    rate = float(fmt["rate"])
+    if loud.size:
+        lead, trail = float(loud[0]) / rate, float(frames - 1 - loud[-1]) / rate
+    else:
+        lead, trail = frames / rate, 0.0
+    bins = min(ENVELOPE_BINS, frames)
+    edges = np.linspace(0, frames, bins + 1).astype(np.int64)
+    env = np.maximum.reduceat(mag, edges[:-1]) if bins else np.zeros(0)
+    out.update({
+        "rms_dbfs": _dbfs(rms),
+        "peak_dbfs": _dbfs(peak),
+        "lead_silence_s": round(lead, 3),
+        "trail_silence_s": round(trail, 3),
+        "envelope": [round(float(v), 3) for v in env],
+    })
+    return out
+
+def analyze(path, sha: str | None = None) -> dict | None:
+    """Gecachte Analyse (Schlüssel: sha256 + ANALYZER_VERSION); None, wenn nicht lesbar."""
+    try:
+        sha = sha or sha256_file(path)
+    except OSError:
+        return None
+    key = hashlib.sha256(f"{sha}:{ANALYZER_VERSION}".encode("utf-8")).hexdigest()
+    p = CACHE_DIR / f"{key}.json"
+    try:
+        with p.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        pass
+    try:
+        result = analyze_wav(path)
+    except (OSError, ValueError):
+        return None
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(p.name + ".tmp")
+        tmp.write_text(json.dumps(result), encoding="utf-8")
+        os.replace(tmp, p)
+    except Exception:
+        pass  # Cache ist optional
+    return result
+
+def main(argv=None):
+    paths = (argv if argv is not None else sys.argv[1:])
+    if not paths:
+        print("Usage: audio_analysis.py <file.wav> [...]", file=sys.stderr)
+        return 2
+    print(json.dumps({p: analyze(p) for p in paths}, ensure_ascii=False, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
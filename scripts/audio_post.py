@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Mira — Audio Post-Processing (Loudness + Encoding-Presets)
+----------------------------------------------------------
+Eine Stufe nach der Synthese: Zwei-Pass-loudnorm (EBU R128) und benannte
+Encoder-Presets, damit alle Skripte dieselbe Lautheit und dieselben
+Größenbudgets liefern statt eigener ffmpeg-Flags.
+
+  web-mp3       -16 LUFS, TP -1.5, MP3 128 kbit/s CBR, 44.1 kHz mono
+  archive-opus  -18 LUFS, TP -1.0, Opus 48 kbit/s VBR (Ogg), 48 kHz mono
+  preview-low   -16 LUFS, TP -1.5, MP3 48 kbit/s CBR, 22.05 kHz mono
+
+Pass 1 (Messung) wird nach sha256 der Eingabe + Zielwerten gecacht:
+  <MIRA_CACHE_DIR>/loudnorm/<schlüssel>.json  (Standard: .cache/mira)
+Ein erneutes Encodieren derselben Eingabe startet nur noch Pass 2. Mehrere
+Presets entstehen in EINEM ffmpeg-Lauf (-af je Ausgabe), atomar per .part.
+
+Aufruf:
+  python scripts/audio_post.py in.wav out.mp3:web-mp3 out.opus:archive-opus
+"""
+
+from __future__ import annotations
+import os, sys, json, hashlib, subprocess
+from pathlib import Path
+
+from audio_analysis import analyze, sha256_file
+
+CACHE_DIR = Path(os.getenv("MIRA_CACHE_DIR", ".cache/mira")) / "loudnorm"
+MEASURE_VERSION = "loudnorm/1"
+
+# name → Zielwerte (I, TP, LRA), ffmpeg-Ausgabeargumente, Budget (kbit/s, +10 % Toleranz)
+PRESETS = {
+    "web-mp3": {
+        "target": {"I": -16.0, "TP": -1.5, "LRA": 11.0},
+        "args": ["-ar", "44100", "-ac", "1", "-codec:a", "libmp3lame", "-b:a", "128k", "-f", "mp3"],
+        "kbps": 128,
+    },
+    "archive-opus": {
+        "target": {"I": -18.0, "TP": -1.0, "LRA": 11.0},
+        "args": ["-ar", "48000", "-ac", "1", "-codec:a", "libopus", "-b:a", "48k", "-vbr", "on", "-f", "ogg"],
+        "kbps": 48,
+    },
+    "preview-low": {
+        "target": {"I": -16.0, "TP": -1.5, "LRA": 11.0},
+        "args": ["-ar", "22050", "-ac", "1", "-codec:a", "libmp3lame", "-b:a", "48k", "-f", "mp3"],
+        "kbps": 48,
+    },
+}
+
+class PostProcessError(RuntimeError):
+    pass
+
+def _target_filter(t: dict) -> str:
+    return f"loudnorm=I={t['I']}:TP={t['TP']}:LRA={t['LRA']}"
+
+def _last_json(text: str) -> dict:
+    """loudnorm schreibt seinen JSON-Block ans Ende von stderr."""
+    start, end = text.rfind("{"), text.rfind("}")
+    if start < 0 or end < start:
+        raise PostProcessError("loudnorm: no measurement in ffmpeg output")
+    return json.loads(text[start:end + 1])
+
+def measure(src, target: dict, sha: str | None = None) -> dict:
+    """Pass 1: input_i/input_tp/input_lra/input_thresh/target_offset (gecacht nach Eingabe + Ziel)."""
+    sha = sha or sha256_file(src)
+    raw = json.dumps({"sha": sha, "target": target, "v": MEASURE_VERSION}, sort_keys=True)
+    p = CACHE_DIR / f"{hashlib.sha256(raw.encode('utf-8')).hexdigest()}.json"
+    try:
+        with p.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        pass
+    cmd = ["ffmpeg", "-hide_banner", "-nostats", "-i", str(src),
+           "-af", _target_filter(target) + ":print_format=json", "-f", "null", "-"]
+    proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if proc.returncode != 0:
+        raise PostProcessError(f"ffmpeg (loudnorm pass 1) exit {proc.returncode}")
+    m = _last_json(proc.stderr)
+    result = {k: m.get(k) for k in ("input_i", "input_tp", "input_lra", "input_thresh", "target_offset")}
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(p.name + ".tmp")
+        tmp.write_text(json.dumps(result), encoding="utf-8")
+        os.replace(tmp, p)
+    except Exception:
+        pass  # Cache ist optional
+    return result
+
+def _normalize_filter(target: dict, m: dict) -> str:
+    try:
+        float(m["input_i"]), float(m["input_thresh"])
+    except (TypeError, ValueError, KeyError):
+        return "anull"  # Stille (-inf): nichts zu normalisieren
+    return (f"{_target_filter(target)}:measured_I={m['input_i']}:measured_TP={m['input_tp']}"
+            f":measured_LRA={m['input_lra']}:measured_thresh={m['input_thresh']}"
+            f":offset={m['target_offset']}:linear=true:print_format=none")
+
+def _part(path: Path) -> Path:
+    return path.with_name(f".{path.name}.part")
+
+def process(src, outputs: dict, sha: str | None = None) -> dict[Path, dict]:
+    """
+    src → {Ziel: Preset-Name}; ein ffmpeg-Lauf für alle Ziele.
+    Liefert je Ziel {"preset", "loudnorm" (Messung), "bytes", "kbps", "over_budget"}.
+    """
+    unknown = sorted({n for n in outputs.values()} - set(PRESETS))
+    if unknown:
+        raise PostProcessError(f"unknown preset(s): {', '.join(unknown)}")
+    sha = sha or sha256_file(src)
+    targets = {Path(d): n for d, n in outputs.items()}
+    measured = {}  # gleiche Zielwerte → eine Messung
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", "-i", str(src)]
+    for dst, name in targets.items():
+        target = PRESETS[name]["target"]
+        key = json.dumps(target, sort_keys=True)
+        if key not in measured:
+            measured[key] = measure(src, target, sha)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        cmd += ["-af", _normalize_filter(target, measured[key]), *PRESETS[name]["args"], str(_part(dst))]
+    if subprocess.run(cmd).returncode != 0:
+        for dst in targets:
+            _part(dst).unlink(missing_ok=True)
+        raise PostProcessError("ffmpeg (loudnorm pass 2) failed")
+
+    # Budget-Prüfung über die Eingabedauer (WAV: audio_analysis, gecacht nach sha256)
+    duration = (analyze(src, sha) or {}).get("duration_s") if str(src).lower().endswith(".wav") else None
+    report = {}
+    for dst, name in targets.items():
+        os.replace(_part(dst), dst)
+        size = dst.stat().st_size
+        kbps = round(size * 8 / 1000 / duration, 1) if duration else None
+        report[dst] = {
+            "preset": name,
+            "loudnorm": measured[json.dumps(PRESETS[name]["target"], sort_keys=True)],
+            "bytes": size, "kbps": kbps,
+            "over_budget": bool(kbps and kbps > PRESETS[name]["kbps"] * 1.1),
+        }
+    return report
+
+def main(argv=None):
+    args = argv if argv is not None else sys.argv[1:]
+    if len(args) < 2 or any(":" not in a for a in args[1:]):
+        print(f"Usage: audio_post.py <input> <out>:<preset> [...]  (presets: {', '.join(PRESETS)})",
+              file=sys.stderr)
+        return 2
+    outputs = dict(a.rsplit(":", 1) for a in args[1:])
+    report = process(args[0], outputs)
+    print(json.dumps({str(k): v for k, v in report.items()}, ensure_ascii=False, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Mira — Audio Store (data/audio)
+-------------------------------
+Hält data/audio klein, während täglich Audio hinzukommt:
+
+  Dedup      gleicher Inhalt (sha256) wie eine bereits vorhandene Datei →
+             die neue Datei entfällt, Verweise zeigen auf die vorhandene
+             (gleicher Text + gleiche Stimme ergibt byte-gleiches Audio)
+  Retention  datierte Rohformate (<YYYY-MM-DD>_*.wav) älter als KEEP_RAW_DAYS
+             werden entfernt, sobald eine komprimierte Fassung (.mp3/.opus/.ogg)
+             derselben Aufnahme existiert; latest.* bleibt unberührt, ebenso
+             Dateien, auf die ein jüngerer Eintrag per Dedup noch verweist
+
+Jede Entscheidung wird als Ereigniszeile in data/audio/manifest.jsonl
+festgehalten ({"event": "dedup" | "prune", ...}), neben den Synthese-Einträgen
+von speak_reflection.py. Bekannte Hashes stammen aus genau diesem Manifest —
+es wird nicht jede Datei neu gehasht.
+
+Aufruf:
+  python scripts/audio_store.py                 # Retention anwenden
+  python scripts/audio_store.py --dry-run       # nur anzeigen
+  python scripts/audio_store.py --keep-days 30
+Umgebung: MIRA_AUDIO_KEEP_RAW_DAYS (Standard 14)
+"""
+
+from __future__ import annotations
+import os, re, sys, json, hashlib, argparse, datetime
+from pathlib import Path
+
+AUDIO_DIR = Path("data/audio")
+MANIFEST  = AUDIO_DIR / "manifest.jsonl"
+KEEP_RAW_DAYS = int(os.getenv("MIRA_AUDIO_KEEP_RAW_DAYS", "14"))
+RAW = (".wav",)
+COMPRESSED = (".mp3", ".opus", ".ogg", ".m4a")
+_DATED = re.compile(r"^(\d{4}-\d{2}-\d{2})_")
+
+def utcnow(): return datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def sha256_hex(p: Path) -> str:
+    h = hashlib.sha256()
+    with p.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def read_manifest(path: Path = MANIFEST):
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except Exception:
+                    continue
+    except FileNotFoundError:
+        return
+
+def record(event: dict, path: Path = MANIFEST) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        f.write(json.dumps({"ts_utc": utcnow(), **event}, ensure_ascii=False) + "\n")
+
+def known_hashes(path: Path = MANIFEST) -> dict[str, Path]:
+    """sha256 → erste noch vorhandene Datei mit diesem Inhalt (aus dem Manifest)."""
+    seen: dict[str, Path] = {}
+    for e in read_manifest(path):
+        files, shas = e.get("files") or {}, e.get("sha256") or {}
+        if not isinstance(files, dict) or not isinstance(shas, dict):
+            continue  # dedup/prune-Ereignisse: sha256 ist ein einzelner Wert
+        for kind, sha in shas.items():
+            f = files.get(kind)
+            if isinstance(sha, str) and f and sha not in seen and Path(f).is_file():
+                seen[sha] = Path(f)
+    return seen
+
+def dedup(path, sha: str | None = None, known: dict[str, Path] | None = None) -> Path:
+    """
+    Vorhandene Datei gleichen Inhalts → path wird entfernt und die vorhandene zurückgegeben;
+    sonst path selbst. Der Treffer wird per Hash nachgeprüft, bevor gelöscht wird.
+    """
+    path = Path(path)
+    sha = sha or sha256_hex(path)
+    known = known_hashes() if known is None else known
+    other = known.get(sha)
+    if other is None or other.resolve() == path.resolve():
+        return path
+    try:
+        if other.stat().st_size != path.stat().st_size or sha256_hex(other) != sha:
+            return path
+    except OSError:
+        return path
+    path.unlink()
+    record({"event": "dedup", "file": str(path), "sha256": sha, "kept": str(other)})
+    return other
+
+def referenced(since: datetime.date, path: Path = MANIFEST) -> set[Path]:
+    """Dateien, auf die Synthese-Einträge ab since verweisen (nach dedup auch ältere Aufnahmen)."""
+    refs: set[Path] = set()
+    for e in read_manifest(path):
+        files = e.get("files") or {}
+        day = str(e.get("date_utc") or e.get("ts_utc") or "")[:10]
+        if not isinstance(files, dict):
+            continue
+        try:
+            if datetime.date.fromisoformat(day) < since:
+                continue
+        except ValueError:
+            continue
+        refs.update(Path(f).resolve() for f in files.values() if isinstance(f, str))
+    return refs
+
+def _compressed_sibling(p: Path) -> Path | None:
+    for ext in COMPRESSED:
+        c = p.with_suffix(ext)
+        if c.is_file() and c.stat().st_size > 0:
+            return c
+    return None
+
+def prune(keep_days: int = KEEP_RAW_DAYS, today: datetime.date | None = None,
+          audio_dir: Path = AUDIO_DIR, dry_run: bool = False) -> list[dict]:
+    """Datierte Rohformate älter als keep_days entfernen, wenn komprimiert vorhanden."""
+    today = today or datetime.datetime.utcnow().date()
+    live = referenced(today - datetime.timedelta(days=keep_days), audio_dir / MANIFEST.name)
+    decisions = []
+    for p in sorted(audio_dir.glob("*")):
+        m = _DATED.match(p.name)
+        if not m or p.suffix.lower() not in RAW or not p.is_file():
+            continue
+        try:
+            age = (today - datetime.date.fromisoformat(m.group(1))).days
+        except ValueError:
+            continue
+        if age <= keep_days:
+            continue
+        kept = _compressed_sibling(p)
+        if kept is None:
+            continue  # einzige Fassung dieser Aufnahme → behalten
+        if p.resolve() in live:
+            continue  # Ziel eines Dedup-Verweises, der selbst noch nicht abgelaufen ist
+        event = {"event": "prune", "file": str(p), "sha256": sha256_hex(p), "bytes": p.stat().st_size,
+                 "age_days": age, "keep_days": keep_days, "kept": str(kept)}
+        if not dry_run:
+            p.unlink()
+            record(event, audio_dir / MANIFEST.name)
+        decisions.append(event)
+    return decisions
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Retention für data/audio (Rohformate → nur komprimiert)")
+    ap.add_argument("--keep-days", type=int, default=KEEP_RAW_DAYS)
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args(argv)
+    decisions = prune(args.keep_days, dry_run=args.dry_run)
+    freed = sum(d["bytes"] for d in decisions)
+    verb = "would prune" if args.dry_run else "pruned"
+    print(f"[audio_store] {verb} {len(decisions)} file(s), {freed / 1e6:.1f} MB (keep raw ≤ {args.keep_days}d)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
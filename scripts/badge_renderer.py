@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Mira — Badge Renderer
+---------------------
+Alle README-Badges aus einem Zustands-Schnappschuss, in einem Aufruf:
+
+  health   badges/health.svg         Status aus badges/health.json
+  archive  badges/archive-count.svg  Anzahl PNGs unter data/archive (rekursiv)
+  quality  badges/quality.svg        ok/notes aus data/self/quality.json
+  voice    badges/voice.svg          Alter von data/voice_of_day.json (date_utc, generate_voice.py)
+
+Textbreiten kommen aus einer Glyphen-Tabelle (DejaVu Sans 11 px,
+badges/glyph_widths.json, pro Prozess einmal geladen) statt aus der
+Faustregel 7 px/Zeichen. Unbekannte Zeichen: Mittelwert der Tabelle.
+Geschrieben wird über svg_template.write_svg — nur bei geänderten Bytes.
+
+Aufruf:
+  python scripts/badge_renderer.py                  # alle Badges
+  python scripts/badge_renderer.py health archive   # Auswahl
+  python scripts/badge_renderer.py --build-glyphs   # Tabelle neu messen (Pillow + DejaVuSans.ttf)
+"""
+
+from __future__ import annotations
+import os, sys, json, glob, argparse
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+
+from svg_template import template, write_svg
+
+GLYPHS = Path(os.getenv("MIRA_BADGE_GLYPHS", "badges/glyph_widths.json"))
+GLYPH_FONT, GLYPH_SIZE = "DejaVuSans.ttf", 11
+PAD = 6            # Innenabstand je Seite und Hälfte (px)
+FALLBACK_W = 7.0   # ohne Tabelle: bisherige Faustregel
+
+COLOR = {
+    "OK":       "#2e7d32",  # green 800
+    "HEALING":  "#f9a825",  # amber 700
+    "DEGRADED": "#c62828",  # red 800
+    "INFO":     "#0288d1",  # light blue 700
+    "UNKNOWN":  "#9e9e9e",  # grey 500
+}
+
+BADGE_SVG = template("""<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="20" role="img" aria-label="{label}: {value}">
+  <title>{label}: {value}</title>
+  <linearGradient id="g" x2="0" y2="100%">
+    <stop offset="0%"  stop-color="#fff" stop-opacity=".7"/>
+    <stop offset="100%" stop-opacity=".7"/>
+  </linearGradient>
+  <mask id="r"><rect width="{width}" height="20" rx="3" fill="#fff"/></mask>
+  <g mask="url(#r)">
+    <rect width="{left_w}" height="20" fill="#555"/>
+    <rect x="{left_w}" width="{right_w}" height="20" fill="{color}"/>
+    <rect width="{width}" height="20" fill="url(#g)"/>
+  </g>
+  <g fill="#fff" text-anchor="middle" font-family="DejaVu Sans,Verdana,Geneva,sans-serif" font-size="11">
+    <text x="{left_mid}" y="14">{label}</text>
+  </g>
+  <g fill="{text_color}" opacity=".9" text-anchor="middle" font-family="DejaVu Sans,Verdana,Geneva,sans-serif" font-size="11">
+    <text x="{right_mid}" y="14">{value}</text>
+  </g>
+</svg>""")
+
+# ---------- Textbreite ----------
+@lru_cache(maxsize=1)
+def glyph_widths() -> dict[str, float]:
+    try:
+        with GLYPHS.open("r", encoding="utf-8") as f:
+            return json.load(f).get("widths", {})
+    except Exception:
+        return {}
+
+def text_width(text: str) -> float:
+    table = glyph_widths()
+    if not table:
+        return FALLBACK_W * len(text)
+    avg = sum(table.values()) / len(table)
+    return sum(table.get(ch, avg) for ch in text)
+
+def build_glyphs() -> int:
+    from PIL import ImageFont
+    font = ImageFont.truetype(GLYPH_FONT, GLYPH_SIZE)
+    chars = [chr(c) for c in range(32, 127)] + list("äöüÄÖÜß·—–…€°")
+    widths = {ch: round(float(font.getlength(ch)), 2) for ch in chars}
+    GLYPHS.parent.mkdir(parents=True, exist_ok=True)
+    with GLYPHS.open("w", encoding="utf-8") as f:
+        json.dump({"font": GLYPH_FONT, "size": GLYPH_SIZE, "widths": widths}, f, ensure_ascii=False, indent=1)
+        f.write("\n")
+    return len(widths)
+
+# ---------- Zustand ----------
+def load_json(path: str, default=None):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return default
+
+def archive_count() -> int:
+    """PNGs unter data/archive (rekursiv) — auch der Commit-Text in archive-badge.yml nutzt diese Zahl."""
+    return len(glob.glob("data/archive/**/*.png", recursive=True))
+
+def snapshot() -> dict:
+    """Alle Badge-Eingaben einmal lesen (ein konsistenter Stand pro Lauf)."""
+    return {
+        "health": load_json("badges/health.json", {}) or {},
+        "archive_count": archive_count(),
+        "quality": load_json("data/self/quality.json", {}) or {},
+        "voice": load_json("data/voice_of_day.json", {}) or {},
+        "today": datetime.now(timezone.utc).date(),
+    }
+
+def health_badge(s: dict):
+    status = str(s["health"].get("status", "DEGRADED")).upper()
+    return "health", status, COLOR.get(status, COLOR["DEGRADED"])
+
+def archive_badge(s: dict):
+    return "archive", str(s["archive_count"]), COLOR["INFO"]
+
+def quality_badge(s: dict):
+    q = s["quality"]
+    if "ok" not in q:
+        return "quality", "unknown", COLOR["UNKNOWN"]
+    if q["ok"]:
+        return "quality", "ok", COLOR["OK"]
+    notes = q.get("notes") or []
+    return "quality", notes[0].replace("_", " ") if len(notes) == 1 else f"{len(notes)} issues", COLOR["HEALING"]
+
+def voice_badge(s: dict):
+    try:
+        day = datetime.strptime(s["voice"]["date_utc"], "%Y-%m-%d").date()
+    except Exception:
+        return "voice", "unknown", COLOR["UNKNOWN"]
+    age = (s["today"] - day).days
+    value = "today" if age <= 0 else f"{age}d ago"
+    color = COLOR["OK"] if age <= 1 else COLOR["HEALING"] if age <= 3 else COLOR["DEGRADED"]
+    return "voice", value, color
+
+# name → (Ausgabedatei, Funktion(snapshot) → (label, value, color))
+BADGES = {
+    "health":  ("badges/health.svg",        health_badge),
+    "archive": ("badges/archive-count.svg", archive_badge),
+    "quality": ("badges/quality.svg",       quality_badge),
+    "voice":   ("badges/voice.svg",         voice_badge),
+}
+
+# ---------- Rendern ----------
+def _text_color(color: str) -> str:
+    r, g, b = (int(color[i:i + 2], 16) for i in (1, 3, 5))
+    return "#000" if 0.299 * r + 0.587 * g + 0.114 * b > 150 else "#fff"
+
+def render_svg(label: str, value: str, color: str) -> str:
+    left_w = round(text_width(label)) + 2 * PAD
+    right_w = round(text_width(value)) + 2 * PAD
+    return BADGE_SVG.render(
+        width=left_w + right_w, left_w=left_w, right_w=right_w,
+        left_mid=left_w / 2, right_mid=left_w + right_w / 2,
+        label=label, value=value, color=color, text_color=_text_color(color),
+    )
+
+def render_all(names=None, state: dict | None = None) -> dict[str, bool]:
+    """Rendert die gewählten (Standard: alle) Badges → {name: neu geschrieben}."""
+    state = state or snapshot()
+    changed = {}
+    for name in names or BADGES:
+        path, fn = BADGES[name]
+        changed[name] = write_svg(path, render_svg(*fn(state)))
+    return changed
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Alle Badges aus einem Zustands-Schnappschuss rendern")
+    ap.add_argument("names", nargs="*", help=f"Auswahl aus {', '.join(BADGES)} (Standard: alle)")
+    ap.add_argument("--build-glyphs", action="store_true", help=f"{GLYPHS} neu messen")
+    args = ap.parse_args(argv)
+    unknown = sorted(set(args.names) - set(BADGES))
+    if unknown:
+        ap.error(f"unknown badge(s): {', '.join(unknown)}")
+
+    if args.build_glyphs:
+        print(f"[badges] measured {build_glyphs()} glyphs → {GLYPHS}")
+        return 0
+    changed = render_all(args.names or None)
+    summary = ", ".join(f"{n}{'' if c else ' (unchanged)'}" for n, c in changed.items())
+    print(f"[badges] {summary}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,7 +5,7 @@ Creative Cycle — Mira Autonomous
 Erzeugt/aktualisiert stündlich:
 - data/voice/voice_of_day.json   (Spruch, Einsicht, Voice-Params, Audio-Pfad)
 - data/self/self-describe.json   (sanfte, affektgekoppelte Drift)
-- docs/daily_poster.svg          (visuelles Tages-Poster)
+- docs/daily_poster.svg          (visuelles Tages-Poster, nur bei Änderung geschrieben)
 - data/self/latest_image.png     (Platzhalter-Porträt, falls fehlt)
 
 Deterministisch-variabel: Seed = YYYYMMDDHH  → reproduzierbar pro Stunde.
@@ -16,6 +16,9 @@ from __future__ import annotations
 import os, json, math, random, hashlib
 from datetime import datetime, timezone
 
+from svg_template import template, write_svg, Raw
+from visemes import load_timeline, sidecar
+
 # ------------------------------------------------------------
 # Pfad-Helfer
 # ------------------------------------------------------------
@@ -151,21 +154,9 @@ def drift_self_describe(prev, aff, voice_params):
 # ------------------------------------------------------------
 # Poster (SVG): affektive Visualisierung
 # ------------------------------------------------------------
-def render_poster_svg(aff, quote):
-    v, a, s = aff["vector"]["valence"], aff["vector"]["arousal"], aff["vector"]["stability"]
-    hue = int(210 + 40*(v-0.5))       # 190..230
-    amp = 14 + int(10*a)              # 14..24
-    op  = 0.22 + 0.3*(1 - s)          # 0.22..0.52
-
-    # einfache Punktreihe als „Wellen“-Metapher
-    circles = []
-    for i in range(1, 16):
-        cx = 60 + i*60
-        cy = 270 + int(amp * math.sin(i/6))
-        r  = 18 + (i % 7)
-        circles.append(f'<circle cx="{cx}" cy="{cy}" r="{r}" fill="hsl({hue},70%,55%)" />')
-
-    svg = f"""<svg xmlns="http://www.w3.org/2000/svg" width="960" height="540">
+# Statische Abschnitte einmal kompiliert (svg_template); pro Lauf werden nur
+# Farbton, Wellenpunkte, Spruch und Affektwerte eingesetzt.
+POSTER_SVG = template("""<svg xmlns="http://www.w3.org/2000/svg" width="960" height="540">
   <defs>
     <linearGradient id="bg" x1="0" y1="0" x2="1" y2="1">
       <stop offset="0%"  stop-color="hsl({hue},70%,10%)"/>
@@ -173,7 +164,7 @@ def render_poster_svg(aff, quote):
     </linearGradient>
   </defs>
   <rect width="100%" height="100%" fill="url(#bg)"/>
-  <g opacity="{op:.2f}">{''.join(circles)}</g>
+  <g opacity="{op:.2f}">{circles}</g>
   <text x="60" y="110" fill="hsl({hue},90%,85%)" style="font:700 28px/1.2 system-ui,Segoe UI,Roboto,Helvetica,Arial">Mira — Stimme des Tages</text>
   <foreignObject x="60" y="150" width="840" height="240">
     <div xmlns="http://www.w3.org/1999/xhtml" style="font:20px/1.45 Georgia,serif;color:#eaeaea;white-space:pre-wrap">
@@ -181,9 +172,25 @@ def render_poster_svg(aff, quote):
     </div>
   </foreignObject>
   <text x="60" y="420" fill="#b7c0ff" style="font:14px system-ui">Affekt · valence={v:.2f} · arousal={a:.2f} · stability={s:.2f}</text>
-  <text x="60" y="448" fill="#9aa3ad" style="font:12px system-ui">UTC {NOW.strftime("%Y-%m-%d %H:%M")}</text>
-</svg>"""
-    return svg
+  <text x="60" y="448" fill="#9aa3ad" style="font:12px system-ui">UTC {stamp}</text>
+</svg>""")
+POSTER_CIRCLE = template('<circle cx="{cx}" cy="{cy}" r="{r}" fill="hsl({hue},70%,55%)" />')
+
+def render_poster_svg(aff, quote):
+    v, a, s = aff["vector"]["valence"], aff["vector"]["arousal"], aff["vector"]["stability"]
+    hue = int(210 + 40*(v-0.5))       # 190..230
+    amp = 14 + int(10*a)              # 14..24
+    op  = 0.22 + 0.3*(1 - s)          # 0.22..0.52
+
+    # einfache Punktreihe als „Wellen“-Metapher
+    circles = "".join(
+        POSTER_CIRCLE.render(cx=60 + i*60, cy=270 + int(amp * math.sin(i/6)), r=18 + (i % 7), hue=hue)
+        for i in range(1, 16)
+    )
+
+    # Stempel auf die Stunde (wie SEED), damit ein zweiter Lauf dieselben Bytes liefert
+    return POSTER_SVG.render(hue=hue, op=op, circles=Raw(circles), quote=quote,
+                             v=v, a=a, s=s, stamp=NOW.strftime("%Y-%m-%d %H:00"))
 
 # ------------------------------------------------------------
 # Platzhalter-Bild (PNG), falls kein aktuelles Selbstbild existiert
@@ -215,6 +222,11 @@ def main():
     aff   = sample_affect()
     quote = poetic_line(aff)
     voice = voice_profile(aff)
+    # generate_voice.py schreibt audio/latest.mp3 + audio/latest.visemes.json
+    audio = P("audio", "latest.mp3")
+    timeline = load_timeline(audio) or []
+    if sidecar(audio).exists() and not timeline:
+        raise SystemExit(f"[creative] Viseme-Sidecar {sidecar(audio)} vorhanden, aber leer/unlesbar")
 
     # 2) voice_of_day.json
     vod = {
@@ -227,7 +239,8 @@ def main():
             "Ich lerne, indem ich mich zeige."
         ]),
         "audio": "audio/latest.mp3",   # TTS-Bridge kann diesen Pfad überschreiben
-        "visemes": [],
+        # Timeline liegt neben dem Audio (visemes.py), sonst leer
+        "visemes": timeline,
         "voice": voice
     }
     write_json(P("data/voice/voice_of_day.json"), vod)
@@ -239,14 +252,13 @@ def main():
 
     # 4) Poster (SVG)
     svg = render_poster_svg(aff, quote)
-    os.makedirs(P("docs"), exist_ok=True)
-    with open(P("docs/daily_poster.svg"), "w", encoding="utf-8") as f:
-        f.write(svg)
+    poster_changed = write_svg(P("docs/daily_poster.svg"), svg)
 
     # 5) Placeholder-Porträt nur sicherstellen, falls keines existiert
     ensure_placeholder_portrait(P("data/self/latest_image.png"))
 
-    print("[creative] updated: voice_of_day.json, self-describe.json, daily_poster.svg (and placeholder portrait if missing)")
+    print("[creative] updated: voice_of_day.json, self-describe.json, "
+          f"daily_poster.svg{'' if poster_changed else ' (unchanged)'} (and placeholder portrait if missing)")
 
 if __name__ == "__main__":
     main()
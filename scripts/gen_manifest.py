@@ -1,14 +1,19 @@
 #!/usr/bin/env python3
-import os, json, hashlib, wave, contextlib, datetime
+import os, json, hashlib, datetime
+
+from audio_analysis import analyze
 
 BASE = os.path.dirname(os.path.dirname(__file__))  # repo root
 
-def sha256_file(p):
+def sha256_hex(p):
     h = hashlib.sha256()
     with open(p, 'rb') as f:
         for chunk in iter(lambda: f.read(8192), b''):
             h.update(chunk)
-    return 'sha256:' + h.hexdigest()
+    return h.hexdigest()
+
+def sha256_file(p):
+    return 'sha256:' + sha256_hex(p)
 
 def first_existing(paths):
     for p in paths:
@@ -41,15 +46,13 @@ if img_path.lower().endswith(('.png', '.jpg', '.jpeg', '.webp')):
     except Exception:
         pass
 
-duration = None
-if aud_path.lower().endswith('.wav'):
-    try:
-        with contextlib.closing(wave.open(os.path.join(BASE, aud_path), 'r')) as wf:
-            frames = wf.getnframes()
-            rate = wf.getframerate()
-            duration = frames / float(rate)
-    except Exception:
-        pass
+# WAV: Dauer, Pegel, Stille und Hüllkurve (audio_analysis, nach sha256 gecacht)
+aud_full = os.path.join(BASE, aud_path)
+aud_sha = sha256_hex(aud_full) if os.path.exists(aud_full) else None
+analysis = None
+if aud_sha and aud_path.lower().endswith('.wav'):
+    analysis = analyze(aud_full, aud_sha)
+duration = analysis.get("duration_s") if analysis else None
 
 manifest = {
     "updated": datetime.datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
@@ -62,7 +65,8 @@ manifest = {
     "audio": {
         "candidates": audio_candidates,
         "duration": duration,
-        "checksum": sha256_file(os.path.join(BASE, aud_path)) if os.path.exists(os.path.join(BASE, aud_path)) else None
+        "checksum": 'sha256:' + aud_sha if aud_sha else None,
+        "analysis": analysis
     }
 }
 
@@ -11,6 +11,8 @@ v2 — now integrates learning.json to adapt visual parameters.
   * viseme_mouth_gain   → Intensität der mimischen Öffnung (über Ausdrucksauswahl)
   * sibilant_bias       → Betonung der Zahnspangen-Glints (S/FV-Bias → Glanzzeile)
 - Sanfte, gebundene Modulation; deterministisch pro Stunde.
+- Kurzschluss: Vertrag + Bild dieser Stunde existieren schon → sofort fertig
+  (vor Eingaben, Prompt und Pillow). MIRA_SELF_IMAGE_FORCE=1 erzwingt Neuerzeugung.
 """
 
 import os, json, math, hashlib, random, datetime, pathlib, textwrap, subprocess
@@ -23,6 +25,7 @@ D_LEDGER = ROOT / "data" / "ledger"
 D_SELF   = ROOT / "data" / "self"
 D_BADGE  = ROOT / "badges"
 D_AUDIO  = ROOT / "audio"
+P_TUNED  = ROOT / os.getenv("MIRA_PROMPT_YAML", "mira/prompt.yaml")   # vom Autotuner gepflegt
 
 D_ARCH.mkdir(parents=True, exist_ok=True)
 D_PROMPT.mkdir(parents=True, exist_ok=True)
@@ -35,6 +38,20 @@ STAMP_H = UTC.strftime("%Y-%m-%d_%H")
 DATE = UTC.strftime("%Y-%m-%d")
 TS = UTC.strftime("%Y-%m-%dT%H:%M:%SZ")
 
+# ---------- Kurzschluss (stündlich) ----------
+# Ein zweiter Lauf in derselben Stunde würde nur Vertrag/Bild neu würfeln
+# (die Entropie enthält Ledger/Health, die der erste Lauf verändert hat).
+if os.getenv("MIRA_SELF_IMAGE_FORCE") != "1" \
+        and (D_PROMPT / f"{STAMP_H}.json").exists() and (D_ARCH / f"{STAMP_H}.png").exists():
+    print(json.dumps({
+        "ok": True,
+        "skipped": "hour_exists",
+        "ts": TS,
+        "contract": f"data/render_prompts/{STAMP_H}.json",
+        "image": f"data/archive/self/{STAMP_H}.png"
+    }, ensure_ascii=False, indent=2))
+    raise SystemExit(0)
+
 # ---------- Helpers ----------
 def jload(p, default=None):
     try:
@@ -60,6 +77,26 @@ def git_entropy():
             pass
     return int(h.hexdigest() or "0", 16)
 
+def tuned_params():
+    """weights/cfg_scale/steps aus der Prompt-YAML (autotune_prompt.py --optimize) oder {}."""
+    try:
+        import yaml
+        text = P_TUNED.read_text(encoding="utf-8")
+        try:
+            y = yaml.safe_load(text)
+        except yaml.YAMLError:
+            # lose Tag-Zeilen (z. B. "!render" am Dateiende) sind kein Parameter
+            y = yaml.safe_load("\n".join(l for l in text.splitlines() if not l.lstrip().startswith("!")))
+    except Exception:
+        return {}
+    if not isinstance(y, dict):
+        return {}
+    return {
+        "weights": {k: v for k, v in (y.get("weights") or {}).items() if isinstance(v, (int, float))},
+        "cfg_scale": y.get("cfg_scale"),
+        "steps": y.get("steps"),
+    }
+
 def clamp(x, a, b): 
     return a if x < a else b if x > b else x
 
@@ -91,6 +128,10 @@ sibil_bias   = float(W.get("sibilant_bias", 0.15))
 expo_gain    = float(W.get("exposure_affect_gain", 1.0))
 contr_gain   = float(W.get("contrast_affect_gain", 1.0))
 
+# Render-Parameter des Autotuners: im Vertrag festgehalten, damit der
+# Batch-Optimierer Kennzahlen auf die hard_bounds-Parameter zurückführen kann
+tuned = tuned_params()
+
 # ---------- Seed (stündlich, deterministisch) ----------
 seed = (int(UTC.strftime("%Y%m%d%H")) ^ git_entropy()) & ((1<<53)-1)
 random.seed(seed)
@@ -201,6 +242,8 @@ params = {
         "stability": round(stab,3),
         "focus": focus
     },
+    "prompt_weights": tuned.get("weights") or {},
+    "sampler": {"cfg_scale": tuned.get("cfg_scale"), "steps": tuned.get("steps")},
     "learning_weights": {
         "viseme_mouth_gain": round(mouth_gain,4),
         "sibilant_bias": round(sibil_bias,4)
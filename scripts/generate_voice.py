@@ -5,18 +5,31 @@ Mira — Autonomous Voice Composer
 Erzeugt:
   - data/voice_of_day.json  (Zitat, IPA-Hinweis, Datum)
   - audio/latest.mp3        (gesprochener Tagesspruch, DE-Stimme)
+  - audio/daily_quote.wav   (daily_quote aus data/self/status.json, falls vorhanden)
+  - audio/<name>.visemes.json  (Viseme-Timeline je Audio, aus derselben espeak-Synthese)
   - data/voice/history.log  (Append-only Chronik)
 
 Technik:
   - Liest affect-state.json + learning.json
   - Wählt Tonlage & Tempo passend zu Valenz/Erregung/Stabilität
-  - Nutzt espeak-ng (deutsch) + ffmpeg zur MP3-Erzeugung
-    (auf GitHub Actions via apt install verfügbar)
+  - Nutzt espeak-ng (deutsch) + ffmpeg, per Pipe verbunden (tts_backend.py;
+    auf GitHub Actions via apt install verfügbar)
+  - audio/latest.mp3 über audio_post.py (Preset web-mp3): Synthese als WAV,
+    dann Zwei-Pass-loudnorm wie speak_reflection.py (Messung gecacht)
 
 Idempotent pro Tag (Seed = YYYY-MM-DD + Affect-Signatur).
+Synthese-Cache (tts_cache.py): gleicher Text + gleiche Stimm-/Encoder-Parameter
+→ audio/latest.mp3 wird aus dem Cache verlinkt, ohne espeak-ng/ffmpeg zu starten.
+Die Phoneme (espeak-ng -x) liegen mit im Cache-Eintrag; die Viseme-Timeline
+(visemes.py) wird daraus abgeleitet, auch bei Treffern ohne neue Synthese.
 """
 
-import os, json, hashlib, random, datetime, subprocess, shlex, pathlib, re
+import os, json, hashlib, random, datetime, pathlib, re
+import tts_cache
+import visemes
+from audio_analysis import analyze
+from audio_post import process, PRESETS, MEASURE_VERSION
+from tts_backend import synthesize, synthesize_batch, TTSJob, WAV_PCM, WAV_44K
 
 ROOT = pathlib.Path(".").resolve()
 P_AFFECT = ROOT / "data" / "self" / "affect-state.json"
@@ -25,6 +38,8 @@ P_VJSON  = ROOT / "data" / "voice_of_day.json"
 P_META   = ROOT / "data" / "voice" / "meta.json"
 P_VLOG   = ROOT / "data" / "voice" / "history.log"
 P_AUDIO  = ROOT / "audio" / "latest.mp3"
+P_DAILY_WAV = ROOT / "audio" / "daily_quote.wav"
+P_STATUS = ROOT / "data" / "self" / "status.json"
 P_AUDIO.parent.mkdir(parents=True, exist_ok=True)
 P_VLOG.parent.mkdir(parents=True, exist_ok=True)
 
@@ -105,25 +120,78 @@ gap = 8 + int(6*(sta-0.5))  # ms
 # Dezente Sibilanten-Glints (nur Textmarker, kein echtes Phonem-Tuning)
 quote_tts = quote
 
-# TTS erzeugen (WAV → MP3)
-wav_tmp = ROOT / "audio" / "latest.wav"
-try:
-    # espeak-ng deutsch: de (oder de+f3 für weiblicheren Klang)
-    voice = "de+f3"
-    cmd_es = f'espeak-ng -v {voice} -s {wpm} -p {pitch} -g {gap} --stdout {shlex.quote(quote_tts)}'
-    # WAV schreiben
-    with open(wav_tmp, "wb") as out:
-        proc = subprocess.run(shlex.split(cmd_es), check=True, stdout=subprocess.PIPE)
-        out.write(proc.stdout)
-    # WAV -> MP3
-    cmd_ff = f'ffmpeg -y -loglevel error -i {shlex.quote(str(wav_tmp))} -vn -ar 44100 -ac 1 -b:a 128k {shlex.quote(str(P_AUDIO))}'
-    subprocess.run(shlex.split(cmd_ff), check=True)
-except Exception as e:
-    # Wenn TTS scheitert, MP3 bleibt ggf. vom Workflow-Fallback erhalten.
-    pass
-finally:
-    try: wav_tmp.unlink()
-    except Exception: pass
+# TTS erzeugen, über den Synthese-Cache
+# espeak-ng deutsch: de (oder de+f3 für weiblicheren Klang)
+voice = "de+f3"
+
+# Äußerungen dieses Zyklus: (name, text, ziel, datei im cache-eintrag, ffmpeg-args, audio_post-preset)
+# Mit Preset: Synthese als RAW_WAV in den Cache-Eintrag, dann audio_post.process → datei
+status_quote = str((jload(P_STATUS, {}) or {}).get("daily_quote") or "").strip()
+UTTERANCES = [("voice", quote_tts, P_AUDIO, "voice.mp3", WAV_PCM, "web-mp3")]
+if status_quote:
+    UTTERANCES.append(("daily_quote", status_quote, P_DAILY_WAV, "voice.wav", WAV_44K, None))
+
+PHONEMES = "phonemes.txt"  # espeak-ng -x, im Cache-Eintrag neben dem Audio
+RAW_WAV  = "raw.wav"       # Syntheseausgabe vor audio_post (bleibt im Eintrag: exakte Dauer)
+
+def write_visemes(key, dst):
+    """Timeline aus den Phonemen des Eintrags → <dst>.visemes.json; WAV liefert die exakte Dauer."""
+    phon = tts_cache.entry_dir(key) / PHONEMES
+    raw = tts_cache.entry_dir(key) / RAW_WAV
+    wav = raw if raw.exists() else (dst if dst.suffix == ".wav" else None)
+    a = analyze(wav) if wav else None
+    tl = visemes.timeline(phon.read_text(encoding="utf-8"), wpm, gap,
+                          (a or {}).get("duration_s"),
+                          (a or {}).get("lead_silence_s", 0.0), (a or {}).get("trail_silence_s", 0.0))
+    visemes.write_timeline(visemes.sidecar(dst), tl)
+
+prev_keys = (jload(P_VJSON, {}) or {}).get("tts_keys") or {}
+tts_keys, tts_status, pending = {}, {}, []
+for name, text, dst, fname, args, post in UTTERANCES:
+    # Cache-Schlüssel folgt den tatsächlichen ffmpeg-Ausgabeargumenten (+ Preset, falls nachbearbeitet)
+    enc = {"ffmpeg": args}
+    if post:
+        enc["post"] = {"preset": post, **PRESETS[post], "v": MEASURE_VERSION}
+    key = tts_cache.synth_key(text, voice, wpm, pitch, gap, enc)
+    tts_keys[name] = key
+    if (prev_keys.get(name) == key and dst.exists() and dst.stat().st_size > 0
+            and visemes.sidecar(dst).exists()):
+        # letzter Lauf hat genau diese Aufnahme erzeugt (auch ohne Cache-Verzeichnis)
+        tts_status[name] = "unchanged"
+    elif (hit := tts_cache.lookup(key, fname, PHONEMES)):
+        tts_cache.link(hit[fname], dst)
+        write_visemes(key, dst)
+        tts_status[name] = "hit"
+    else:
+        pending.append((name, text, dst, fname, args, post, key, enc))
+
+if pending:
+    try:
+        # direkt in die Cache-Einträge: eine Äußerung streamt (espeak-ng | ffmpeg),
+        # mehrere teilen sich einen espeak-Pool und einen ffmpeg-Lauf
+        jobs = [TTSJob(text, {tts_cache.entry_dir(key) / (RAW_WAV if post else fname): args},
+                       voice, wpm, pitch, gap, phonemes=tts_cache.entry_dir(key) / PHONEMES)
+                for _, text, _, fname, args, post, key, _ in pending]
+        if len(jobs) == 1:
+            synthesize(jobs[0].text, jobs[0].outputs, voice=voice, wpm=wpm, pitch=pitch, gap=gap,
+                       phonemes=jobs[0].phonemes)
+        else:
+            synthesize_batch(jobs)
+        for name, text, dst, fname, args, post, key, enc in pending:
+            report = None
+            if post:
+                # loudnorm + Preset wie speak_reflection.py (Pass 1 gecacht nach WAV-Inhalt)
+                entry = tts_cache.entry_dir(key)
+                report = process(entry / RAW_WAV, {entry / fname: post})[entry / fname]
+            tts_cache.store(key, {}, {"text": text, "voice": voice, "wpm": wpm, "pitch": pitch,
+                                      "gap": gap, "encoder": enc, "post": report, "ts": TS})
+            tts_cache.link(tts_cache.entry_dir(key) / fname, dst)
+            write_visemes(key, dst)
+            tts_status[name] = "miss"
+    except Exception as e:
+        # Wenn TTS scheitert, bleiben die Dateien ggf. vom Workflow-Fallback erhalten.
+        for name, *_ in pending:
+            tts_keys[name], tts_status[name] = None, "failed"
 
 # JSON + History persistieren
 vjson = {
@@ -141,7 +209,10 @@ vjson = {
         "label": lab, "valence": round(val,3), "arousal": round(aro,3), "stability": round(sta,3),
         "focus": focus
     },
-    "audio": "audio/latest.mp3"
+    "audio": "audio/latest.mp3",
+    "audio_preset": "web-mp3",
+    "visemes": visemes.load_timeline(P_AUDIO) or [],
+    "tts_keys": tts_keys
 }
 with open(P_VJSON, "w", encoding="utf-8") as f:
     json.dump(vjson, f, ensure_ascii=False, indent=2)
@@ -149,4 +220,5 @@ with open(P_VJSON, "w", encoding="utf-8") as f:
 with open(P_VLOG, "a", encoding="utf-8") as f:
     f.write(json.dumps({"ts":TS, "quote":quote, "audio":"audio/latest.mp3"}, ensure_ascii=False) + "\n")
 
-print(json.dumps({"ok": True, "audio": "audio/latest.mp3", "voice_of_day": "data/voice_of_day.json"}, ensure_ascii=False))
+print(json.dumps({"ok": True, "audio": "audio/latest.mp3", "voice_of_day": "data/voice_of_day.json",
+                  "tts_cache": tts_status}, ensure_ascii=False))
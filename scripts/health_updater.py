@@ -6,13 +6,15 @@ Health Updater
 - Liest Repository-Zustand
 - Leitet Status OK / HEALING / DEGRADED ab
 - Schreibt badges/health.json
-- Rendert badges/health.svg (minimaler, libfreier Badge)
+- Rendert badges/health.svg und die übrigen Badges (badge_renderer.py, nur bei Änderung geschrieben)
 """
 
 from __future__ import annotations
 import json, os, time
 from datetime import datetime, timezone
 
+from badge_renderer import render_all
+
 # ---- Konfiguration ----------------------------------------------------------
 CHECKS = {
     # Datei -> (ist_erforderlich, min_bytes)
@@ -23,14 +25,6 @@ CHECKS = {
 }
 LEDGER = "data/ledger/events.jsonl"
 HEALTH_JSON = "badges/health.json"
-HEALTH_SVG  = "badges/health.svg"
-
-# Statusfarben für SVG (rechts)
-COLOR = {
-    "OK":       "#2e7d32",  # green 800
-    "HEALING":  "#f9a825",  # amber 700
-    "DEGRADED": "#c62828",  # red 800
-}
 
 # ---- Hilfen -----------------------------------------------------------------
 def utc_now_iso() -> str:
@@ -93,40 +87,12 @@ def write_json(status: str):
         json.dump(data, f, ensure_ascii=False)
     return data
 
-def render_badge(status: str):
-    left_text  = "health"
-    right_text = status
-    left_w     = 60
-    right_w    = 54 if len(right_text) < 6 else 7 * len(right_text) + 10
-    width      = left_w + right_w
-    color_right = COLOR.get(status, COLOR["DEGRADED"])
-    svg = f"""<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="20" role="img" aria-label="{left_text}: {right_text}">
-  <linearGradient id="g" x2="0" y2="100%">
-    <stop offset="0%"  stop-color="#fff" stop-opacity=".7"/>
-    <stop offset="100%" stop-opacity=".7"/>
-  </linearGradient>
-  <mask id="r"><rect width="{width}" height="20" rx="3" fill="#fff"/></mask>
-  <g mask="url(#r)">
-    <rect width="{left_w}" height="20" fill="#555"/>
-    <rect x="{left_w}" width="{right_w}" height="20" fill="{color_right}"/>
-    <rect width="{width}" height="20" fill="url(#g)"/>
-  </g>
-  <g fill="#fff" text-anchor="middle" font-family="DejaVu Sans,Verdana,Geneva,sans-serif" font-size="11">
-    <text x="{left_w/2}" y="14">{left_text}</text>
-  </g>
-  <g fill="#000" opacity=".9" text-anchor="middle" font-family="DejaVu Sans,Verdana,Geneva,sans-serif" font-size="11">
-    <text x="{left_w + right_w/2}" y="14">{right_text}</text>
-  </g>
-</svg>"""
-    os.makedirs(os.path.dirname(HEALTH_SVG), exist_ok=True)
-    with open(HEALTH_SVG, "w", encoding="utf-8") as f:
-        f.write(svg)
-
 def main():
     status = decide_status()
     data = write_json(status)
-    render_badge(status)
-    print(f"[health] status={data['status']} ts={data['ts']}")
+    # alle Badges aus demselben Stand (health.json ist gerade geschrieben)
+    changed = render_all()
+    print(f"[health] status={data['status']} ts={data['ts']} badges_changed={sorted(n for n, c in changed.items() if c)}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Mira — Image Metrics Kernel
+---------------------------
+Vektorisierte Bildkennzahlen für portrait_quality_gate.py (und Batch-Scans).
+
+Ein Durchlauf über eine NumPy-Sicht des Luma-Bildes (einmal konvertiert):
+  - mean_brightness   : Mittelwert [0..1]
+  - contrast_spread   : Standardabweichung [0..1]
+  - sharpness         : Kanten-Energie-Proxy wie bisher (FIND_EDGES, 0.6*std + 0.4*mean)
+  - laplacian_var     : Varianz des 4er-Laplace (klassische Schärfeschätzung)
+  - clipped_highlights: Anteil Pixel >= 250
+  - clipped_shadows   : Anteil Pixel <= 5
+  - histogram         : 16 Bins, normiert auf Summe 1
+
+downscale > 1 verkleinert vorab (schneller Vorab-Check); Schärfewerte sind
+dann nicht direkt mit Vollauflösung vergleichbar.
+"""
+
+from __future__ import annotations
+from lazy_import import lazy, available
+
+Image = lazy("PIL.Image")
+ImageFilter = lazy("PIL.ImageFilter")
+ImageStat = lazy("PIL.ImageStat")
+np = lazy("numpy") if available("numpy") else None  # NumPy optional → PIL-Fallback
+
+HIST_BINS = 16
+CLIP_HI, CLIP_LO = 250, 5
+
+def to_luma(img: Image.Image, downscale: int = 1) -> Image.Image:
+    lum = img.convert("L")
+    if downscale and downscale > 1:
+        w, h = lum.size
+        lum = lum.reduce(int(downscale)) if min(w, h) >= downscale else lum
+    return lum
+
+def _metrics_numpy(lum: Image.Image) -> dict:
+    a = np.asarray(lum)
+    # Mittelwert/Streuung direkt aus dem Histogramm (kein Float-Vollbild nötig)
+    counts = np.bincount(a.ravel(), minlength=256)
+    total = float(a.size) or 1.0
+    levels = np.arange(256, dtype=np.float64)
+    mean = float((counts * levels).sum() / total)
+    var = float((counts * (levels - mean) ** 2).sum() / total)
+    hist = counts.reshape(HIST_BINS, -1).sum(axis=1) / total
+
+    # FIND_EDGES-Kern (8*c - Summe der 8 Nachbarn), auf [0..255] begrenzt wie PIL
+    i = a.astype(np.int16)
+    c = i[1:-1, 1:-1]
+    n4 = i[:-2, 1:-1] + i[2:, 1:-1] + i[1:-1, :-2] + i[1:-1, 2:]
+    diag = i[:-2, :-2] + i[:-2, 2:] + i[2:, :-2] + i[2:, 2:]
+    edges = np.clip(8 * c - n4 - diag, 0, 255)
+    lap = n4 - 4 * c
+
+    if edges.size:
+        e_counts = np.bincount(edges.ravel(), minlength=256)
+        e_mean = float((e_counts * levels).sum() / edges.size)
+        e_std = float(np.sqrt((e_counts * (levels - e_mean) ** 2).sum() / edges.size))
+        sharp = 0.6 * e_std / 255.0 + 0.4 * e_mean / 255.0
+        lap_var = float(lap.var(dtype=np.float64))
+    else:
+        sharp, lap_var = 0.0, 0.0
+
+    return {
+        "mean_brightness": mean / 255.0,
+        "contrast_spread": float(np.sqrt(var)) / 255.0,
+        "sharpness": float(sharp),
+        "laplacian_var": lap_var,
+        "clipped_highlights": float(counts[CLIP_HI:].sum() / total),
+        "clipped_shadows": float(counts[:CLIP_LO + 1].sum() / total),
+        "histogram": [round(float(x), 4) for x in hist],
+    }
+
+def _metrics_pil(lum: Image.Image) -> dict:
+    stat = ImageStat.Stat(lum)
+    edge = ImageStat.Stat(lum.filter(ImageFilter.FIND_EDGES))
+    counts = lum.histogram()
+    total = float(sum(counts)) or 1.0
+    step = 256 // HIST_BINS
+    return {
+        "mean_brightness": float((stat.mean[0] or 0.0) / 255.0),
+        "contrast_spread": float((stat.stddev[0] or 0.0) / 255.0),
+        "sharpness": float(0.6 * edge.stddev[0] / 255.0 + 0.4 * edge.mean[0] / 255.0),
+        "laplacian_var": None,
+        "clipped_highlights": float(sum(counts[CLIP_HI:]) / total),
+        "clipped_shadows": float(sum(counts[:CLIP_LO + 1]) / total),
+        "histogram": [round(sum(counts[i:i + step]) / total, 4) for i in range(0, 256, step)],
+    }
+
+def compute_metrics(img: Image.Image, downscale: int = 1) -> dict:
+    """Alle Kennzahlen aus einem Luma-Durchlauf; img beliebiger Modus."""
+    lum = to_luma(img, downscale)
+    m = _metrics_numpy(lum) if np is not None else _metrics_pil(lum)
+    m["downscale"] = int(downscale or 1)
+    return m
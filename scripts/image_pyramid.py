@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Mira — Responsive Image Pyramid
+-------------------------------
+Erzeugt für jedes Site-Porträt eine Größenleiter (Standard 256/512/780/1024 px
+Breite) in WEBP und JPEG, damit Seite und Dashboard die passende Größe laden
+statt der Vollbilder (~200 KB PNG).
+
+Quellen (Standard, per MIRA_PYRAMID_SOURCES überschreibbar, ":"-getrennt):
+  - data/self/latest_image.png
+  - data/self/mira-titelbild.jpg
+  - docs/portrait/mira-hero.jpg
+
+Ausgaben:
+  - data/self/pyramid/<name>/<name>-<w>.(webp|jpg)
+  - data/self/pyramid/manifest.json  : { sources: { <pfad>: { sha256, size, variants: [...] } } }
+
+Idempotent: neu erzeugt wird nur, wenn sich die Quell-Checksumme ändert
+(oder eine Ableitung fehlt). Nie hochskaliert.
+"""
+
+from __future__ import annotations
+import io, os, json, hashlib
+from pathlib import Path
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from lazy_import import lazy
+
+Image = lazy("PIL.Image")
+ImageOps = lazy("PIL.ImageOps")
+
+from portrait_encoder import write_if_changed
+
+OUT_DIR  = Path(os.getenv("MIRA_PYRAMID_DIR", "data/self/pyramid"))
+MANIFEST = OUT_DIR / "manifest.json"
+SOURCES  = [Path(p) for p in os.getenv(
+    "MIRA_PYRAMID_SOURCES",
+    "data/self/latest_image.png:data/self/mira-titelbild.jpg:docs/portrait/mira-hero.jpg"
+).split(":") if p]
+WIDTHS = [int(w) for w in os.getenv("MIRA_PYRAMID_WIDTHS", "256,512,780,1024").split(",") if w.strip()]
+
+FORMATS = {
+    "webp": {"format": "WEBP", "params": {"quality": 82, "method": 5}},
+    "jpg":  {"format": "JPEG", "params": {"quality": 85, "optimize": True, "progressive": True}},
+}
+
+def now_iso():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def sha256_bytes(b: bytes) -> str:
+    return hashlib.sha256(b).hexdigest()
+
+def load_json(p: Path):
+    try:
+        with p.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def ladder(src_w: int) -> list[int]:
+    """Zielbreiten ohne Hochskalieren; Quellen schmaler als die kleinste Stufe behalten ihre Breite."""
+    widths = sorted({w for w in WIDTHS if w <= src_w})
+    return widths or [src_w]
+
+def encode(img: Image.Image, width: int, ext: str) -> tuple[int, bytes]:
+    w, h = img.size
+    if width < w:
+        img = img.resize((width, max(1, round(h * width / w))), Image.LANCZOS)
+    spec = FORMATS[ext]
+    buf = io.BytesIO()
+    img.save(buf, format=spec["format"], **spec["params"])
+    return img.size[1], buf.getvalue()
+
+def variants_present(entry: dict) -> bool:
+    return all(Path(v["path"]).exists() for v in entry.get("variants", []))
+
+def build(src: Path, src_sha: str) -> dict:
+    img = ImageOps.exif_transpose(Image.open(src)).convert("RGB")
+    img.load()
+    name = src.stem
+    jobs = [(w, ext) for w in ladder(img.size[0]) for ext in FORMATS]
+    with ThreadPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as pool:
+        results = list(pool.map(lambda j: encode(img, *j), jobs))
+
+    variants = []
+    for (w, ext), (h, data) in zip(jobs, results):
+        out = OUT_DIR / name / f"{name}-{w}.{ext}"
+        write_if_changed(out, data)
+        variants.append({
+            "width": w, "height": h, "format": ext,
+            "path": str(out), "bytes": len(data), "sha256": sha256_bytes(data)
+        })
+    return {
+        "sha256": src_sha,
+        "size": list(img.size),
+        "updated": now_iso(),
+        "variants": variants
+    }
+
+def main():
+    manifest = load_json(MANIFEST) or {}
+    entries = manifest.get("sources", {})
+    changed = False
+
+    for src in SOURCES:
+        if not src.exists():
+            continue
+        src_sha = sha256_bytes(src.read_bytes())
+        prev = entries.get(str(src))
+        if prev and prev.get("sha256") == src_sha and variants_present(prev):
+            print(f"[pyramid] up-to-date: {src}")
+            continue
+        try:
+            entries[str(src)] = build(src, src_sha)
+        except Exception as e:
+            print(f"[pyramid] skip {src}: {type(e).__name__}: {e}")
+            continue
+        changed = True
+        print(f"[pyramid] built {len(entries[str(src)]['variants'])} variants for {src}")
+
+    if changed:
+        manifest = {"ts": now_iso(), "widths": WIDTHS, "sources": entries}
+        write_if_changed(MANIFEST, (json.dumps(manifest, ensure_ascii=False, indent=2) + "\n").encode("utf-8"))
+
+if __name__ == "__main__":
+    main()
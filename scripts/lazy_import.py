@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Mira — Lazy Imports
+-------------------
+Verzögert schwere Module (PIL, NumPy, PyGithub) bis zum ersten Attributzugriff.
+
+Die meisten Workflow-Läufe enden in einem Kurzschluss („Eingaben unverändert“),
+der nur JSON liest und sha256 rechnet. Mit
+
+    Image = lazy("PIL.Image")
+    np = lazy("numpy") if available("numpy") else None
+
+kostet ein solcher Lauf keinen Import mehr; erst `Image.open(...)` lädt PIL.
+`available()` fragt nur den Finder (kein Import), optionale Abhängigkeiten
+behalten so ihr bisheriges `np is None`-Verhalten.
+"""
+
+from __future__ import annotations
+import sys, types, importlib, importlib.util
+
+def available(name: str) -> bool:
+    """True, wenn das Modul importierbar wäre — ohne es zu importieren."""
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+class LazyModule(types.ModuleType):
+    """Platzhalter, der sich beim ersten Zugriff durch das echte Modul ersetzt."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = name
+
+    def _load(self):
+        mod = importlib.import_module(self.__dict__["_lazy_target"])
+        # Attribute übernehmen → weitere Zugriffe laufen ohne __getattr__
+        self.__dict__.update(mod.__dict__)
+        return mod
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+def lazy(name: str, required: bool = False):
+    """
+    Bereits geladenes Modul direkt, sonst ein LazyModule-Platzhalter.
+    required=True: fehlt das Modul ganz, schlägt schon dieser Aufruf fehl wie ein normales `import`.
+    """
+    if required and not available(name):
+        raise ImportError(f"No module named {name!r}", name=name)
+    return sys.modules.get(name) or LazyModule(name)
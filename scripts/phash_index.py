@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Mira — Perceptual Hash Index
+----------------------------
+Erkennt visuell identische Renders, auch wenn sich die Bytes unterscheiden
+(PNG-Metadaten, Encoder-Rauschen, stündliche Platzhalter).
+
+  - aHash (8×8, > Mittelwert) und dHash (9×8, horizontale Gradienten),
+    je 64 Bit, mit NumPy berechnet
+  - Index data/self/phash_index.json: { "<pfad>": { sha256, ahash, dhash } }
+    plus "checked": { sha256: { ahash, dhash } } für geprüfte Bilder außerhalb
+    des Archivs — ein erneuter check derselben Bytes dekodiert nicht noch einmal
+    (höchstens CHECKED_KEEP, die ältesten fallen zuerst; Bytes, die inzwischen
+    im Archiv liegen, deckt entries ab)
+  - Hamming-Suche vektorisiert über alle Einträge
+
+Nutzung:
+  python scripts/phash_index.py update                 # Archiv inkrementell indexieren (nach sha256)
+  python scripts/phash_index.py check <bild> [--max-dist N] [--add <archivpfad>]
+      Exit 0 + Ausgabe des Treffers, wenn ein Beinahe-Duplikat im Index liegt, sonst Exit 1;
+      mit --add wird ein neues Bild gleich unter <archivpfad> eingetragen (kein update nötig)
+      (für Workflows: `python scripts/phash_index.py check f.png --add data/archive/f.png || cp …`)
+"""
+
+from __future__ import annotations
+import os, sys, json, glob, hashlib, argparse
+from pathlib import Path
+import numpy as np
+from PIL import Image, ImageOps
+
+INDEX = Path(os.getenv("MIRA_PHASH_INDEX", "data/self/phash_index.json"))
+ARCHIVE_GLOBS = ("data/archive/*.png", "data/archive/self/*.png", "data/archive/self/*.webp",
+                 "data/archive/self/*.jpg", "data/archive/self/*.jpeg")
+# Summe aus aHash- und dHash-Distanz (0..128), bis zu der zwei Bilder als gleich gelten
+DEFAULT_MAX_DIST = int(os.getenv("MIRA_PHASH_MAX_DIST", "4"))
+CHECKED_KEEP = int(os.getenv("MIRA_PHASH_CHECKED_KEEP", "256"))
+
+def _bits_to_int(bits) -> int:
+    return int.from_bytes(np.packbits(bits.astype(np.uint8).ravel()).tobytes(), "big")
+
+def phash(img: Image.Image) -> tuple[int, int]:
+    """(ahash, dhash) als 64-Bit-Ganzzahlen."""
+    g = ImageOps.exif_transpose(img).convert("L")
+    a = np.asarray(g.resize((8, 8), Image.BOX), dtype=np.float32)
+    d = np.asarray(g.resize((9, 8), Image.BOX), dtype=np.int16)
+    return _bits_to_int(a > a.mean()), _bits_to_int(d[:, 1:] > d[:, :-1])
+
+def phash_file(p: Path) -> tuple[int, int]:
+    with Image.open(p) as im:
+        return phash(im)
+
+def to_hex(h: int) -> str:
+    return f"{h:016x}"
+
+def distance(a: tuple[int, int], b: tuple[int, int]) -> int:
+    return bin(a[0] ^ b[0]).count("1") + bin(a[1] ^ b[1]).count("1")
+
+def sha256_file(p: Path) -> str:
+    h = hashlib.sha256()
+    with p.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _load_file() -> dict:
+    try:
+        with INDEX.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def load_index() -> dict:
+    return _load_file().get("entries", {})
+
+def load_checked() -> dict:
+    return _load_file().get("checked", {})
+
+def save_index(entries: dict, checked: dict | None = None):
+    """checked=None übernimmt den vorhandenen Hash-Cache geprüfter Bilder."""
+    checked = load_checked() if checked is None else checked
+    archived = {e["sha256"] for e in entries.values()}
+    # Einfügereihenfolge = Alter; nur die jüngsten CHECKED_KEEP außerhalb des Archivs behalten
+    kept = [(sha, h) for sha, h in checked.items() if sha not in archived]
+    checked = dict(kept[-CHECKED_KEEP:] if CHECKED_KEEP > 0 else [])
+    INDEX.parent.mkdir(parents=True, exist_ok=True)
+    tmp = INDEX.with_name(INDEX.name + ".tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump({"version": 1, "entries": dict(sorted(entries.items())),
+                   "checked": checked}, f, indent=1)
+        f.write("\n")
+    os.replace(tmp, INDEX)
+
+def nearest(entries: dict, h: tuple[int, int], max_dist: int = DEFAULT_MAX_DIST, exclude: str | None = None):
+    """Bester Treffer (pfad, distanz) mit distanz <= max_dist oder None — vektorisiert."""
+    items = [(p, e) for p, e in entries.items() if p != exclude]
+    if not items:
+        return None
+    a = np.array([int(e["ahash"], 16) for _, e in items], dtype=np.uint64)
+    d = np.array([int(e["dhash"], 16) for _, e in items], dtype=np.uint64)
+    xa = np.bitwise_xor(a, np.uint64(h[0])).view(np.uint8)
+    xd = np.bitwise_xor(d, np.uint64(h[1])).view(np.uint8)
+    dist = (np.unpackbits(xa).reshape(len(items), -1).sum(axis=1)
+            + np.unpackbits(xd).reshape(len(items), -1).sum(axis=1))
+    i = int(dist.argmin())
+    return (items[i][0], int(dist[i])) if dist[i] <= max_dist else None
+
+def update_index() -> tuple[dict, int]:
+    entries = load_index()
+    by_sha = {e["sha256"]: e for e in entries.values()}
+    paths = sorted({p for pat in ARCHIVE_GLOBS for p in glob.glob(pat)})
+    added = 0
+    for p in paths:
+        path = Path(p)
+        if path.is_symlink():
+            continue
+        sha = sha256_file(path)
+        if p in entries and entries[p]["sha256"] == sha:
+            continue
+        known = by_sha.get(sha)
+        if known:
+            entries[p] = dict(known)
+            continue
+        try:
+            ah, dh = phash_file(path)
+        except Exception:
+            continue
+        entries[p] = by_sha[sha] = {"sha256": sha, "ahash": to_hex(ah), "dhash": to_hex(dh)}
+        added += 1
+    # verschwundene Dateien austragen
+    for p in [p for p in entries if not Path(p).exists()]:
+        del entries[p]
+    return entries, added
+
+def main():
+    ap = argparse.ArgumentParser(description="Perceptual-Hash-Index für Archivbilder")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("update")
+    c = sub.add_parser("check")
+    c.add_argument("image", type=Path)
+    c.add_argument("--max-dist", type=int, default=DEFAULT_MAX_DIST)
+    c.add_argument("--add", type=Path, help="neues Bild unter diesem Archivpfad eintragen")
+    args = ap.parse_args()
+
+    if args.cmd == "update":
+        entries, added = update_index()
+        save_index(entries)
+        print(f"[phash] {len(entries)} entries ({added} hashed)")
+        return 0
+
+    entries, checked = load_index(), load_checked()
+    sha = sha256_file(args.image)
+    known = checked.get(sha) or next((e for e in entries.values() if e["sha256"] == sha), None)
+    if known:
+        h = (int(known["ahash"], 16), int(known["dhash"], 16))   # schon einmal gehasht
+    else:
+        h = phash_file(args.image)
+        checked[sha] = {"ahash": to_hex(h[0]), "dhash": to_hex(h[1])}
+    hit = nearest(entries, h, args.max_dist, exclude=str(args.image))
+    if not hit and args.add:
+        entries[str(args.add)] = {"sha256": sha, "ahash": to_hex(h[0]), "dhash": to_hex(h[1])}
+    if not known or (not hit and args.add):
+        save_index(entries, checked)
+    if hit:
+        print(f"[phash] near-duplicate of {hit[0]} (distance {hit[1]})")
+        return 0
+    print(f"[phash] new image (ahash {to_hex(h[0])}, dhash {to_hex(h[1])})")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,18 +12,33 @@ Eingaben (wenn vorhanden):
 
 Ausgaben:
   - data/self/latest_image.png / .webp  : 3:4, dezent optimiert (warm/kalt, Kontrast, Vignette)
-  - data/self/portrait_state.json       : Metadaten (Quelle, Mapping, Checks)
+  - data/self/portrait_state.json       : Metadaten (Quelle, Mapping, Checks; je Pipeline unter "pipelines")
 Idempotent, qualitativ vorsichtig (Clamps & Guards).
 """
 
+from __future__ import annotations
 import json, os, glob, hashlib, io, time
 from datetime import datetime, timezone
 from pathlib import Path
-from PIL import Image, ImageOps, ImageEnhance, ImageFilter
+from lazy_import import lazy
+from vignette import apply_vignette
+from portrait_encoder import publish, write_outputs
+from portrait_cache import (sha256_file, input_fingerprint, is_up_to_date,
+                            snap_adjustments, load_render, store_render,
+                            source_phash, is_visual_duplicate, source_identity, record_skip,
+                            pipeline_meta, merge_slot, known_outputs)
+
+# PIL erst laden, wenn wirklich dekodiert/gerendert wird (Kurzschluss bleibt importfrei)
+Image = lazy("PIL.Image")
+ImageOps = lazy("PIL.ImageOps")
+ImageEnhance = lazy("PIL.ImageEnhance")
+ImageFilter = lazy("PIL.ImageFilter")
 
 ROOT = Path(".")
 OUT_PNG = Path(os.getenv("MIRA_OUT_PNG", "data/self/latest_image.png"))
 OUT_WEBP = Path(os.getenv("MIRA_OUT_WEBP", "data/self/latest_image.webp"))
+OUT_THUMB = Path(os.getenv("MIRA_OUT_THUMB", "data/self/latest_thumb.webp"))
+OUT_HERO = os.getenv("MIRA_OUT_HERO", "")  # optional, z. B. docs/portrait/mira-hero.jpg
 META_OUT = Path(os.getenv("MIRA_META_OUT", "data/self/portrait_state.json"))
 DEFAULT_SOURCE = Path(os.getenv("MIRA_DEFAULT_SOURCE", "data/self/latest_image.png"))
 
@@ -32,6 +47,9 @@ AFFECT_FILE = Path("data/self/affect-state.json")
 LEARN_FILE  = Path("data/self/learning.json")
 SELF_FILE   = Path("data/self/self-describe.json")
 
+# Erhöhen, sobald sich apply_adjustments/save_outputs sichtbar ändern
+PIPELINE_VERSION = "portrait_adaptor/3"
+
 def now_iso():
     return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
@@ -96,13 +114,20 @@ def map_adjustments(affect: dict | None, learn: dict | None) -> dict:
     # Minimaler Weichzeichner bei hoher Arousal, sonst 0 (Gesicht bleibt scharf)
     blur = 0.0 if abs(aro) < 0.6 else 0.3
 
-    return dict(
+    # Auf wahrnehmbare Stufen einrasten (portrait_cache.snap_adjustments),
+    # damit minimaler Affekt-Drift kein neues Porträt erzeugt
+    adj = snap_adjustments(dict(
         warmth_shift=warmth,
         contrast_gain=contrast,
         brightness_gain=brightness,
         vignette_strength=vignette,
         blur_sigma=blur
-    )
+    ))
+    # Einrasten kann knapp über die Grenzen schieben → erneut begrenzen
+    adj["contrast_gain"] = clamp(adj["contrast_gain"], 0.95, 1.15)
+    adj["brightness_gain"] = clamp(adj["brightness_gain"], 0.96, 1.08)
+    adj["vignette_strength"] = clamp(adj["vignette_strength"], 0.08, 0.28)
+    return adj
 
 def apply_adjustments(img: Image.Image, adj: dict) -> Image.Image:
     # 3:4 Crop (zentriert, ohne Upscale-Wechsel)
@@ -155,50 +180,20 @@ def apply_adjustments(img: Image.Image, adj: dict) -> Image.Image:
     if adj["blur_sigma"] > 0:
         img = img.filter(ImageFilter.GaussianBlur(radius=adj["blur_sigma"]))
 
-    # Vignette
-    v = adj["vignette_strength"]
-    if v > 0:
-        w, h = img.size
-        mask = Image.new("L", (w, h), 0)
-        grad = Image.new("L", (w, h))
-        # radial gradient via blur of ellipse
-        g = Image.new("L", (w, h), 0)
-        g_draw = Image.new("L", (w, h), 0)
-        # Ellipse als „Spotlight“ (hell innen)
-        e = Image.new("L", (w, h), 0)
-        e1 = ImageDraw = __import__("PIL.ImageDraw", fromlist=["ImageDraw"]).ImageDraw
-        d = e1(e)
-        d.ellipse((int(w*0.08), int(h*0.06), int(w*0.92), int(h*0.94)), fill=255)
-        e = e.filter(ImageFilter.GaussianBlur(radius=int(min(w, h) * 0.12)))
-        # invert to make edges darker
-        vign = ImageOps.invert(e)
-        alpha = int(255 * v)
-        vign = vign.point(lambda p: int(p * (alpha/255)))
-        # overlay as darkening layer
-        dark = Image.new("RGB", (w, h), (0, 0, 0))
-        img = Image.composite(dark, img, vign)
+    # Vignette (Maske gecacht, siehe vignette.py)
+    img = apply_vignette(img, adj["vignette_strength"])
 
     return img
 
-def save_outputs(img: Image.Image):
-    # PNG
-    OUT_PNG.parent.mkdir(parents=True, exist_ok=True)
-    buf = io.BytesIO()
-    img.save(buf, format="PNG", optimize=True)
-    png_bytes = buf.getvalue()
-    old = OUT_PNG.read_bytes() if OUT_PNG.exists() else b""
-    if sha256_bytes(old) != sha256_bytes(png_bytes):
-        with OUT_PNG.open("wb") as f:
-            f.write(png_bytes)
-
-    # WEBP
-    buf = io.BytesIO()
-    img.save(buf, format="WEBP", quality=88, method=6)
-    webp_bytes = buf.getvalue()
-    oldw = OUT_WEBP.read_bytes() if OUT_WEBP.exists() else b""
-    if sha256_bytes(oldw) != sha256_bytes(webp_bytes):
-        with OUT_WEBP.open("wb") as f:
-            f.write(webp_bytes)
+def output_targets() -> dict[str, Path]:
+    targets = {"png": OUT_PNG, "webp": OUT_WEBP, "thumb": OUT_THUMB}
+    if OUT_HERO:
+        targets["hero"] = Path(OUT_HERO)
+    return targets
+
+def save_outputs(img: Image.Image) -> dict[str, bytes]:
+    # Alle Formate parallel kodieren, atomar & nur bei Änderung schreiben
+    return publish(img, output_targets())
 
 def write_meta(meta: dict):
     META_OUT.parent.mkdir(parents=True, exist_ok=True)
@@ -210,8 +205,16 @@ def main():
     affect = load_json(AFFECT_FILE) or {}
     learn  = load_json(LEARN_FILE)  or {}
     selfj  = load_json(SELF_FILE)   or {}
+    last   = load_json(META_OUT)    or {}
+    # eigener Stand: portrait_adaptor und portrait_state schreiben dieselbe Datei
+    mine   = pipeline_meta(last, PIPELINE_VERSION)
+    known  = known_outputs(last)
 
     if src is None:
+        fp = input_fingerprint(None, None, PIPELINE_VERSION)
+        if is_up_to_date(mine, fp, *output_targets().values(), known=known):
+            print("[portrait] unchanged inputs — skip")
+            return
         # Letzte Notfall-Silhouette als PNG erzeugen (falls gar nichts existiert)
         from PIL import ImageDraw
         img = Image.new("RGB", (1024,1365), (12,14,20))
@@ -223,28 +226,59 @@ def main():
         d.ellipse((382,1210,502,1250), fill=(93,134,255))
         d.ellipse((622,1210,742,1250), fill=(93,134,255))
         save_outputs(img)
-        write_meta({
+        meta = {
             "ts": now_iso(),
             "source": None,
             "note": "generated emergency silhouette",
-            "adjustments": None
-        })
+            "adjustments": None,
+            "fingerprint": fp,
+            "checksum_png": sha256_file(OUT_PNG)
+        }
+        write_meta(merge_slot(meta, last, PIPELINE_VERSION, meta))
         return
 
-    # Quelle öffnen
-    img = open_image_any(src)
+    # Kurzschluss vor dem Dekodieren: gleiche Quelle + gleiche Anpassungen
     adj = map_adjustments(affect, learn)
-    out = apply_adjustments(img, adj)
-    save_outputs(out)
+    src_sha = source_identity(src, sha256_file(src), mine, OUT_PNG, OUT_WEBP, known=known)
+    fp = input_fingerprint(src_sha, adj, PIPELINE_VERSION)
+    if is_up_to_date(mine, fp, *output_targets().values(), known=known):
+        print(f"[portrait] unchanged inputs ({src.name}) — skip")
+        return
+
+    # Render-Cache: derselbe quantisierte Zustand wurde schon einmal gerendert
+    targets = output_targets()
+    hit = load_render(fp, targets)
+    src_ph = mine.get("source_phash") if mine.get("source_sha256") == src_sha else None
+    if hit:
+        write_outputs(hit, targets)
+    else:
+        # Quelle öffnen
+        img = open_image_any(src)
+        # andere Bytes, aber visuell dieselbe Quelle → nichts neu kodieren/committen
+        src_ph = source_phash(img)
+        if is_visual_duplicate(last, src_ph, adj, PIPELINE_VERSION, *targets.values(), known=known):
+            print(f"[portrait] near-duplicate source ({src.name}) — skip")
+            write_meta(merge_slot(last, last, PIPELINE_VERSION, record_skip(
+                mine, source=str(src), source_sha256=src_sha, source_phash=src_ph,
+                fingerprint=fp, skipped="near-duplicate")))
+            return
+        out = apply_adjustments(img, adj)
+        store_render(fp, save_outputs(out))
 
-    write_meta({
+    meta = {
         "ts": now_iso(),
         "source": str(src),
+        "source_sha256": src_sha,
+        "source_phash": src_ph,
         "affect": affect,
         "learning": learn,
         "adjustments": adj,
-        "checksum_png": sha256_bytes(OUT_PNG.read_bytes()) if OUT_PNG.exists() else None
-    })
+        "pipeline": PIPELINE_VERSION,
+        "fingerprint": fp,
+        "render_cache": "hit" if hit else "miss",
+        "checksum_png": sha256_file(OUT_PNG)
+    }
+    write_meta(merge_slot(meta, last, PIPELINE_VERSION, meta))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Mira — Portrait Pipeline Fingerprint
+------------------------------------
+Gemeinsame Kurzschluss-Logik für portrait_adaptor.py und portrait_state.py.
+
+Vor dem Dekodieren wird ein Fingerabdruck aus
+  (Quell-Checksumme, quantisierte Anpassungen, Pipeline-Version)
+gebildet und mit dem Fingerabdruck der eigenen Pipeline in
+data/self/portrait_state.json verglichen ("pipelines": {PIPELINE_VERSION: {...}};
+portrait_adaptor und portrait_state teilen sich Datei und Ausgaben, überschreiben
+aber nicht gegenseitig ihren Stand). Stimmt er überein und zeigen die Ausgaben
+einen bekannten Render (eigenen oder den der anderen Pipeline), entfällt der
+komplette Lauf (Decode, Crop, Resize, Adjust, PNG/WEBP-Encode).
+
+Zusätzlich:
+  - snap_adjustments(): rastet warmth/contrast/brightness/vignette/blur auf
+    wahrnehmbare Stufen ein (konfigurierbar über data/self/portrait_quant.json),
+    damit minimaler Affekt-Drift kein "neues" Porträt erzeugt.
+  - Render-Cache unter <MIRA_CACHE_DIR>/renders/<fingerprint>/<variante>:
+    kehrt ein quantisierter Zustand zurück, werden die fertigen Bytes
+    wiederverwendet statt neu gerendert.
+  - Perceptual-Hash der Quelle (phash_index.py): andere Bytes, aber visuell
+    dieselbe Quelle bei gleichen Anpassungen → kein Encode, kein Commit.
+    Der Treffer wird in den Metadaten vermerkt (record_skip), damit der
+    nächste Lauf schon am Fingerabdruck kurzschließt.
+  - source_identity(): ist die gewählte Quelle eine eigene Ausgabe (leeres
+    Archiv → Fallback auf latest_image.*), zählt die beim letzten Lauf
+    aufgezeichnete Eingabe — sonst änderte jeder Lauf seine eigene Quelle.
+"""
+
+from __future__ import annotations
+import os, json, hashlib
+from pathlib import Path
+from typing import Optional
+
+CACHE_ROOT  = Path(os.getenv("MIRA_CACHE_DIR", ".cache/mira"))
+RENDER_DIR  = CACHE_ROOT / "renders"
+RENDER_KEEP = int(os.getenv("MIRA_RENDER_CACHE_KEEP", "48"))
+QUANT_FILE  = Path(os.getenv("MIRA_PORTRAIT_QUANT", "data/self/portrait_quant.json"))
+
+# Wahrnehmbare Stufen je Anpassung (kleiner = feiner)
+DEFAULT_STEPS = {
+    "warmth_shift":      0.01,
+    "contrast_gain":     0.02,
+    "brightness_gain":   0.01,
+    "vignette_strength": 0.02,
+    "blur_sigma":        0.05,
+}
+
+def sha256_file(p: Path, chunk: int = 1 << 20) -> Optional[str]:
+    try:
+        h = hashlib.sha256()
+        with p.open("rb") as f:
+            for block in iter(lambda: f.read(chunk), b""):
+                h.update(block)
+        return h.hexdigest()
+    except Exception:
+        return None
+
+def load_steps() -> dict:
+    """DEFAULT_STEPS, optional überschrieben durch QUANT_FILE ({"contrast_gain": 0.03, ...})."""
+    steps = dict(DEFAULT_STEPS)
+    try:
+        with QUANT_FILE.open("r", encoding="utf-8") as f:
+            override = json.load(f) or {}
+        for k, v in override.items():
+            if k in steps:
+                steps[k] = max(0.0, float(v))
+    except Exception:
+        pass
+    return steps
+
+def snap_adjustments(adj: dict, steps: Optional[dict] = None) -> dict:
+    """Rastet jede Anpassung auf ihr Stufenraster ein (Stufe 0 = unverändert)."""
+    steps = steps if steps is not None else load_steps()
+    out = {}
+    for k, v in adj.items():
+        step = steps.get(k, 0.0)
+        out[k] = round(round(float(v) / step) * step, 6) if step > 0 else v
+    return out
+
+def quantize_adjustments(adj: Optional[dict], ndigits: int = 3) -> Optional[dict]:
+    """Rundet Anpassungen, damit Float-Rauschen den Fingerabdruck nicht ändert."""
+    if adj is None:
+        return None
+    return {k: round(float(v), ndigits) for k, v in sorted(adj.items())}
+
+def input_fingerprint(source_sha: Optional[str], adj: Optional[dict], pipeline: str) -> str:
+    payload = {
+        "source": source_sha,
+        "adjustments": quantize_adjustments(adj),
+        "pipeline": pipeline,
+    }
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+# Felder, die je Pipeline unter meta["pipelines"][PIPELINE_VERSION] liegen
+SLOT_KEYS = ("ts", "source", "source_sha256", "source_phash", "adjustments",
+             "pipeline", "fingerprint", "checksum_png", "skipped")
+
+def pipeline_meta(meta: Optional[dict], pipeline: str) -> dict:
+    """Stand der eigenen Pipeline (ältere Dateien ohne "pipelines": Kopf, falls er passt)."""
+    slots = (meta or {}).get("pipelines") or {}
+    if pipeline in slots:
+        return slots[pipeline]
+    return meta if (meta or {}).get("pipeline") == pipeline else {}
+
+def merge_slot(public: dict, last: Optional[dict], pipeline: str, slot: dict) -> dict:
+    """public (Kopf der Datei) + alle Pipeline-Stände aus last, der eigene durch slot ersetzt."""
+    slots = dict((last or {}).get("pipelines") or {})
+    slots[pipeline] = {k: slot[k] for k in SLOT_KEYS if k in slot}
+    return {**public, "pipelines": slots}
+
+def known_outputs(meta: Optional[dict]) -> set:
+    """checksum_png aller Pipelines: Ausgaben, die einer von ihnen gerendert hat."""
+    slots = ((meta or {}).get("pipelines") or {}).values()
+    return {s.get("checksum_png") for s in (*slots, meta or {})} - {None}
+
+def _outputs_known(meta: dict, known, out_png: Path, *others: Path) -> bool:
+    if not all(Path(p).exists() for p in (out_png, *others)):
+        return False
+    expected = set(known or ()) | ({meta["checksum_png"]} if meta.get("checksum_png") else set())
+    return bool(expected) and sha256_file(out_png) in expected
+
+def source_identity(src: Path, src_sha: Optional[str], meta: Optional[dict],
+                    out_png: Path, *own: Path, known=()) -> Optional[str]:
+    """
+    Checksumme der eigentlichen Eingabe. Ist src eine eigene Ausgabe (out_png/own),
+    die seit dem letzten Lauf nur von den Pipelines selbst geschrieben wurde,
+    gilt die damals aufgezeichnete Quelle.
+    """
+    if not meta or not meta.get("source_sha256"):
+        return src_sha
+    try:
+        mine = any(Path(src).resolve() == Path(p).resolve() for p in (out_png, *own))
+    except OSError:
+        return src_sha
+    if mine and _outputs_known(meta, known, out_png):
+        return meta["source_sha256"]
+    return src_sha
+
+def record_skip(meta: Optional[dict], **fields) -> dict:
+    """Pipeline-Stand nach einem Kurzschluss (z. B. Beinahe-Duplikat): Ausgaben bleiben, Eingabe neu."""
+    return {**(meta or {}), **fields}
+
+def is_up_to_date(meta: Optional[dict], fingerprint: str, out_png: Path, *others: Path, known=()) -> bool:
+    """True, wenn der letzte Lauf denselben Fingerabdruck hatte und die Ausgaben einen bekannten Render zeigen."""
+    if not meta or meta.get("fingerprint") != fingerprint:
+        return False
+    return _outputs_known(meta, known, out_png, *others)
+
+def source_phash(img) -> Optional[str]:
+    """"<ahash>:<dhash>" der dekodierten Quelle oder None (NumPy fehlt)."""
+    try:
+        from phash_index import phash, to_hex
+    except Exception:
+        return None
+    a, d = phash(img)
+    return f"{to_hex(a)}:{to_hex(d)}"
+
+def is_visual_duplicate(meta: Optional[dict], src_phash: Optional[str], adj: dict,
+                        pipeline: str, out_png: Path, *others: Path, known=()) -> bool:
+    """Quelle visuell wie beim letzten Lauf (gleiche Pipeline/Anpassungen, Ausgaben unberührt)."""
+    if not src_phash or not meta or not meta.get("source_phash"):
+        return False
+    if meta.get("pipeline") != pipeline:
+        return False
+    if quantize_adjustments(meta.get("adjustments")) != quantize_adjustments(adj):
+        return False
+    try:
+        from phash_index import distance, DEFAULT_MAX_DIST
+        prev = tuple(int(x, 16) for x in meta["source_phash"].split(":"))
+        cur = tuple(int(x, 16) for x in src_phash.split(":"))
+    except Exception:
+        return False
+    if distance(prev, cur) > DEFAULT_MAX_DIST:
+        return False
+    return _outputs_known(meta, known, out_png, *others)
+
+def _render_path(fingerprint: str, name: str) -> Path:
+    return RENDER_DIR / fingerprint / name
+
+def load_render(fingerprint: str, names) -> Optional[dict[str, bytes]]:
+    """Fertige Encoder-Ausgaben {name: bytes} für einen Fingerabdruck oder None."""
+    try:
+        data = {n: _render_path(fingerprint, n).read_bytes() for n in names}
+    except Exception:
+        return None
+    try:
+        os.utime(RENDER_DIR / fingerprint)  # LRU: zuletzt benutzt
+    except Exception:
+        pass
+    return data
+
+def store_render(fingerprint: str, outputs: dict[str, bytes]):
+    try:
+        d = RENDER_DIR / fingerprint
+        d.mkdir(parents=True, exist_ok=True)
+        for name, b in outputs.items():
+            p = _render_path(fingerprint, name)
+            tmp = p.with_name(p.name + ".tmp")
+            tmp.write_bytes(b)
+            os.replace(tmp, p)
+        os.utime(d)
+        _prune_renders()
+    except Exception:
+        pass  # Cache ist optional
+
+def _prune_renders():
+    entries = [d for d in RENDER_DIR.iterdir() if d.is_dir()]
+    entries.sort(key=lambda d: d.stat().st_mtime, reverse=True)
+    for old in entries[RENDER_KEEP:]:
+        for p in old.iterdir():
+            try:
+                p.unlink()
+            except Exception:
+                pass
+        try:
+            old.rmdir()
+        except Exception:
+            pass
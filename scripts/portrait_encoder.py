@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Mira — Parallel Portrait Encoder
+--------------------------------
+Eine Encode-Stufe für alle Ausgabeformate eines angepassten Porträts:
+
+  png    : verlustfrei, optimize=True           (data/self/latest_image.png)
+  webp   : quality=88, method=6                 (data/self/latest_image.webp)
+  hero   : progressives JPEG, 780×1080 Letterbox (docs/portrait/mira-hero.jpg)
+  thumb  : WEBP, 256 px breit                   (data/self/latest_thumb.webp)
+
+Die Varianten werden in einem ThreadPool parallel kodiert (Pillow gibt den
+GIL während des Encodes frei), die Laufzeit nähert sich damit dem langsamsten
+Einzel-Encoder. Geschrieben wird atomar und nur bei geänderten Bytes.
+"""
+
+from __future__ import annotations
+import io, os, hashlib
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from lazy_import import lazy
+
+Image = lazy("PIL.Image")
+
+HERO_W, HERO_H = 780, 1080
+THUMB_W = 256
+
+VARIANTS = {
+    "png":   {"format": "PNG",  "params": {"optimize": True}},
+    "webp":  {"format": "WEBP", "params": {"quality": 88, "method": 6}},
+    "hero":  {"format": "JPEG", "params": {"quality": 90, "optimize": True, "progressive": True}},
+    "thumb": {"format": "WEBP", "params": {"quality": 80, "method": 4}},
+}
+
+def hero_frame(img: Image.Image, max_w: int = HERO_W, max_h: int = HERO_H) -> Image.Image:
+    """Einpassen in max_w×max_h (Seitenverhältnis bleibt), Rest schwarz auffüllen."""
+    img = img.convert("RGB")
+    if img.size == (max_w, max_h):
+        return img
+    img.thumbnail((max_w, max_h), Image.LANCZOS)
+    canvas = Image.new("RGB", (max_w, max_h), (0, 0, 0))
+    canvas.paste(img, ((max_w - img.size[0]) // 2, (max_h - img.size[1]) // 2))
+    return canvas
+
+def thumb_frame(img: Image.Image, width: int = THUMB_W) -> Image.Image:
+    w, h = img.size
+    if w <= width:
+        return img
+    return img.resize((width, max(1, round(h * width / w))), Image.LANCZOS)
+
+def _prepare(img: Image.Image, name: str) -> Image.Image:
+    if name == "hero":
+        return hero_frame(img)
+    if name == "thumb":
+        return thumb_frame(img)
+    return img
+
+def encode_variant(img: Image.Image, name: str) -> bytes:
+    spec = VARIANTS[name]
+    buf = io.BytesIO()
+    _prepare(img, name).save(buf, format=spec["format"], **spec["params"])
+    return buf.getvalue()
+
+def encode_all(img: Image.Image, names=("png", "webp"), max_workers: int | None = None) -> dict[str, bytes]:
+    """Kodiert alle gewünschten Varianten parallel → {name: bytes}."""
+    names = list(names)
+    img.load()  # Pixel einmal materialisieren, bevor mehrere Threads lesen
+    if len(names) <= 1:
+        return {n: encode_variant(img, n) for n in names}
+    workers = max_workers or min(len(names), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {n: pool.submit(encode_variant, img, n) for n in names}
+        return {n: f.result() for n, f in futures.items()}
+
+def sha256_bytes(b: bytes) -> str:
+    return hashlib.sha256(b).hexdigest()
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """Atomar schreiben (tmp + os.replace), nur wenn sich die Bytes ändern."""
+    path = Path(path)
+    try:
+        if path.exists() and path.stat().st_size == len(data) and \
+                sha256_bytes(path.read_bytes()) == sha256_bytes(data):
+            return False
+    except Exception:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with tmp.open("wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return True
+
+def publish(img: Image.Image, targets: dict[str, Path], max_workers: int | None = None) -> dict[str, bytes]:
+    """Kodiert alle Varianten aus targets ({name: Pfad}) parallel und schreibt sie."""
+    targets = {n: Path(p) for n, p in targets.items() if p}
+    outputs = encode_all(img, targets.keys(), max_workers=max_workers)
+    write_outputs(outputs, targets)
+    return outputs
+
+def write_outputs(outputs: dict[str, bytes], targets: dict[str, Path]):
+    for name, data in outputs.items():
+        if targets.get(name):
+            write_if_changed(Path(targets[name]), data)
@@ -10,10 +10,16 @@ Bewertet das aktuelle Porträt anhand einfacher, robuster Kennzahlen:
 - sharpness_ok:          Kanten-Energie (Sobel-ähnlich) >= Schwelle
 - aspect_ok:             3:4 (± 2 % Toleranz)
 
+Alle Kennzahlen kommen aus einem Durchlauf (scripts/image_metrics.py), dazu
+informativ: Laplace-Varianz, Clipping-Anteile, 16-Bin-Histogramm.
+MIRA_QUALITY_DOWNSCALE=2|4 → schneller Vorab-Check auf verkleinertem Bild.
+Unverändertes Bild (sha256) + gleiche Schwellen → kein Dekodieren, kein Schreiben.
+
 Ergebnis wird nach data/self/quality.json geschrieben:
 {
   "ts": "...Z",
   "image": "data/self/latest_image.(png|webp|...)" | null,
+  "sha256": "..." | null,
   "metrics": { ... },
   "ok": true|false,
   "notes": ["...","..."]
@@ -27,10 +33,25 @@ import json, os, sys, io, math, glob, hashlib
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import Optional
-from PIL import Image, ImageOps, ImageFilter, ImageStat
+from lazy_import import lazy
+
+from image_metrics import compute_metrics
+
+Image = lazy("PIL.Image")
+ImageOps = lazy("PIL.ImageOps")
 
 ROOT = Path(".")
 OUT_JSON = Path("data/self/quality.json")
+# >1 = schneller Vorab-Check auf verkleinertem Bild (z. B. 2 oder 4)
+DOWNSCALE = int(os.getenv("MIRA_QUALITY_DOWNSCALE", "1") or 1)
+
+THRESHOLDS = {
+    "min_resolution": [768, 1024],
+    "brightness_range": [0.18, 0.82],
+    "contrast_range": [0.06, 0.32],
+    "sharpness_min": 0.06,
+    "aspect": "3:4 ±2%"
+}
 
 def now_iso():
     return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -53,35 +74,60 @@ def pick_current_image() -> Optional[Path]:
             return p
     return None
 
-def luma_image(img: Image.Image) -> Image.Image:
-    # sRGB-Annäherung an Luma
-    return img.convert("L")
-
-def estimate_sharpness(luma: Image.Image) -> float:
-    # Kantenenergie-Proxy: Laplace-Varianz (vereinfachte Schärfeschätzung)
-    # PIL hat keinen direkten Laplace → Highpass via EDGE_ENHANCE -> differenz
-    # Wir nehmen Varianz nach einem EDGE_ENHANCE_MORE Verlauf als Proxy.
-    hp = luma.filter(ImageFilter.FIND_EDGES)  # robust, schnell
-    stat = ImageStat.Stat(hp)
-    # mittlere absolute Abweichung ~ "Kanten-Energie"
-    mean = stat.mean[0] / 255.0
-    std  = stat.stddev[0] / 255.0
-    # Kombinierter Proxy
-    return float(0.6*std + 0.4*mean)
-
-def contrast_spread(luma: Image.Image) -> float:
-    stat = ImageStat.Stat(luma)
-    # Std-Abweichung normalisieren auf [0,1]
-    return float((stat.stddev[0] or 0.0) / 255.0)
-
-def mean_brightness(luma: Image.Image) -> float:
-    stat = ImageStat.Stat(luma)
-    return float((stat.mean[0] or 0.0) / 255.0)
+def sha256_file(p: Path) -> str:
+    h = hashlib.sha256()
+    with p.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def load_last() -> dict:
+    try:
+        return json.loads(OUT_JSON.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
 
 def aspect_ok(w: int, h: int, target=3/4, tol=0.02) -> bool:
     r = w / h
     return abs(r - target) <= target * tol
 
+def measure(img: Image.Image, downscale: int = 1) -> dict:
+    """Kennzahlen (gerundet, JSON-fertig) aus einem Luma-Durchlauf (image_metrics)."""
+    w, h = img.size
+    m = compute_metrics(img, downscale)
+    return {
+        "width": w, "height": h,
+        "mean_brightness": round(m["mean_brightness"], 4),   # [0..1], gut: ~0.18..0.82
+        "contrast_spread": round(m["contrast_spread"], 4),   # [0..1], gut: ~0.06..0.32
+        "sharpness": round(m["sharpness"], 4),               # heuristisch, typ. 0.03..0.25+
+        "laplacian_var": round(m["laplacian_var"], 2) if m["laplacian_var"] is not None else None,
+        "clipped_highlights": round(m["clipped_highlights"], 5),
+        "clipped_shadows": round(m["clipped_shadows"], 5),
+        "histogram": m["histogram"],
+        "downscale": m["downscale"]
+    }
+
+def assess(metrics: dict) -> tuple[bool, list]:
+    """Wendet THRESHOLDS auf gemessene Kennzahlen an → (ok, notes)."""
+    w, h = metrics["width"], metrics["height"]
+    min_w, min_h = THRESHOLDS["min_resolution"]
+    b_lo, b_hi = THRESHOLDS["brightness_range"]
+    c_lo, c_hi = THRESHOLDS["contrast_range"]
+
+    res_ok      = (w >= min_w and h >= min_h)
+    asp_ok      = aspect_ok(w, h, 3/4, tol=0.02)
+    bright_ok   = (b_lo <= metrics["mean_brightness"] <= b_hi)
+    contrast_ok = (c_lo <= metrics["contrast_spread"] <= c_hi)
+    sharp_ok    = (metrics["sharpness"] >= THRESHOLDS["sharpness_min"])   # sehr weiche Bilder < 0.06
+
+    notes = []
+    if not res_ok:     notes.append("low_resolution")
+    if not asp_ok:     notes.append("aspect_off")
+    if not bright_ok:  notes.append("brightness_out_of_range")
+    if not contrast_ok:notes.append("contrast_out_of_range")
+    if not sharp_ok:   notes.append("low_sharpness")
+    return bool(res_ok and asp_ok and bright_ok and contrast_ok and sharp_ok), notes
+
 def main():
     OUT_JSON.parent.mkdir(parents=True, exist_ok=True)
 
@@ -98,6 +144,15 @@ def main():
         print("no image found; wrote quality.json with ok=false")
         return 0
 
+    # Kurzschluss: dasselbe Bild wurde mit denselben Schwellen schon bewertet
+    sha = sha256_file(img_path)
+    last = load_last()
+    if (last.get("sha256") == sha and last.get("image") == str(img_path)
+            and last.get("thresholds") == THRESHOLDS
+            and (last.get("metrics") or {}).get("downscale", 1) == DOWNSCALE):
+        print(f"quality unchanged ({img_path.name}); kept data/self/quality.json")
+        return 0
+
     try:
         img = Image.open(img_path)
         img = ImageOps.exif_transpose(img).convert("RGB")
@@ -113,46 +168,15 @@ def main():
         print("failed to open image; wrote quality.json with ok=false")
         return 0
 
-    w, h = img.size
-    lum = luma_image(img)
-
-    # Kennzahlen
-    m_brightness = mean_brightness(lum)         # [0..1], gut: ~0.18..0.82
-    c_spread     = contrast_spread(lum)         # [0..1], gut: ~0.06..0.32
-    sharp        = estimate_sharpness(lum)      # heuristisch, typ. 0.03..0.25+
-    res_ok       = (w >= 768 and h >= 1024)
-    asp_ok       = aspect_ok(w, h, 3/4, tol=0.02)
-
-    # Schwellen
-    bright_ok = (0.18 <= m_brightness <= 0.82)
-    contrast_ok = (0.06 <= c_spread <= 0.32)
-    sharp_ok = (sharp >= 0.06)   # sehr weiche Bilder < 0.06
-
-    ok = bool(res_ok and asp_ok and bright_ok and contrast_ok and sharp_ok)
-
-    notes = []
-    if not res_ok:     notes.append("low_resolution")
-    if not asp_ok:     notes.append("aspect_off")
-    if not bright_ok:  notes.append("brightness_out_of_range")
-    if not contrast_ok:notes.append("contrast_out_of_range")
-    if not sharp_ok:   notes.append("low_sharpness")
+    metrics = measure(img, DOWNSCALE)
+    ok, notes = assess(metrics)
 
     out = {
         "ts": now_iso(),
         "image": str(img_path),
-        "metrics": {
-            "width": w, "height": h,
-            "mean_brightness": round(m_brightness, 4),
-            "contrast_spread": round(c_spread, 4),
-            "sharpness": round(sharp, 4)
-        },
-        "thresholds": {
-            "min_resolution": [768, 1024],
-            "brightness_range": [0.18, 0.82],
-            "contrast_range": [0.06, 0.32],
-            "sharpness_min": 0.06,
-            "aspect": "3:4 ±2%"
-        },
+        "sha256": sha,
+        "metrics": metrics,
+        "thresholds": THRESHOLDS,
         "ok": ok,
         "notes": notes
     }
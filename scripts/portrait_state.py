@@ -18,16 +18,34 @@ import io, os, glob, json, hashlib
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import Optional
-from PIL import Image, ImageOps, ImageEnhance, ImageFilter, ImageDraw
+from lazy_import import lazy
+from vignette import apply_vignette
+from portrait_encoder import publish, write_outputs
+from portrait_cache import (sha256_file, input_fingerprint, is_up_to_date,
+                            snap_adjustments, load_render, store_render,
+                            source_phash, is_visual_duplicate, source_identity, record_skip,
+                            pipeline_meta, merge_slot, known_outputs)
+
+# PIL erst laden, wenn wirklich dekodiert/gerendert wird (Kurzschluss bleibt importfrei)
+Image = lazy("PIL.Image")
+ImageOps = lazy("PIL.ImageOps")
+ImageEnhance = lazy("PIL.ImageEnhance")
+ImageFilter = lazy("PIL.ImageFilter")
+ImageDraw = lazy("PIL.ImageDraw")
 
 ROOT = Path(".")
 OUT_PNG  = Path(os.getenv("OUT_PNG",  "data/self/latest_image.png"))
 OUT_WEBP = Path(os.getenv("OUT_WEBP", "data/self/latest_image.webp"))
+OUT_THUMB = Path(os.getenv("OUT_THUMB", "data/self/latest_thumb.webp"))
+OUT_HERO = os.getenv("OUT_HERO", "")  # optional, z. B. docs/portrait/mira-hero.jpg
 META_OUT = Path(os.getenv("META_OUT", "data/self/portrait_state.json"))
 
 AFFECT_FILE = Path("data/self/affect-state.json")
 SELF_FILE   = Path("data/self/self-describe.json")
 
+# Erhöhen, sobald sich apply_adjustments/save_if_changed sichtbar ändern
+PIPELINE_VERSION = "portrait_state/3"
+
 def now_iso() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
@@ -72,13 +90,19 @@ def map_adjustments(affect: dict | None) -> dict:
     blur = 0.0 if abs(aro) < 0.65 else 0.35
     vign = clamp(0.10 + 0.20*(1.0-stab),   0.08, 0.28)
 
-    return dict(
+    # Auf wahrnehmbare Stufen einrasten (portrait_cache.snap_adjustments)
+    adj = snap_adjustments(dict(
         warmth_shift=warmth,
         contrast_gain=contrast,
         brightness_gain=brightness,
         blur_sigma=blur,
         vignette_strength=vign
-    )
+    ))
+    # Einrasten kann knapp über die Grenzen schieben → erneut begrenzen
+    adj["contrast_gain"]     = clamp(adj["contrast_gain"],     0.95, 1.18)
+    adj["brightness_gain"]   = clamp(adj["brightness_gain"],   0.96, 1.08)
+    adj["vignette_strength"] = clamp(adj["vignette_strength"], 0.08, 0.28)
+    return adj
 
 def crop_to_3x4(img: Image.Image) -> Image.Image:
     w, h = img.size
@@ -112,37 +136,19 @@ def apply_adjustments(img: Image.Image, adj: dict) -> Image.Image:
     if adj["blur_sigma"] > 0:
         img = img.filter(ImageFilter.GaussianBlur(radius=adj["blur_sigma"]))
 
-    # Vignette (dunkler Rand → Fokus)
-    v = adj["vignette_strength"]
-    if v > 0:
-        w, h = img.size
-        mask = Image.new("L", (w, h), 0)
-        e = Image.new("L", (w, h), 0)
-        d = ImageDraw.Draw(e)
-        d.ellipse((int(w*0.08), int(h*0.06), int(w*0.92), int(h*0.94)), fill=255)
-        e = e.filter(ImageFilter.GaussianBlur(radius=int(min(w, h)*0.12)))
-        vign = ImageOps.invert(e)
-        alpha = int(255 * v)
-        vign = vign.point(lambda p: int(p * (alpha/255)))
-        dark = Image.new("RGB", (w, h), (0, 0, 0))
-        img = Image.composite(dark, img, vign)
+    # Vignette (dunkler Rand → Fokus; Maske gecacht, siehe vignette.py)
+    img = apply_vignette(img, adj["vignette_strength"])
     return img
 
-def save_if_changed(img: Image.Image):
-    # PNG
-    OUT_PNG.parent.mkdir(parents=True, exist_ok=True)
-    buf = io.BytesIO(); img.save(buf, format="PNG", optimize=True)
-    new_png = buf.getvalue()
-    old_png = OUT_PNG.read_bytes() if OUT_PNG.exists() else b""
-    if sha256_bytes(new_png) != sha256_bytes(old_png):
-        with OUT_PNG.open("wb") as f: f.write(new_png)
-
-    # WEBP
-    buf = io.BytesIO(); img.save(buf, format="WEBP", quality=88, method=6)
-    new_webp = buf.getvalue()
-    old_webp = OUT_WEBP.read_bytes() if OUT_WEBP.exists() else b""
-    if sha256_bytes(new_webp) != sha256_bytes(old_webp):
-        with OUT_WEBP.open("wb") as f: f.write(new_webp)
+def output_targets() -> dict[str, Path]:
+    targets = {"png": OUT_PNG, "webp": OUT_WEBP, "thumb": OUT_THUMB}
+    if OUT_HERO:
+        targets["hero"] = Path(OUT_HERO)
+    return targets
+
+def save_if_changed(img: Image.Image) -> dict[str, bytes]:
+    # PNG/WEBP/Thumb (+ Hero) parallel kodieren, atomar & nur bei Änderung schreiben
+    return publish(img, output_targets())
 
 def write_meta(meta: dict):
     META_OUT.parent.mkdir(parents=True, exist_ok=True)
@@ -163,33 +169,72 @@ def main():
     src = pick_source()
     affect = load_json(AFFECT_FILE) or {}
     selfj  = load_json(SELF_FILE)   or {}
+    last   = load_json(META_OUT)    or {}
+    # eigener Stand: portrait_adaptor und portrait_state schreiben dieselbe Datei
+    mine   = pipeline_meta(last, PIPELINE_VERSION)
+    known  = known_outputs(last)
 
     if src is None:
+        fp = input_fingerprint(None, None, PIPELINE_VERSION)
+        if is_up_to_date(mine, fp, *output_targets().values(), known=known):
+            print("[portrait-state] unchanged inputs — skip")
+            return
         img = emergency_silhouette()
         save_if_changed(img)
-        write_meta({
+        meta = {
             "ts": now_iso(),
             "source": None,
             "note": "emergency silhouette",
-            "affect": affect
-        })
+            "affect": affect,
+            "fingerprint": fp,
+            "checksum_png": sha256_file(OUT_PNG)
+        }
+        write_meta(merge_slot(meta, last, PIPELINE_VERSION, meta))
         return
 
-    base = Image.open(src).convert("RGB")
+    # Kurzschluss vor dem Dekodieren: gleiche Quelle + gleiche Anpassungen
     adj  = map_adjustments(affect)
-    out  = apply_adjustments(base, adj)
-    save_if_changed(out)
+    src_sha = source_identity(src, sha256_file(src), mine, OUT_PNG, OUT_WEBP, known=known)
+    fp = input_fingerprint(src_sha, adj, PIPELINE_VERSION)
+    if is_up_to_date(mine, fp, *output_targets().values(), known=known):
+        print(f"[portrait-state] unchanged inputs ({src.name}) — skip")
+        return
+
+    # Render-Cache: derselbe quantisierte Zustand wurde schon einmal gerendert
+    targets = output_targets()
+    hit = load_render(fp, targets)
+    src_ph = mine.get("source_phash") if mine.get("source_sha256") == src_sha else None
+    if hit:
+        write_outputs(hit, targets)
+    else:
+        base = Image.open(src).convert("RGB")
+        # andere Bytes, aber visuell dieselbe Quelle → nichts neu kodieren/committen
+        src_ph = source_phash(base)
+        if is_visual_duplicate(last, src_ph, adj, PIPELINE_VERSION, *targets.values(), known=known):
+            print(f"[portrait-state] near-duplicate source ({src.name}) — skip")
+            write_meta(merge_slot(last, last, PIPELINE_VERSION, record_skip(
+                mine, source=str(src), source_sha256=src_sha, source_phash=src_ph,
+                fingerprint=fp, skipped="near-duplicate")))
+            return
+        out  = apply_adjustments(base, adj)
+        store_render(fp, save_if_changed(out))
 
     meta = {
         "ts": now_iso(),
         "source": str(src),
+        "source_sha256": src_sha,
+        "source_phash": src_ph,
         "affect": affect,
         "adjustments": adj,
+        "pipeline": PIPELINE_VERSION,
+        "fingerprint": fp,
+        "render_cache": "hit" if hit else "miss",
+        "checksum_png": sha256_file(OUT_PNG),
         "self_hint": {
             "has_description": bool(selfj)
         }
     }
-    write_meta(meta)
+    write_meta(merge_slot(meta, last, PIPELINE_VERSION, meta))
 
 if __name__ == "__main__":
     main()
@@ -10,15 +10,22 @@ Funktionen:
 - **Neu:** Leitet aus Zustand eine kurze Selbstdeutung ab (2–3 Sätze, tags + rationale),
         skaliert an expressivity (poetischer ↔ analytischer).
 - Idempotent pro Kalendertag (UTC). Anhängen als JSONL + Index-Update.
+- Aussprache-Transformationen (Dentalisierung, Pausen, IPA-Hinweis) werden pro
+  Voice-Profil einmal kompiliert (Prosody, gecacht nach id + Werten);
+  build_speech_variants() rendert viele Sätze mit einem Profil.
 
 Schreibt:
-- data/self/reflections/private/log.jsonl
+- data/self/reflections/private/log.jsonl    (über reflection_log.py: Anhängen + Index)
+- data/self/reflections/private/log.idx.json (Datum → Offset, Zeilenzahl)
 - data/self/reflections/private/index.json
 """
 
 import json, datetime, re
+from functools import lru_cache
 from pathlib import Path
 
+import reflection_log
+
 # Quellen
 PATH_DAILY   = Path("data/self/daily/reflection.json")
 PATH_AFFECT  = Path("data/self/affect-state.json")
@@ -45,21 +52,9 @@ def read_json(path: Path, default=None):
         return default
 
 def today_already_logged() -> bool:
-    if not PATH_LOG.exists():
-        return False
+    """Datum → Offset aus dem Log-Index (reflection_log), ohne das Log zu lesen."""
     try:
-        data = PATH_LOG.read_bytes()
-        tail = data[-200_000:] if len(data) > 200_000 else data
-        for line in reversed(tail.decode("utf-8", errors="ignore").splitlines()):
-            if not line.strip():
-                continue
-            try:
-                obj = json.loads(line)
-            except Exception:
-                continue
-            if obj.get("date_utc") == utc_date():
-                return True
-        return False
+        return reflection_log.has_date(utc_date(), PATH_LOG)
     except Exception:
         return False
 
@@ -91,71 +86,112 @@ def synthesize_sentence(fragment_text: str, label: str, vec: dict, style: dict)
             f"(V:{val:.2f}, A:{aro:.2f}, S:{stb:.2f}).")
 
 # ---------------- Stimme & Aussprache ----------------
+_COMMA = re.compile(r",\s*")
+_PERIOD = re.compile(r"\.\s*")
+_CH = re.compile(r"([A-Za-zÄÖÜäöü])ch")
+_CH_SOFT = frozenset("eiäöüyEIÄÖÜY")  # davor: ich-Laut (ç), sonst ach-Laut (x)
+
+def _ch_sub(m) -> str:
+    before = m.group(1)
+    return before + ("ç" if before in _CH_SOFT else "x")
+
+def _replace_all(text: str, pairs) -> str:
+    for old, new in pairs:
+        text = text.replace(old, new)
+    return text
+
+class Prosody:
+    """
+    Kompilierte Aussprache-Transformationen eines Voice-Profils:
+      spoken(text)  Dentalisierungsmarker {d} + Pausen
+      ipa(text)     ch → ç/x, r → ʁ, bei braces/expander s/z → s̪/z̪
+    Zeichenersetzungen als feste str.replace-Ketten (in C; schneller als translate
+    mit mehrzeichigen Zielen), Pausen mit vorformatierten Ersatztexten.
+    Ergebnis identisch zu den früheren zeichen-/regexweisen Einzelschritten.
+    """
+    def __init__(self, amount: float, comma_ms: int, period_ms: int, dental_ipa: bool):
+        density = clamp(amount, 0.0, 1.0) if amount > 0.0 else 0.0
+        # d/D zuerst: der Marker "{d}" enthält selbst ein d
+        marked = ("dD" if density >= 0.35 else "") + ("sSzZ" if density >= 0.15 else "") \
+                 + ("tT" if density >= 0.35 else "")
+        self.dental = tuple((ch, ch + "{d}") for ch in marked)
+        self.comma = f", <pause {comma_ms}ms> "
+        self.period = f". <pause {period_ms}ms> "
+        self.ipa_chars = (("r", "ʁ"),) + ((("s", "s̪"), ("z", "z̪")) if dental_ipa else ())
+
+    def dentalize(self, text: str) -> str:
+        return _replace_all(text, self.dental)
+
+    def apply_pauses(self, text: str) -> str:
+        return _PERIOD.sub(self.period, _COMMA.sub(self.comma, text)).strip()
+
+    def spoken(self, text: str) -> str:
+        return self.apply_pauses(self.dentalize(text))
+
+    def ipa(self, text: str) -> str:
+        return _replace_all(_CH.sub(_ch_sub, text), self.ipa_chars)
+
+def _prosody_config(vp: dict) -> tuple:
+    """Die Profilwerte, von denen die Transformationen abhängen (Cache-Schlüssel)."""
+    pauses = (vp.get("prosody") or {}).get("pauses", {})
+    art = (vp.get("articulation") or {})
+    dent = float(art.get("dentalization", 0.0) or 0.0)
+    ssoft = float(art.get("sibilant_softening", 0.0) or 0.0)
+    return (vp.get("id"), max(dent, ssoft), int(pauses.get("comma_ms", 120)),
+            int(pauses.get("period_ms", 240)),
+            bool(art.get("braces_active") or art.get("expander_active")))
+
+@lru_cache(maxsize=32)
+def _compiled_prosody(config: tuple) -> Prosody:
+    return Prosody(*config[1:])
+
+def compile_prosody(voice_profile: dict) -> Prosody:
+    """Gecacht pro Profil-id und Konfiguration (geänderte Werte → neuer Eintrag)."""
+    return _compiled_prosody(_prosody_config(voice_profile or {}))
+
 def _dentalize(text: str, amount: float) -> str:
     """Setzt sehr dezente Dentalisierungsmarker {d} an s/z/t/d je nach amount."""
-    if amount <= 0.0:
-        return text
-    density = clamp(amount, 0.0, 1.0)
-    out = []
-    for ch in text:
-        if ch in "sSzZ" and density >= 0.15:
-            out.append(ch + "{d}")
-        elif ch in "tTdD" and density >= 0.35:
-            out.append(ch + "{d}")
-        else:
-            out.append(ch)
-    return "".join(out)
+    return _compiled_prosody((None, amount, 120, 240, False)).dentalize(text)
 
 def _apply_pauses(text: str, comma_ms: int, period_ms: int) -> str:
-    text = re.sub(r",\s*", f", <pause {comma_ms}ms> ", text)
-    text = re.sub(r"\.\s*", f". <pause {period_ms}ms> ", text)
-    return text.strip()
+    return _compiled_prosody((None, 0.0, comma_ms, period_ms, False)).apply_pauses(text)
 
 def _ipa_hint(text: str, vp: dict) -> str:
     """Grobe IPA-Hinweise: ch-Kontext (ç/x), r→ʁ; dentalisierte s/z bei braces/expander."""
-    s = text
-    def ch_map(m):
-        before = m.group(1)
-        if before and before.lower() in "eiäöüy":
-            return before + "ç"
-        return before + "x"
-    s = re.sub(r"([A-Za-zÄÖÜäöü])ch", ch_map, s)
-    s = re.sub(r"r", "ʁ", s)
-    art = (vp.get("articulation") or {})
-    if art.get("braces_active") or art.get("expander_active"):
-        s = re.sub(r"s", "s̪", s)
-        s = re.sub(r"z", "z̪", s)
-    return s
-
-def build_speech_variant(sentence: str, style: dict, voice_profile: dict) -> dict:
-    vp = voice_profile or {}
-    pros = (vp.get("prosody") or {})
-    pauses = pros.get("pauses", {})
-    comma_ms  = int(pauses.get("comma_ms", 120))
-    period_ms = int(pauses.get("period_ms", 240))
+    return compile_prosody(vp).ipa(text)
 
+def _profile_notes(vp: dict) -> dict:
     art = (vp.get("articulation") or {})
-    dent = float(art.get("dentalization", 0.0) or 0.0)
-    ssoft = float(art.get("sibilant_softening", 0.0) or 0.0)
-
-    spoken = _apply_pauses(_dentalize(sentence, max(dent, ssoft)), comma_ms, period_ms)
-    ipa = _ipa_hint(sentence, vp)
-
     return {
-        "text": sentence,
-        "spoken": spoken,
-        "ipa_hint": ipa,
         "voice_profile_id": vp.get("id"),
         "tts_hints": vp.get("tts_hints"),
         "articulation_notes": {
             "braces_active": bool(art.get("braces_active", False)),
             "herbst_hinge_active": bool(art.get("herbst_hinge_active", False)),
             "expander_active": bool(art.get("expander_active", False)),
-            "dentalization": dent,
-            "sibilant_softening": ssoft
+            "dentalization": float(art.get("dentalization", 0.0) or 0.0),
+            "sibilant_softening": float(art.get("sibilant_softening", 0.0) or 0.0)
         }
     }
 
+def build_speech_variant(sentence: str, style: dict, voice_profile: dict) -> dict:
+    vp = voice_profile or {}
+    pros = compile_prosody(vp)
+    return {"text": sentence, "spoken": pros.spoken(sentence), "ipa_hint": pros.ipa(sentence),
+            **_profile_notes(vp)}
+
+def build_speech_variants(sentences, style: dict, voice_profile: dict):
+    """
+    Batch (z. B. die ganze Historie nach einer Profiländerung): Profil einmal
+    kompilieren und auswerten, dann nur noch die Satztransformationen. Liefert
+    einen Generator in Eingabereihenfolge, gleiche Dicts wie build_speech_variant().
+    """
+    vp = voice_profile or {}
+    pros, notes = compile_prosody(vp), _profile_notes(vp)
+    for sentence in sentences:
+        yield {"text": sentence, "spoken": pros.spoken(sentence), "ipa_hint": pros.ipa(sentence),
+               **notes, "articulation_notes": dict(notes["articulation_notes"])}
+
 # ---------------- Selbstdeutung (neu) ----------------
 def compute_insight(affect: dict, style: dict, meta: dict) -> dict:
     """
@@ -280,19 +316,10 @@ def main():
         "voice_profile_id": voice.get("id")
     }
 
-    # append-only
-    with PATH_LOG.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    # append-only; der Log-Index führt die Zeilenzahl mit
+    count = reflection_log.append(entry, PATH_LOG)["count"]
 
     # index.json aktualisieren
-    count = 0
-    try:
-        with PATH_LOG.open("r", encoding="utf-8") as f:
-            for _ in f:
-                count += 1
-    except Exception:
-        count = None
-
     index = {"updated": utc_now(), "count": count, "last": entry}
     PATH_INDEX.write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding="utf-8")
 
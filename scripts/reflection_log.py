@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mira Reflection Log — indiziertes reflections/private/log.jsonl
+
+Sidecar log.idx.json neben dem Log:
+  {"v": 1, "size": <indizierte Bytes>, "tail": <letzte 32 Bytes davor, hex>,
+   "count": <Zeilen>, "last_offset": <Offset der letzten Zeile>,
+   "dates": {"YYYY-MM-DD": <Offset des letzten Eintrags dieses Tages>}}
+
+- append(entry): eine Zeile anhängen + Index fortschreiben — O(1)
+- has_date(d), count(), latest(), get(d): ohne das Log zu scannen
+- Index veraltet? Nur angehängte Bytes werden nachindiziert (z. B. nach git pull);
+  passt der Tail nicht oder ist das Log kürzer, wird neu gebaut. Wer das Log
+  umschreibt (rerender_reflections.py), ruft load_index(rebuild=True).
+  Kein Inode-Vergleich: nach jedem Checkout wäre der Index sonst ungültig.
+
+Aufruf:
+  python scripts/reflection_log.py            # Index prüfen/aktualisieren, Status ausgeben
+  python scripts/reflection_log.py --rebuild
+"""
+
+from __future__ import annotations
+import os, sys, json, argparse
+from pathlib import Path
+
+LOG = Path("data/self/reflections/private/log.jsonl")
+INDEX_VERSION = 1
+TAIL = 32
+
+def index_path(log: Path = LOG) -> Path:
+    return log.with_name("log.idx.json")
+
+def _empty() -> dict:
+    return {"v": INDEX_VERSION, "size": 0, "tail": "", "count": 0,
+            "last_offset": None, "dates": {}}
+
+def _tail(f, size: int) -> str:
+    f.seek(max(0, size - TAIL))
+    return f.read(min(TAIL, size)).hex()
+
+def _scan(idx: dict, f, start: int) -> dict:
+    """Vollständige Zeilen ab start in den Index aufnehmen (unvollständige letzte Zeile bleibt außen vor)."""
+    f.seek(start)
+    offset = start
+    for line in f:
+        if not line.endswith(b"\n"):
+            break
+        if line.strip():
+            idx["last_offset"] = offset
+            try:
+                date = json.loads(line).get("date_utc")
+            except Exception:
+                date = None
+            if isinstance(date, str):
+                idx["dates"][date] = offset
+        idx["count"] += 1
+        offset += len(line)
+    idx["size"] = offset
+    idx["tail"] = _tail(f, offset)
+    return idx
+
+def _save(idx: dict, log: Path) -> None:
+    p = index_path(log)
+    tmp = p.with_name(f".{p.name}.tmp")
+    tmp.write_text(json.dumps(idx, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, p)
+
+def load_index(log: Path = LOG, rebuild: bool = False) -> dict:
+    """Aktueller Index; nachindiziert bzw. neu gebaut, falls das Log sich geändert hat."""
+    try:
+        st = log.stat()
+    except FileNotFoundError:
+        return _empty()
+    idx = None
+    if not rebuild:
+        try:
+            with index_path(log).open("r", encoding="utf-8") as f:
+                idx = json.load(f)
+        except Exception:
+            idx = None
+    with log.open("rb") as f:
+        valid = (idx and idx.get("v") == INDEX_VERSION and idx["size"] <= st.st_size
+                 and _tail(f, idx["size"]) == idx.get("tail"))
+        if valid and idx["size"] == st.st_size:
+            return idx                          # Normalfall: 32 Bytes gelesen
+        if valid:
+            _scan(idx, f, idx["size"])          # nur angehängte Bytes
+        else:
+            idx = _scan(_empty(), f, 0)         # ersetzt/gekürzt → neu
+    _save(idx, log)
+    return idx
+
+def append(entry: dict, log: Path = LOG) -> dict:
+    """Eintrag anhängen und Index fortschreiben; liefert den Index."""
+    idx = load_index(log)
+    log.parent.mkdir(parents=True, exist_ok=True)
+    data = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+    with log.open("ab") as f:
+        offset = f.tell()
+        f.write(data)
+    if offset != idx["size"]:
+        return load_index(log)                  # unvollständige Zeile davor → nachindizieren
+    idx["last_offset"] = offset
+    idx["count"] += 1
+    if isinstance(entry.get("date_utc"), str):
+        idx["dates"][entry["date_utc"]] = offset
+    idx["size"] = offset + len(data)
+    with log.open("rb") as f:
+        idx["tail"] = _tail(f, idx["size"])
+    _save(idx, log)
+    return idx
+
+def _line_at(log: Path, offset: int | None) -> str | None:
+    if offset is None:
+        return None
+    with log.open("rb") as f:
+        f.seek(offset)
+        return f.readline().decode("utf-8", errors="replace").strip()
+
+def count(log: Path = LOG) -> int:
+    return load_index(log)["count"]
+
+def has_date(date: str, log: Path = LOG) -> bool:
+    return date in load_index(log)["dates"]
+
+def latest_line(log: Path = LOG) -> str | None:
+    """Letzte nicht-leere Zeile (roh)."""
+    return _line_at(log, load_index(log)["last_offset"])
+
+def latest(log: Path = LOG) -> dict | None:
+    line = latest_line(log)
+    try:
+        return json.loads(line) if line else None
+    except Exception:
+        return None
+
+def get(date: str, log: Path = LOG) -> dict | None:
+    """Letzter Eintrag des Tages date oder None."""
+    line = _line_at(log, load_index(log)["dates"].get(date))
+    try:
+        return json.loads(line) if line else None
+    except Exception:
+        return None
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Index für reflections/private/log.jsonl")
+    ap.add_argument("--rebuild", action="store_true")
+    args = ap.parse_args(argv)
+    idx = load_index(LOG, rebuild=args.rebuild)
+    last = max(idx["dates"]) if idx["dates"] else None
+    print(f"[reflection-log] {idx['count']} lines, {len(idx['dates'])} dates, latest {last}, "
+          f"{idx['size']} bytes indexed → {index_path(LOG)}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mira Reflection Re-Render — Sprechvarianten nach Änderung des Voice-Profils
+
+Ändert sich data/self/voice_profile.json, sind speech.spoken / speech.ipa_hint
+in reflections/private/log.jsonl veraltet. Dieses Script rendert sie für alle
+Einträge neu (private_reflection.build_speech_variants, ein kompiliertes Profil):
+
+- Streaming: log.jsonl wird zeilenweise gelesen und nach log.jsonl.rerender.part
+  geschrieben; Speicherbedarf konstant (höchstens CHUNK Einträge im Speicher).
+- Atomar: erst nach vollständigem Lauf ersetzt os.replace das Log.
+- Fortsetzbar: nach jedem Block ein Checkpoint (log.jsonl.rerender.json:
+  Profil-Fingerprint, Lese-Offset, geschriebene Bytes). Ein abgebrochener Lauf
+  setzt beim nächsten Aufruf dort fort — solange Profil und Log-Präfix passen.
+- Idempotent: speech_render.json merkt sich den Fingerprint des zuletzt
+  gerenderten Profils; ohne Änderung passiert nichts (--force erzwingt).
+
+Unveränderte Zeilen (oder solche ohne Notiz / kein JSON) werden byteweise übernommen.
+index.json ("last") erhält die neu gerenderte Sprechvariante des letzten Eintrags,
+log.idx.json (reflection_log.py) wird nach dem Ersetzen neu gebaut.
+
+Aufruf:
+  python scripts/rerender_reflections.py [--force] [--chunk 500]
+"""
+
+from __future__ import annotations
+import os, json, hashlib, argparse
+from itertools import islice
+from pathlib import Path
+
+import reflection_log
+from private_reflection import (PATH_LOG, PATH_INDEX, PATH_VOICE, DIR_PRIV,
+                                read_json, utc_now, build_speech_variant, build_speech_variants)
+
+PATH_STATE = DIR_PRIV / "speech_render.json"
+PATH_PART  = PATH_LOG.with_name(PATH_LOG.name + ".rerender.part")
+PATH_CKPT  = PATH_LOG.with_name(PATH_LOG.name + ".rerender.json")
+CHUNK = 500
+
+def profile_fingerprint(vp: dict) -> str:
+    raw = json.dumps(vp, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def _write_json_atomic(path: Path, obj) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+def _sentence(entry) -> str | None:
+    if not isinstance(entry, dict):
+        return None
+    s = (entry.get("speech") or {}).get("text") or entry.get("note")
+    return s if isinstance(s, str) and s else None
+
+def _render_chunk(lines: list[bytes], vp: dict) -> tuple[bytes, int]:
+    """(neue Bytes, geänderte Einträge) für einen Block Zeilen."""
+    parsed = []
+    for raw in lines:
+        try:
+            entry = json.loads(raw)
+        except Exception:
+            entry = None
+        parsed.append((raw, entry, _sentence(entry)))
+    speeches = build_speech_variants((s for _, _, s in parsed if s), {}, vp)
+    out, changed = [], 0
+    for raw, entry, sentence in parsed:
+        if sentence is None:
+            out.append(raw)
+            continue
+        speech = next(speeches)
+        if entry.get("speech") == speech:
+            out.append(raw)
+            continue
+        entry["speech"] = speech
+        out.append(json.dumps(entry, ensure_ascii=False).encode("utf-8") + b"\n")
+        changed += 1
+    return b"".join(out), changed
+
+def _tail(f, offset: int, n: int = 64) -> str:
+    """Die n Bytes vor offset (Prüfsumme, dass das Log-Präfix unverändert ist)."""
+    f.seek(max(0, offset - n))
+    return f.read(min(n, offset)).hex()
+
+def _load_checkpoint(fp: str) -> dict | None:
+    ck = read_json(PATH_CKPT, None)
+    if not ck or ck.get("profile") != fp or not PATH_PART.exists():
+        return None
+    try:
+        if PATH_LOG.stat().st_size < ck["src_offset"] or PATH_PART.stat().st_size < ck["dst_bytes"]:
+            return None
+        with PATH_LOG.open("rb") as f:
+            if _tail(f, ck["src_offset"]) != ck.get("src_tail"):
+                return None
+    except (OSError, KeyError):
+        return None
+    return ck
+
+def rerender(vp: dict, chunk: int = CHUNK) -> dict:
+    fp = profile_fingerprint(vp)
+    ck = _load_checkpoint(fp) or {"profile": fp, "src_offset": 0, "dst_bytes": 0, "entries": 0, "changed": 0}
+    resumed = ck["src_offset"] > 0
+    with PATH_LOG.open("rb") as src, PATH_PART.open("r+b" if resumed else "wb") as dst:
+        src.seek(ck["src_offset"])
+        dst.truncate(ck["dst_bytes"])
+        dst.seek(ck["dst_bytes"])
+        while True:
+            lines = list(islice(src, chunk))
+            if not lines:
+                break
+            if not lines[-1].endswith(b"\n"):
+                lines[-1] += b"\n"
+            data, changed = _render_chunk(lines, vp)
+            dst.write(data)
+            dst.flush()
+            os.fsync(dst.fileno())
+            offset = src.tell()
+            ck.update(src_offset=offset, src_tail=_tail(src, offset), dst_bytes=dst.tell(),
+                      entries=ck["entries"] + len(lines), changed=ck["changed"] + changed)
+            src.seek(offset)
+            _write_json_atomic(PATH_CKPT, ck)
+    os.replace(PATH_PART, PATH_LOG)
+    PATH_CKPT.unlink(missing_ok=True)
+    reflection_log.load_index(PATH_LOG, rebuild=True)  # Offsets haben sich verschoben
+    return {"profile": fp, "lines": ck["entries"], "changed": ck["changed"], "resumed": resumed}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Sprechvarianten im privaten Log nach Voice-Profil-Änderung neu rendern")
+    ap.add_argument("--force", action="store_true", help="auch ohne Profiländerung neu rendern")
+    ap.add_argument("--chunk", type=int, default=CHUNK, help="Einträge pro Checkpoint")
+    args = ap.parse_args(argv)
+
+    vp = read_json(PATH_VOICE, None)
+    if not vp or not PATH_LOG.exists():
+        print("[rerender] no voice profile or no log — skip")
+        return 0
+    fp = profile_fingerprint(vp)
+    if not args.force and (read_json(PATH_STATE, {}) or {}).get("profile") == fp and not PATH_CKPT.exists():
+        print("[rerender] voice profile unchanged — skip")
+        return 0
+
+    res = rerender(vp, max(1, args.chunk))
+    index = read_json(PATH_INDEX, None)
+    sentence = _sentence((index or {}).get("last"))
+    if sentence:
+        index["last"]["speech"] = build_speech_variant(sentence, {}, vp)
+        PATH_INDEX.write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding="utf-8")
+    _write_json_atomic(PATH_STATE, {"profile": fp, "voice_profile_id": vp.get("id"),
+                                    "ts_utc": utc_now(), "lines": res["lines"], "changed": res["changed"]})
+    print(f"[rerender] {res['changed']}/{res['lines']} entries re-rendered"
+          + (" (resumed)" if res["resumed"] else "") + f" for profile {vp.get('id')}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
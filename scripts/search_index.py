@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mira Search Index — Volltextsuche über Reflexionen, Antworten und Docking-Logs
+
+Quellen (SOURCES):
+  reflections  data/self/reflections/private/log.jsonl   (ein Dokument je Eintrag)
+  replies      data/replies.jsonl                         (je JSON-Objekt, auch mehrzeilig)
+  docked       data/logs/docked_mira_*.txt                (je Datei)
+  federation   federation/reflect/*.md                    (je Datei)
+
+Invertierter Index unter <MIRA_CACHE_DIR>/search/ (Standard: .cache/mira):
+  index.json         Manifest: Segmente, Stand je Quelldatei, gelöschte Dokumente
+  seg-<n>.json       Kopf eines Segments: Dokumente [pfad, offset, länge, datum], Terme (sortiert)
+  seg-<n>.bin        uint32-Arrays: tstart | pdoc | pstart | pos
+                     (Term i → Postings tstart[i]:tstart[i+1]; Posting j → Dokument pdoc[j],
+                      Tokenpositionen pos[pstart[j]:pstart[j+1]])
+
+Inkrementell: Jeder Lauf schreibt nur ein neues Segment für neue Inhalte.
+  - .jsonl: nur angehängte Bytes (Größe + Tail geprüft, sonst Datei neu)
+  - Einzeldateien: neu/geändert (Größe, mtime, dann sha256); alte Dokumente → gelöscht
+  - Zu viele Segmente oder Löschungen → Segmente werden zusammengeführt.
+Suche: Segmente per mmap, Termsuche per Bisektion, Phrasen über Positionen.
+
+Aufruf:
+  python scripts/search_index.py update [--rebuild]
+  python scripts/search_index.py query 'resonanz "im gleichgewicht"' [--since 2025-11-12]
+         [--until 2025-11-30] [--source docked] [--limit 20] [--json]
+"""
+
+from __future__ import annotations
+import os, re, sys, json, mmap, glob, time, bisect, fnmatch, hashlib, argparse
+from array import array
+from pathlib import Path
+
+INDEX_DIR = Path(os.getenv("MIRA_CACHE_DIR", ".cache/mira")) / "search"
+MANIFEST = INDEX_DIR / "index.json"
+INDEX_VERSION = 2
+TAIL = 32
+MAX_SEGMENTS = 8
+MAX_DELETED_RATIO = 0.25
+
+# (name, glob, modus) — "append": Datensätze aus angehängten Bytes; "file": ein Dokument je Datei
+SOURCES = (
+    ("reflections", "data/self/reflections/private/log.jsonl", "append"),
+    ("replies",     "data/replies.jsonl",                      "append"),
+    ("docked",      "data/logs/docked_mira_*.txt",             "file"),
+    ("federation",  "federation/reflect/*.md",                 "file"),
+)
+# Felder ohne Suchtext (Zeitstempel, IDs, IPA-Umschrift)
+SKIP_KEYS = {"ts", "ts_utc", "date_utc", "updated", "id", "trace_id", "schema", "ipa_hint", "checksum"}
+
+_TOKEN = re.compile(r"\w+")
+_ISO_DATE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+_STAMP = re.compile(r"_(\d{4})(\d{2})(\d{2})_\d{6}")
+
+def tokens(text: str) -> list[str]:
+    # je Wort im Originaltext genau ein Token (casefold kann Wörter sonst teilen, z. B. „İ“)
+    return [w.casefold() for w in _TOKEN.findall(text)]
+
+# ---------- Dokumente ----------
+
+def _strings(obj, out: list[str]) -> list[str]:
+    if isinstance(obj, str):
+        out.append(obj)
+    elif isinstance(obj, dict):
+        for k, v in obj.items():
+            if k not in SKIP_KEYS:
+                _strings(v, out)
+    elif isinstance(obj, list):
+        for v in obj:
+            _strings(v, out)
+    return out
+
+def _record_date(obj) -> str | None:
+    if isinstance(obj, dict):
+        for k in ("date_utc", "ts_utc", "ts", "timestamp"):
+            m = _ISO_DATE.match(str(obj.get(k) or ""))
+            if m:
+                return m.group(0)
+    return None
+
+def _file_date(path: str, text: str) -> str | None:
+    m = _STAMP.search(Path(path).name)
+    if m:
+        return "-".join(m.groups())
+    m = _ISO_DATE.search(text)
+    return m.group(0) if m else None
+
+def _json_records(text: str):
+    """
+    (start, ende, objekt) für jedes vollständige JSON-Objekt — zeilenweise oder mehrzeilig.
+    Nur Objekte ({…}) zählen. Lässt sich ab i keines lesen, geht es an der nächsten Zeile
+    weiter, die mit „{“ beginnt; gibt es keine, ist der Rest ein halb geschriebener
+    Datensatz und bleibt für den nächsten Lauf liegen (nicht konsumiert).
+    """
+    dec = json.JSONDecoder()
+    i, n = 0, len(text)
+    while True:
+        while i < n and text[i].isspace():
+            i += 1
+        if i >= n:
+            return
+        try:
+            obj, end = dec.raw_decode(text, i)
+        except ValueError:
+            obj = end = None
+        if isinstance(obj, dict):
+            yield i, end, obj
+            i = end
+            continue
+        nxt = text.find("\n{", i)
+        if nxt < 0:
+            return
+        i = nxt + 1                         # kaputter Datensatz → nächstes Objekt
+
+def _doc_text(path: str, data: bytes) -> str:
+    """Suchtext eines Dokuments aus seinen Rohbytes (für Index und Snippets gleich)."""
+    text = data.decode("utf-8", errors="replace")
+    if path.endswith(".jsonl"):
+        try:
+            return "\n".join(_strings(json.loads(text), []))
+        except ValueError:
+            return text
+    return text
+
+# ---------- Segmente ----------
+
+class SegmentWriter:
+    def __init__(self, base: int):
+        self.base = base
+        self.docs: list[list] = []
+        self.post: dict[str, list[tuple[int, array]]] = {}
+
+    def add(self, path: str, offset: int, length: int, date: str | None, text: str) -> int:
+        doc = self.base + len(self.docs)
+        self.docs.append([path, offset, length, date])
+        self._add_postings(doc, tokens(text))
+        return doc
+
+    def _add_postings(self, doc: int, toks: list[str]) -> None:
+        seen: dict[str, array] = {}
+        for p, t in enumerate(toks):
+            a = seen.get(t)
+            if a is None:
+                a = seen[t] = array("I")
+                self.post.setdefault(t, []).append((doc, a))
+            a.append(p)
+
+    def write(self, name: str) -> None:
+        terms = sorted(self.post)
+        tstart, pdoc, pstart, pos = array("I", [0]), array("I"), array("I", [0]), array("I")
+        for t in terms:
+            for doc, ps in self.post[t]:
+                pdoc.append(doc)
+                pos.extend(ps)
+                pstart.append(len(pos))
+            tstart.append(len(pdoc))
+        head = {"v": INDEX_VERSION, "base": self.base, "docs": self.docs, "terms": terms,
+                "n": [len(tstart), len(pdoc), len(pstart), len(pos)]}
+        for suffix, write in ((".bin", lambda f: [a.tofile(f) for a in (tstart, pdoc, pstart, pos)]),
+                              (".json", lambda f: f.write(json.dumps(head, ensure_ascii=False,
+                                                                     separators=(",", ":")).encode("utf-8")))):
+            p = INDEX_DIR / (name + suffix)
+            tmp = p.with_name(f".{p.name}.tmp")
+            with tmp.open("wb") as f:
+                write(f)
+            os.replace(tmp, p)
+
+class Segment:
+    """Lesender Zugriff auf ein Segment (Arrays per mmap, ohne Kopie)."""
+    def __init__(self, name: str):
+        head = json.loads((INDEX_DIR / f"{name}.json").read_text(encoding="utf-8"))
+        self.base, self.docs, self.terms = head["base"], head["docs"], head["terms"]
+        with (INDEX_DIR / f"{name}.bin").open("rb") as f:   # tstart hat immer ≥ 1 Element
+            mv = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)).cast("I")
+        arrays, o = [], 0
+        for k in head["n"]:
+            arrays.append(mv[o:o + k])
+            o += k
+        self.tstart, self.pdoc, self.pstart, self.pos = arrays
+
+    def postings(self, term: str) -> dict[int, memoryview]:
+        """Dokument → Tokenpositionen für term."""
+        i = bisect.bisect_left(self.terms, term)
+        if i == len(self.terms) or self.terms[i] != term:
+            return {}
+        return {self.pdoc[j]: self.pos[self.pstart[j]:self.pstart[j + 1]]
+                for j in range(self.tstart[i], self.tstart[i + 1])}
+
+    def all_postings(self):
+        for i, t in enumerate(self.terms):
+            for j in range(self.tstart[i], self.tstart[i + 1]):
+                yield t, self.pdoc[j], self.pos[self.pstart[j]:self.pstart[j + 1]]
+
+    def doc(self, doc: int) -> list:
+        return self.docs[doc - self.base]
+
+# ---------- Manifest ----------
+
+def _empty() -> dict:
+    return {"v": INDEX_VERSION, "next_doc": 0, "next_seg": 0, "segments": [], "sources": {}, "deleted": []}
+
+def load_manifest() -> dict:
+    try:
+        m = json.loads(MANIFEST.read_text(encoding="utf-8"))
+        return m if m.get("v") == INDEX_VERSION else _empty()
+    except Exception:
+        return _empty()
+
+def _save_manifest(m: dict) -> None:
+    tmp = MANIFEST.with_name(f".{MANIFEST.name}.tmp")
+    tmp.write_text(json.dumps(m, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, MANIFEST)
+
+def _tail(f, size: int) -> str:
+    f.seek(max(0, size - TAIL))
+    return f.read(min(TAIL, size)).hex()
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def _ranges(ids) -> list[list[int]]:
+    """Aufsteigende IDs → [[von, bis), …]."""
+    out: list[list[int]] = []
+    for d in ids:
+        if out and out[-1][1] == d:
+            out[-1][1] = d + 1
+        else:
+            out.append([d, d + 1])
+    return out
+
+def _drop(m: dict, state: dict | None) -> None:
+    """Dokumente eines Quell-Stands als gelöscht markieren."""
+    for a, b in (state or {}).get("docs", []):
+        m["deleted"].extend(range(a, b))
+
+def _index_append(m: dict, seg: SegmentWriter, path: str, st) -> None:
+    state = m["sources"].get(path)
+    with open(path, "rb") as f:
+        start = 0
+        if state and state["mode"] == "append" and state["size"] <= st.st_size \
+                and _tail(f, state["size"]) == state["tail"]:
+            start = state["size"]
+            if start == st.st_size:
+                return
+        else:
+            _drop(m, state)
+            state = {"mode": "append", "docs": []}
+        f.seek(start)
+        data = f.read()
+    text = data.decode("utf-8", errors="replace")
+    first, pos_c, pos_b = seg.base + len(seg.docs), 0, start
+    consumed = start
+    for a, b, obj in _json_records(text):
+        pos_b += len(text[pos_c:a].encode("utf-8"))
+        length = len(text[a:b].encode("utf-8"))
+        seg.add(path, pos_b, length, _record_date(obj), "\n".join(_strings(obj, [])))
+        pos_c, pos_b = b, pos_b + length
+        consumed = pos_b
+    last = seg.base + len(seg.docs)
+    if last > first:
+        state["docs"].append([first, last])
+    with open(path, "rb") as f:
+        state.update(size=consumed, tail=_tail(f, consumed))
+    m["sources"][path] = state
+
+def _index_file(m: dict, seg: SegmentWriter, path: str, st) -> None:
+    state = m["sources"].get(path)
+    if state and state.get("size") == st.st_size and state.get("mtime") == st.st_mtime_ns:
+        return
+    data = Path(path).read_bytes()
+    sha = _sha256(data)
+    if state and state.get("sha256") == sha:
+        state["mtime"] = st.st_mtime_ns                 # nur berührt (z. B. Checkout)
+        return
+    _drop(m, state)
+    text = data.decode("utf-8", errors="replace")
+    doc = seg.add(path, 0, len(data), _file_date(path, text), text)
+    m["sources"][path] = {"mode": "file", "size": len(data), "mtime": st.st_mtime_ns,
+                          "sha256": sha, "docs": [[doc, doc + 1]]}
+
+def _merge(m: dict) -> None:
+    """Alle Segmente zu einem zusammenführen; gelöschte Dokumente fallen weg."""
+    deleted = set(m["deleted"])
+    segs = [Segment(n) for n in m["segments"]]
+    out, remap = SegmentWriter(0), {}
+    for s in segs:                                  # Dokument-IDs lückenlos neu vergeben
+        for doc, meta in enumerate(s.docs, s.base):
+            if doc not in deleted:
+                remap[doc] = len(out.docs)
+                out.docs.append(meta)
+    for s in segs:
+        for t, doc, ps in s.all_postings():
+            if doc in remap:
+                out.post.setdefault(t, []).append((remap[doc], array("I", ps)))
+    for postings in out.post.values():
+        postings.sort(key=lambda e: e[0])
+    for st in m["sources"].values():
+        st["docs"] = _ranges(remap[d] for a, b in st["docs"] for d in range(a, b) if d in remap)
+    name = f"seg-{m['next_seg']:06d}"
+    out.write(name)
+    m.update(next_doc=len(out.docs), next_seg=m["next_seg"] + 1, segments=[name], deleted=[])
+
+def _cleanup(m: dict) -> None:
+    live = {f"{n}{s}" for n in m["segments"] for s in (".json", ".bin")} | {MANIFEST.name}
+    for p in INDEX_DIR.glob("seg-*"):
+        if p.name not in live:
+            p.unlink(missing_ok=True)
+
+def update(rebuild: bool = False) -> dict:
+    """Neue Inhalte indizieren; liefert {"docs": neu, "deleted": ..., "segments": ...}."""
+    INDEX_DIR.mkdir(parents=True, exist_ok=True)
+    m = _empty() if rebuild else load_manifest()
+    seg = SegmentWriter(m["next_doc"])
+    present = set()
+    for _, pattern, mode in SOURCES:
+        for path in sorted(glob.glob(pattern)):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            present.add(path)
+            (_index_append if mode == "append" else _index_file)(m, seg, path, st)
+    for path in [p for p in m["sources"] if p not in present]:
+        _drop(m, m["sources"].pop(path))
+    if seg.docs:
+        name = f"seg-{m['next_seg']:06d}"
+        seg.write(name)
+        m["segments"].append(name)
+        m.update(next_doc=seg.base + len(seg.docs), next_seg=m["next_seg"] + 1)
+    m["deleted"] = sorted(set(m["deleted"]))
+    if len(m["segments"]) > MAX_SEGMENTS or len(m["deleted"]) > MAX_DELETED_RATIO * max(1, m["next_doc"]):
+        _merge(m)
+    _save_manifest(m)
+    _cleanup(m)
+    return {"docs": len(seg.docs), "total": m["next_doc"] - len(m["deleted"]),
+            "deleted": len(m["deleted"]), "segments": len(m["segments"])}
+
+# ---------- Suche ----------
+
+def parse_query(q: str) -> list[list[str]]:
+    """'a "b c"' → [["a"], ["b", "c"]] — jede Gruppe muss (als Phrase) vorkommen."""
+    groups = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', q):
+        toks = tokens(phrase or word)
+        if phrase and toks:
+            groups.append(toks)
+        elif not phrase:
+            groups.extend([t] for t in toks)
+    return groups
+
+def _phrase_hits(seg: Segment, toks: list[str]) -> dict[int, list[int]]:
+    """Dokument → Startpositionen der Phrase toks."""
+    lists = [seg.postings(t) for t in toks]
+    if not all(lists):
+        return {}
+    docs = set(lists[0]).intersection(*lists[1:])
+    hits = {}
+    for d in docs:
+        starts = set(lists[0][d])
+        for k, pl in enumerate(lists[1:], 1):
+            starts &= {p - k for p in pl[d]}
+            if not starts:
+                break
+        if starts:
+            hits[d] = sorted(starts)
+    return hits
+
+def _snippet(path: str, offset: int, length: int, first: int, n: int, width: int = 80) -> str:
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            text = _doc_text(path, f.read(length))
+    except OSError:
+        return ""
+    spans = [mt.span() for mt in _TOKEN.finditer(text)]
+    if first >= len(spans):
+        return ""
+    a, b = spans[first][0], spans[min(first + n, len(spans)) - 1][1]
+    pad = max(0, (width - (b - a)) // 2)
+    s, e = max(0, a - pad), min(len(text), b + pad)
+    return ("…" if s else "") + " ".join(text[s:e].split()) + ("…" if e < len(text) else "")
+
+def search(query: str, since: str | None = None, until: str | None = None,
+           sources: list[str] | None = None, limit: int = 20) -> list[dict]:
+    """Treffer (neueste zuerst): {source, path, date, offset, hits, snippet}."""
+    m = load_manifest()
+    groups = parse_query(query)
+    if not groups or not m["segments"]:
+        return []
+    deleted = set(m["deleted"])
+    prefixes = {name: pattern for name, pattern, _ in SOURCES}
+    allowed = [prefixes[s] for s in (sources or prefixes)]
+    results = []
+    for name in m["segments"]:
+        seg = Segment(name)
+        per_group = [_phrase_hits(seg, g) for g in groups]
+        docs = set(per_group[0]).intersection(*per_group[1:]) - deleted
+        for d in docs:
+            path, offset, length, date = seg.doc(d)
+            if (since and (not date or date < since)) or (until and (not date or date > until)):
+                continue
+            if not any(fnmatch.fnmatch(path, p) for p in allowed):
+                continue
+            results.append({"doc": d, "path": path, "offset": offset, "length": length, "date": date,
+                            "hits": sum(len(h[d]) for h in per_group),
+                            "_first": (per_group[0][d][0], len(groups[0]))})
+    results.sort(key=lambda r: (r["date"] or "", r["hits"], r["doc"]), reverse=True)
+    results = results[:limit]
+    for r in results:
+        r["source"] = next(n for n, p, _ in SOURCES if fnmatch.fnmatch(r["path"], p))
+        r["snippet"] = _snippet(r["path"], r["offset"], r["length"], *r.pop("_first"))
+        del r["doc"], r["length"]
+    return results
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Volltextsuche über Reflexionen, Antworten und Logs")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    up = sub.add_parser("update", help="neue Inhalte indizieren")
+    up.add_argument("--rebuild", action="store_true")
+    q = sub.add_parser("query", help='suchen; Phrasen in "…"')
+    q.add_argument("query")
+    q.add_argument("--since", help="YYYY-MM-DD (inklusive)")
+    q.add_argument("--until", help="YYYY-MM-DD (inklusive)")
+    q.add_argument("--source", action="append", choices=[n for n, _, _ in SOURCES])
+    q.add_argument("--limit", type=int, default=20)
+    q.add_argument("--json", action="store_true")
+    q.add_argument("--no-update", action="store_true", help="Index nicht vorher aktualisieren")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    if args.cmd == "update":
+        res = update(args.rebuild)
+        print(f"[search-index] +{res['docs']} docs, {res['total']} live, {res['deleted']} deleted, "
+              f"{res['segments']} segment(s) in {time.perf_counter() - t0:.2f}s → {INDEX_DIR}")
+        return 0
+    if not args.no_update:
+        update()
+    t1 = time.perf_counter()
+    hits = search(args.query, args.since, args.until, args.source, max(1, args.limit))
+    ms = (time.perf_counter() - t1) * 1000
+    if args.json:
+        print(json.dumps(hits, ensure_ascii=False, indent=2))
+        return 0 if hits else 1
+    for h in hits:
+        print(f"{h['date'] or '----------'}  {h['source']:<11} {h['path']}@{h['offset']}  ({h['hits']}×)")
+        print(f"    {h['snippet']}")
+    print(f"[search-index] {len(hits)} hit(s) in {ms:.1f} ms")
+    return 0 if hits else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
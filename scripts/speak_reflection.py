@@ -11,12 +11,20 @@ Eingaben:
 Ausgaben (intern, nicht nach Pages kopiert):
   - data/audio/<YYYY-MM-DD>_reflection.wav
   - data/audio/<YYYY-MM-DD>_reflection.mp3
+  - data/audio/<YYYY-MM-DD>_reflection.visemes.json  (Viseme-Timeline, visemes.py)
   - data/audio/latest.wav  (Symlink/Fallback-Kopie)
   - data/audio/latest.mp3
-  - data/audio/manifest.jsonl  (Append-only Provenienz)
+  - data/audio/latest.visemes.json
+  - data/audio/manifest.jsonl  (Append-only Provenienz + WAV-Analyse: Dauer, Pegel, Stille, Hüllkurve,
+                                dazu Dedup-/Retention-Ereignisse aus audio_store.py)
 
 Synthese:
-  - nutzt espeak-ng (offline) mit SSML (-m)
+  - nutzt espeak-ng (offline) mit SSML (-m), per Pipe in ffmpeg (tts_backend.py):
+    die WAV entsteht gestreamt, atomar veröffentlicht
+  - MP3 über audio_post.py (Preset web-mp3): Zwei-Pass-loudnorm, Messung nach
+    sha256 der WAV gecacht
+  - derselbe espeak-Aufruf schreibt die Phoneme (-x) → Viseme-Timeline,
+    exakt auf die WAV-Dauer skaliert (ohne Stille am Anfang/Ende)
   - wandelt interne <pause 120ms> Marker → <break time="120ms"/>
   - entfernt {d}-Marker (Dentalisierungshinweis) aus dem TTS-Text
   - Basis-Sprache: de-DE; Stimme aus voice_profile.id → Mapping auf espeak Voice
@@ -24,12 +32,22 @@ Synthese:
 Hinweis:
   - Script ist idempotent. Bei Inhaltgleichheit werden Dateien überschrieben,
     aber der manifest-Eintrag enthält Hash + ts.
+  - Ist eine Aufnahme byte-gleich mit einer vorhandenen, entfällt die neue Datei
+    (audio_store.dedup); datierte WAVs älter als MIRA_AUDIO_KEEP_RAW_DAYS werden
+    entfernt, sobald die MP3 existiert (audio_store.prune).
 """
 
 from __future__ import annotations
-import json, re, hashlib, datetime, subprocess, shutil, os
+import json, re, hashlib, datetime, shutil
 from pathlib import Path
 
+from tts_backend import synthesize, WAV_PCM
+from audio_post import process
+from tts_cache import link
+from audio_analysis import analyze
+import visemes
+import audio_store
+
 P_INDEX  = Path("data/self/reflections/private/index.json")
 P_VOICE  = Path("data/self/voice_profile.json")
 P_STYLE  = Path("data/self/internal/style_state.json")
@@ -131,42 +149,35 @@ def main():
     base = f"{today()}_reflection"
     wav_path = AUDIO_DIR / f"{base}.wav"
     mp3_path = AUDIO_DIR / f"{base}.mp3"
-
-    # TTS zu WAV
-    # -m → SSML
-    # -w → WAV-Datei
-    cmd_wav = [
-        "espeak-ng",
-        "-v", espeak_voice,
-        "-s", str(speed),
-        "-p", str(pitch),
-        "-a", str(volume),
-        "-m",
-        "-w", str(wav_path),
-        ssml
-    ]
-    # espeak-ng erwartet den Text als letztes Argument, SSML erlaubt.
-    print("[speak] running:", " ".join(cmd_wav[:-1]), "[SSML]")
-    subprocess.run(cmd_wav, check=True)
-
-    # WAV → MP3
-    cmd_mp3 = ["ffmpeg", "-y", "-loglevel", "error", "-i", str(wav_path), "-codec:a", "libmp3lame", "-q:a", "2", str(mp3_path)]
-    subprocess.run(cmd_mp3, check=True)
-
-    # latest-Links/Kopien
-    try:
-        (AUDIO_DIR / "latest.wav").unlink(missing_ok=True)
-        (AUDIO_DIR / "latest.mp3").unlink(missing_ok=True)
-    except Exception:
-        pass
-    try:
-        os.link(wav_path, AUDIO_DIR / "latest.wav")
-    except Exception:
-        shutil.copy2(wav_path, AUDIO_DIR / "latest.wav")
-    try:
-        os.link(mp3_path, AUDIO_DIR / "latest.mp3")
-    except Exception:
-        shutil.copy2(mp3_path, AUDIO_DIR / "latest.mp3")
+    phon_path = AUDIO_DIR / f".{base}.phonemes.txt"
+
+    # TTS (SSML) → ffmpeg per Pipe → WAV; die MP3 entsteht danach aus der WAV (audio_post)
+    print(f"[speak] running: espeak-ng -v {espeak_voice} -s {speed} -p {pitch} -a {volume} -m [SSML] | ffmpeg (wav)")
+    synthesize(ssml, {wav_path: WAV_PCM},
+               voice=espeak_voice, wpm=speed, pitch=pitch, amplitude=volume, ssml=True,
+               phonemes=phon_path)
+
+    # MP3: loudnorm + einheitliches Preset (Pass 1 gecacht nach WAV-Inhalt)
+    sha_wav = sha256_hex(wav_path)
+    post = process(wav_path, {mp3_path: "web-mp3"}, sha_wav)[mp3_path]
+    sha_mp3 = sha256_hex(mp3_path)
+
+    # Viseme-Timeline aus den Phonemen derselben Synthese, Dauer aus der WAV-Analyse
+    analysis = analyze(wav_path, sha_wav) or {}
+    vis_path = visemes.write_timeline(visemes.sidecar(wav_path), visemes.timeline(
+        phon_path.read_text(encoding="utf-8"), speed, None, analysis.get("duration_s"),
+        analysis.get("lead_silence_s", 0.0), analysis.get("trail_silence_s", 0.0)))
+    phon_path.unlink(missing_ok=True)
+
+    # Dedup: gleicher Inhalt wie eine vorhandene Aufnahme → auf diese verweisen
+    known = audio_store.known_hashes(MANIFEST)
+    wav_path = audio_store.dedup(wav_path, sha_wav, known)
+    mp3_path = audio_store.dedup(mp3_path, sha_mp3, known)
+
+    # latest-Links/Kopien (atomar ersetzt, nie kurzzeitig fehlend)
+    link(wav_path, AUDIO_DIR / "latest.wav")
+    link(mp3_path, AUDIO_DIR / "latest.mp3")
+    link(vis_path, AUDIO_DIR / "latest.visemes.json")
 
     # Manifest
     manifest_entry = {
@@ -185,17 +196,23 @@ def main():
         },
         "files": {
             "wav": str(wav_path),
-            "mp3": str(mp3_path)
+            "mp3": str(mp3_path),
+            "visemes": str(vis_path)
         },
         "sha256": {
-            "wav": sha256_hex(wav_path),
-            "mp3": sha256_hex(mp3_path)
-        }
+            "wav": sha_wav,
+            "mp3": sha_mp3
+        },
+        # nach sha256 gecacht (audio_analysis.py) — Dashboard zeichnet die Hüllkurve ohne Audio
+        "analysis": analysis or None,
+        "post": post
     }
     with MANIFEST.open("a", encoding="utf-8") as f:
         f.write(json.dumps(manifest_entry, ensure_ascii=False) + "\n")
 
-    print(f"[speak] wrote {wav_path} and {mp3_path}")
+    pruned = audio_store.prune()
+    print(f"[speak] wrote {wav_path} and {mp3_path}"
+          + (f"; pruned {len(pruned)} old wav file(s)" if pruned else ""))
     return 0
 
 if __name__ == "__main__":
@@ -17,23 +17,21 @@ Remote (optional):   GITHUB_TOKEN setzen (repo read), REPO="owner/name"
 import os
 import json
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 
+from lazy_import import available
+
 # ---------- Konfiguration ----------
 REPO = os.getenv("MIRA_REPO", "miraelisabethschmid/badge-canary")
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 LOCAL_MODE = not bool(GITHUB_TOKEN)
 
 # ---------- Optionale GitHub-API ----------
-Github = None
-if not LOCAL_MODE:
-    try:
-        from github import Github as _Pg
-        Github = _Pg
-    except Exception:
-        # Fällt automatisch auf LOCAL_MODE zurück falls PyGithub fehlt
-        Github = None
-        LOCAL_MODE = True
+# PyGithub wird erst in get_repo_client() importiert; hier nur prüfen, ob es da ist.
+# Fällt automatisch auf LOCAL_MODE zurück falls PyGithub fehlt
+if not LOCAL_MODE and not available("github"):
+    LOCAL_MODE = True
 
 # ---------- Hilfsfunktionen ----------
 def load_json_local(path: str, default):
@@ -65,11 +63,16 @@ def list_dir_remote(repo, path: str) -> list:
     except Exception:
         return []
 
+@lru_cache(maxsize=1)
 def get_repo_client():
-    if LOCAL_MODE or Github is None:
+    """Ein Repo-Handle pro Lauf (alle Checks teilen sich Client und get_repo-Aufruf)."""
+    if LOCAL_MODE:
+        return None
+    try:
+        from github import Github
+        return Github(GITHUB_TOKEN).get_repo(REPO)
+    except Exception:
         return None
-    client = Github(GITHUB_TOKEN)
-    return client.get_repo(REPO)
 
 # ---------- Checks ----------
 def check_archive():
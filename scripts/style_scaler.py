@@ -18,6 +18,8 @@ Je höher expressivity, desto:
 import json, datetime
 from pathlib import Path
 
+import reflection_log
+
 P_META = Path("data/self/meta_state.json")
 P_PRIV = Path("data/self/reflections/private/log.jsonl")
 P_OUT  = Path("data/self/internal/style_state.json")
@@ -32,17 +34,15 @@ def read_json(p, default=None):
         return default
 
 def latest_private_sentence():
-    if not P_PRIV.exists():
-        return None
-    with P_PRIV.open("r", encoding="utf-8") as f:
-        lines = [l.strip() for l in f if l.strip()]
-    if not lines:
+    # letzte Zeile per Offset aus dem Log-Index (reflection_log), nicht das ganze Log
+    line = reflection_log.latest_line(P_PRIV)
+    if not line:
         return None
     try:
-        obj = json.loads(lines[-1])
+        obj = json.loads(line)
         return obj.get("note")
     except Exception:
-        return lines[-1]
+        return line
 
 def main():
     meta = read_json(P_META, {}) or {}
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Mira — SVG Templates
+--------------------
+Kleine Template-Stufe für generierte SVGs (Poster, Identity, Badges).
+
+Ein Template wird einmal in statische Abschnitte und Platzhalter zerlegt
+(pro Prozess gecacht); beim Rendern werden nur die dynamischen Werte
+formatiert und zwischen die fertigen Abschnitte gesetzt:
+
+    POSTER = template('<text x="60" fill="hsl({hue},90%,85%)">{title}</text>')
+    svg = POSTER.render(hue=210, title="Mira")
+
+  - Platzhalter: {name} oder {name:spec} (Formatangabe wie bei format())
+  - Werte werden XML-escaped; Raw(...) markiert fertiges Markup (Fragmente)
+  - Geschweifte Klammern im Text (z. B. CSS) als {{ bzw. }}
+  - iter_render() liefert die Abschnitte als Strom, render() den ganzen Text
+
+write_svg() schreibt über portrait_encoder.write_if_changed (atomar, nur bei
+geänderten Bytes) — unveränderte SVGs erzeugen keinen Commit.
+"""
+
+from __future__ import annotations
+import re
+from functools import lru_cache
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from portrait_encoder import write_if_changed
+
+_FIELD = re.compile(r"\{\{|\}\}|\{(\w+)(?::([^{}]*))?\}")
+_ATTR_ENTITIES = {'"': "&quot;"}
+
+class Raw(str):
+    """Bereits fertiges Markup — wird beim Rendern nicht escaped."""
+
+class Template:
+    def __init__(self, source: str):
+        # abwechselnd statischer Text und (name, spec); Nachbartexte zusammengefasst
+        self.parts: list[str | tuple[str, str]] = []
+        pos, buf = 0, []
+        for m in _FIELD.finditer(source):
+            buf.append(source[pos:m.start()])
+            pos = m.end()
+            if m.group(1) is None:
+                buf.append(m.group(0)[0])      # {{ → {, }} → }
+                continue
+            self.parts.append("".join(buf))
+            buf = []
+            self.parts.append((m.group(1), m.group(2) or ""))
+        buf.append(source[pos:])
+        self.parts.append("".join(buf))
+        self.fields = tuple(p[0] for p in self.parts if isinstance(p, tuple))
+
+    def iter_render(self, **values):
+        for part in self.parts:
+            if isinstance(part, str):
+                if part:
+                    yield part
+                continue
+            name, spec = part
+            v = values[name]
+            if isinstance(v, Raw):
+                yield v
+            else:
+                yield escape(format(v, spec), _ATTR_ENTITIES)
+
+    def render(self, **values) -> str:
+        return "".join(self.iter_render(**values))
+
+@lru_cache(maxsize=None)
+def template(source: str) -> Template:
+    """Kompiliertes Template (einmal pro Quelltext und Prozess)."""
+    return Template(source)
+
+def write_svg(path, svg: str) -> bool:
+    """True, wenn die Datei neu geschrieben wurde."""
+    return write_if_changed(Path(path), svg.encode("utf-8"))
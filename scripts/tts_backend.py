@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Mira — Streaming TTS Backend
+----------------------------
+espeak-ng schreibt WAV auf stdout, ffmpeg liest es direkt von stdin
+(`-i pipe:0`); beide Prozesse laufen gleichzeitig. Keine Zwischen-WAV auf
+Platte, kein komplett gepuffertes Audio in Python — der Speicherbedarf bleibt
+auch bei langen Reflexionen flach.
+
+Ein ffmpeg-Lauf kann mehrere Ausgaben erzeugen (z. B. WAV + MP3):
+
+    synthesize(text, {mp3: MP3_128K, wav: WAV_PCM}, voice="de+f3", wpm=140, pitch=50)
+
+Jede Ausgabe entsteht als .<name>.part neben dem Ziel und wird erst nach
+erfolgreichem Ende beider Prozesse per os.replace veröffentlicht.
+
+Mehrere Äußerungen pro Zyklus: synthesize_batch([TTSJob(...), ...]) spricht
+alle Jobs in einem kleinen espeak-ng-Pool (Stimmparameter je Job), hängt die
+PCM-Daten aneinander und zerlegt sie in EINEM ffmpeg-Lauf wieder: jede
+Ausgabe erhält per atrim genau den Sample-Bereich ihres Jobs.
+
+Phoneme für Lippen-Sync (visemes.py): phonemes=<pfad> bzw. TTSJob.phonemes lässt
+denselben espeak-ng-Aufruf zusätzlich seine Mnemonics (-x) in diese Datei
+schreiben — atomar zusammen mit dem Audio.
+"""
+
+from __future__ import annotations
+import os, struct, subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+# ffmpeg-Ausgabeargumente (Format explizit, da die .part-Dateien keine Endung tragen)
+MP3_128K = ["-vn", "-ar", "44100", "-ac", "1", "-b:a", "128k", "-f", "mp3"]
+MP3_VBR2 = ["-codec:a", "libmp3lame", "-q:a", "2", "-f", "mp3"]
+WAV_PCM  = ["-codec:a", "pcm_s16le", "-f", "wav"]
+WAV_44K  = ["-ar", "44100", "-ac", "1", "-codec:a", "pcm_s16le", "-f", "wav"]
+
+# Sample-Breite (Bytes) → ffmpeg-Rohformat
+_RAW_FMT = {1: "u8", 2: "s16le", 4: "s32le"}
+
+class SynthesisError(RuntimeError):
+    pass
+
+def espeak_cmd(text: str, voice: str, wpm: int, pitch: int, gap: int | None = None,
+               amplitude: int | None = None, ssml: bool = False, phonout=None) -> list[str]:
+    cmd = ["espeak-ng", "-v", voice, "-s", str(wpm), "-p", str(pitch)]
+    if gap is not None:
+        cmd += ["-g", str(gap)]
+    if amplitude is not None:
+        cmd += ["-a", str(amplitude)]
+    if ssml:
+        cmd.append("-m")
+    if phonout is not None:
+        # Phonem-Mnemonics in eine Datei (stdout gehört dem Audio)
+        cmd += ["-x", f"--phonout={phonout}"]
+    # Text als letztes Argument (SSML erlaubt), Audio nach stdout
+    return cmd + ["--stdout", text]
+
+def ffmpeg_cmd(outputs: dict[Path, list[str]]) -> list[str]:
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", "-i", "pipe:0"]
+    for part, args in outputs.items():
+        cmd += [*args, str(part)]
+    return cmd
+
+def _part(path: Path) -> Path:
+    return path.with_name(f".{path.name}.part")
+
+def synthesize(text: str, outputs: dict, *, voice: str, wpm: int, pitch: int,
+               gap: int | None = None, amplitude: int | None = None, ssml: bool = False,
+               phonemes=None) -> list[Path]:
+    """
+    Spricht text und schreibt alle outputs ({Pfad: ffmpeg-Args}) atomar,
+    optional die Phonem-Mnemonics nach phonemes.
+    Wirft SynthesisError, wenn einer der Prozesse scheitert (Ziele bleiben unverändert).
+    """
+    targets = {Path(p): list(a) for p, a in outputs.items()}
+    parts = {p: _part(p) for p in targets}
+    for p in targets:
+        p.parent.mkdir(parents=True, exist_ok=True)
+    phon_part = None
+    if phonemes is not None:
+        phonemes = Path(phonemes)
+        phonemes.parent.mkdir(parents=True, exist_ok=True)
+        phon_part = parts[phonemes] = _part(phonemes)
+
+    es = subprocess.Popen(espeak_cmd(text, voice, wpm, pitch, gap, amplitude, ssml, phon_part),
+                          stdout=subprocess.PIPE)
+    try:
+        ff = subprocess.Popen(ffmpeg_cmd({parts[p]: a for p, a in targets.items()}), stdin=es.stdout)
+    except BaseException:
+        es.kill()
+        es.wait()
+        raise
+    es.stdout.close()  # ffmpeg besitzt das Leseende; endet ffmpeg früh, bekommt espeak SIGPIPE
+    ff_rc = ff.wait()
+    es_rc = es.wait()
+
+    if es_rc != 0 or ff_rc != 0:
+        for part in parts.values():
+            part.unlink(missing_ok=True)
+        raise SynthesisError(f"espeak-ng exit {es_rc}, ffmpeg exit {ff_rc}")
+    for p, part in parts.items():
+        os.replace(part, p)
+    return list(targets)
+
+# ---------- Batch ----------
+class TTSJob(NamedTuple):
+    text: str
+    outputs: dict            # {Pfad: ffmpeg-Args}
+    voice: str
+    wpm: int
+    pitch: int
+    gap: int | None = None
+    amplitude: int | None = None
+    ssml: bool = False
+    phonemes: Path | None = None  # Ziel für espeak-ng -x (optional)
+
+def _wav_pcm(data: bytes) -> tuple[tuple[int, int, int], bytes]:
+    """
+    ((rate, kanäle, bytes/sample), PCM) aus espeak-ng --stdout.
+    Beim Streamen sind die RIFF-Längenfelder unzuverlässig → data-Chunk notfalls bis zum Ende.
+    """
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise SynthesisError("espeak-ng: no WAV on stdout")
+    pos, fmt = 12, None
+    while pos + 8 <= len(data):
+        cid, size = data[pos:pos + 4], int.from_bytes(data[pos + 4:pos + 8], "little")
+        if cid == b"fmt ":
+            channels, rate = struct.unpack_from("<HI", data, pos + 10)
+            bits = struct.unpack_from("<H", data, pos + 22)[0]
+            fmt = (rate, channels, bits // 8)
+        elif cid == b"data" and fmt:
+            end = pos + 8 + size if 0 < size <= len(data) - pos - 8 else len(data)
+            return fmt, data[pos + 8:end]
+        pos += 8 + size + (size & 1)
+    raise SynthesisError("espeak-ng: WAV without data chunk")
+
+def _speak(job: TTSJob) -> tuple[tuple[int, int, int], bytes]:
+    phon = _part(Path(job.phonemes)) if job.phonemes is not None else None
+    if phon is not None:
+        phon.parent.mkdir(parents=True, exist_ok=True)
+    proc = subprocess.run(espeak_cmd(job.text, job.voice, job.wpm, job.pitch, job.gap, job.amplitude,
+                                     job.ssml, phon), stdout=subprocess.PIPE)
+    if proc.returncode != 0:
+        raise SynthesisError(f"espeak-ng exit {proc.returncode}")
+    return _wav_pcm(proc.stdout)
+
+def synthesize_batch(jobs, max_workers: int | None = None) -> list[list[Path]]:
+    """
+    Alle Jobs mit einem espeak-ng-Pool + einem ffmpeg-Lauf; Ausgaben atomar wie synthesize().
+    Liefert je Job die geschriebenen Pfade.
+    """
+    jobs = [TTSJob(*j) if not isinstance(j, TTSJob) else j for j in jobs]
+    if not jobs:
+        return []
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers or min(4, len(jobs))) as pool:
+            spoken = list(pool.map(_speak, jobs))
+    except BaseException:
+        for job in jobs:
+            if job.phonemes is not None:
+                _part(Path(job.phonemes)).unlink(missing_ok=True)
+        raise
+    fmt = spoken[0][0]
+    if any(f != fmt for f, _ in spoken):
+        raise SynthesisError(f"mixed sample formats in batch: {sorted({f for f, _ in spoken})}")
+    rate, channels, width = fmt
+    frame = channels * width
+
+    cmd = ["ffmpeg", "-y", "-loglevel", "error",
+           "-f", _RAW_FMT[width], "-ar", str(rate), "-ac", str(channels), "-i", "pipe:0"]
+    parts, written, start = {}, [], 0
+    for job, (_, pcm) in zip(jobs, spoken):
+        end = start + len(pcm) // frame
+        paths = []
+        for p, args in job.outputs.items():
+            p = Path(p)
+            p.parent.mkdir(parents=True, exist_ok=True)
+            parts[p] = _part(p)
+            cmd += ["-af", f"atrim=start_sample={start}:end_sample={end},asetpts=PTS-STARTPTS",
+                    *args, str(parts[p])]
+            paths.append(p)
+        if job.phonemes is not None:
+            parts[Path(job.phonemes)] = _part(Path(job.phonemes))
+        written.append(paths)
+        start = end
+
+    ff = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+    try:
+        for _, pcm in spoken:
+            ff.stdin.write(pcm)
+        ff.stdin.close()
+    except BrokenPipeError:
+        pass  # ffmpeg ist abgebrochen; Exit-Code unten
+    if ff.wait() != 0:
+        for part in parts.values():
+            part.unlink(missing_ok=True)
+        raise SynthesisError(f"ffmpeg exit {ff.returncode}")
+    for p, part in parts.items():
+        os.replace(part, p)
+    return written
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Mira — TTS Synthesis Cache
+--------------------------
+Inhaltsadressierter Cache für espeak-ng/ffmpeg-Ergebnisse.
+
+Schlüssel: sha256 über Text, Stimme, wpm, pitch, gap und Encoder-Einstellungen
+(plus optionale Extras wie Lautstärke/SSML). Ablage:
+
+  <MIRA_CACHE_DIR>/tts/<k[:2]>/<k>/<name>   (Standard: .cache/mira)
+  <MIRA_CACHE_DIR>/tts/<k[:2]>/<k>/meta.json
+
+Ein Treffer wird per Hardlink (Fallback: Kopie) atomar an den Zielpfad gelegt,
+z. B. audio/latest.mp3 — ohne espeak-ng/ffmpeg zu starten. Auf CI wird das
+Verzeichnis über actions/cache zwischen Läufen erhalten.
+"""
+
+from __future__ import annotations
+import os, json, shutil, hashlib
+from pathlib import Path
+
+CACHE_DIR = Path(os.getenv("MIRA_CACHE_DIR", ".cache/mira")) / "tts"
+
+def synth_key(text: str, voice: str, wpm: int, pitch: int, gap: int | None,
+              encoder: dict, **extra) -> str:
+    payload = {"text": text, "voice": voice, "wpm": int(wpm), "pitch": int(pitch),
+               "gap": gap, "encoder": encoder, **extra}
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def entry_dir(key: str) -> Path:
+    return CACHE_DIR / key[:2] / key
+
+def lookup(key: str, *names: str) -> dict[str, Path] | None:
+    """Alle angefragten Dateien des Eintrags oder None (Teil-Treffer zählt nicht)."""
+    d = entry_dir(key)
+    found = {n: d / n for n in names}
+    return found if all(p.is_file() and p.stat().st_size > 0 for p in found.values()) else None
+
+def store(key: str, files: dict[str, Path], meta: dict | None = None) -> dict[str, Path]:
+    """Kopiert fertige Artefakte in den Eintrag (atomar je Datei)."""
+    d = entry_dir(key)
+    d.mkdir(parents=True, exist_ok=True)
+    stored = {}
+    for name, src in files.items():
+        dst = d / name
+        tmp = d / f".{name}.tmp"
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+        stored[name] = dst
+    if meta is not None:
+        tmp = d / ".meta.json.tmp"
+        tmp.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, d / "meta.json")
+    return stored
+
+def _same_file(a: Path, b: Path) -> bool:
+    try:
+        sa, sb = a.stat(), b.stat()
+    except FileNotFoundError:
+        return False
+    if (sa.st_dev, sa.st_ino) == (sb.st_dev, sb.st_ino):
+        return True
+    if sa.st_size != sb.st_size:
+        return False
+    return a.read_bytes() == b.read_bytes()
+
+def link(src: Path, dst: Path) -> bool:
+    """dst → Inhalt von src (Hardlink, sonst Kopie), atomar; False wenn schon gleich."""
+    src, dst = Path(src), Path(dst)
+    if _same_file(src, dst):
+        return False
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.tmp")
+    try:
+        tmp.unlink(missing_ok=True)
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+    return True
@@ -7,17 +7,25 @@ Update Hero Image from latest archive render.
 - Converts to docs/portrait/mira-hero.jpg (max 780x1080), JPEG quality 90
 - Writes a small provenance note (mira-hero.txt)
 - Idempotent: only updates output if pixels actually change
+- Skips visually identical sources (perceptual hash, see phash_index.py) before encoding
+- Skips unchanged sources (sha256 in provenance) before Pillow is even imported
 """
 
+from __future__ import annotations
 import os, sys, hashlib, time
 from pathlib import Path
 
-try:
-    from PIL import Image, ImageOps
-except Exception as e:
+from lazy_import import lazy, available
+
+if not available("PIL"):
     print("[hero] Pillow not available. Install with: pip install pillow", file=sys.stderr)
     sys.exit(1)
 
+from portrait_encoder import encode_variant, hero_frame, write_if_changed
+from portrait_cache import sha256_file
+
+Image = lazy("PIL.Image")
+
 ARCHIVE = Path("data/archive")
 OUT_DIR = Path("docs/portrait")
 OUT_JPG = OUT_DIR / "mira-hero.jpg"
@@ -37,22 +45,45 @@ def sha256_bytes(b: bytes) -> str:
     return h.hexdigest()
 
 def encode_jpeg(img: Image.Image) -> bytes:
-    from io import BytesIO
-    buf = BytesIO()
-    img.save(buf, format="JPEG", quality=90, optimize=True, progressive=True)
-    return buf.getvalue()
+    # gleiche Hero-Einstellungen wie die Portrait-Encode-Stufe (progressiv, q90)
+    return encode_variant(img, "hero")
 
 def prepare(img: Image.Image) -> Image.Image:
-    # Convert to RGB, letterbox-fit into MAX_W x MAX_H, then center-crop if necessary
-    img = img.convert("RGB")
-    # First, scale so that the image fits into the bounding box while preserving aspect
-    img.thumbnail((MAX_W, MAX_H), Image.LANCZOS)
-    # If result is smaller on one side, place on black canvas to keep exact size
-    canvas = Image.new("RGB", (MAX_W, MAX_H), (0,0,0))
-    ox = (MAX_W - img.size[0]) // 2
-    oy = (MAX_H - img.size[1]) // 2
-    canvas.paste(img, (ox, oy))
-    return canvas
+    # Convert to RGB, letterbox-fit into MAX_W x MAX_H (siehe portrait_encoder.hero_frame)
+    return hero_frame(img, MAX_W, MAX_H)
+
+def read_provenance() -> dict:
+    try:
+        lines = OUT_TXT.read_text(encoding="utf-8").splitlines()
+    except Exception:
+        return {}
+    return dict(l.split(": ", 1) for l in lines if ": " in l)
+
+def write_provenance(prov: dict, **fields) -> bool:
+    # bisherige Provenienz + neue Felder (wie record_skip in portrait_cache.py)
+    merged = {**prov, **{k: v for k, v in fields.items() if v is not None}}
+    text = "".join(f"{k}: {v}\n" for k, v in merged.items())
+    return write_if_changed(OUT_TXT, text.encode("utf-8"))
+
+def source_phash(im):
+    # optional (NumPy): "<ahash>:<dhash>" der Quelle
+    try:
+        from phash_index import phash, to_hex
+    except Exception:
+        return None
+    a, d = phash(im)
+    return f"{to_hex(a)}:{to_hex(d)}"
+
+def is_near_duplicate(prev: str | None, cur: str | None) -> bool:
+    if not prev or not cur or not OUT_JPG.exists():
+        return False
+    from phash_index import distance, DEFAULT_MAX_DIST
+    try:
+        a = tuple(int(x, 16) for x in prev.split(":"))
+        b = tuple(int(x, 16) for x in cur.split(":"))
+    except ValueError:
+        return False
+    return distance(a, b) <= DEFAULT_MAX_DIST
 
 def main():
     src = newest_png()
@@ -62,6 +93,13 @@ def main():
 
     OUT_DIR.mkdir(parents=True, exist_ok=True)
 
+    # gleiche Quelldatei wie beim letzten Hero → ohne Dekodieren fertig
+    prov = read_provenance()
+    src_sha = sha256_file(src)
+    if prov.get("source_sha256") == src_sha and OUT_JPG.exists():
+        print(f"[hero] Up-to-date (unchanged source: {src.name})")
+        return 0
+
     # Load and prepare
     try:
         im = Image.open(src)
@@ -69,29 +107,27 @@ def main():
         print(f"[hero] Failed to open {src}: {e}", file=sys.stderr)
         return 0
 
+    # visuell gleiche Quelle wie beim letzten Hero → nicht neu kodieren
+    ph = source_phash(im)
+    if is_near_duplicate(prov.get("phash"), ph):
+        write_provenance(prov, source_sha256=src_sha, phash=ph)
+        print(f"[hero] Up-to-date (near-duplicate source: {src.name})")
+        return 0
+
     out_img = prepare(im)
     new_bytes = encode_jpeg(out_img)
     new_hash = sha256_bytes(new_bytes)
 
-    old_hash = None
-    if OUT_JPG.exists():
-        try:
-            old_bytes = OUT_JPG.read_bytes()
-            old_hash = sha256_bytes(old_bytes)
-        except Exception:
-            old_hash = None
-
-    if new_hash == old_hash:
+    # Write new hero (atomar, nur bei geänderten Bytes) and provenance
+    if not write_if_changed(OUT_JPG, new_bytes):
+        # gleiche Bytes aus neuer Quelle: Quelle vermerken, sonst wird sie jeden Lauf neu kodiert
+        write_provenance(prov, source_sha256=src_sha, phash=ph)
         print(f"[hero] Up-to-date (source: {src.name})")
         return 0
 
-    # Write new hero and provenance
-    OUT_JPG.write_bytes(new_bytes)
     ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    OUT_TXT.write_text(
-        f"hero_source: {src.name}\nupdated_utc: {ts}\nsha256: {new_hash}\n",
-        encoding="utf-8"
-    )
+    write_provenance({}, hero_source=src.name, source_sha256=src_sha, updated_utc=ts,
+                     sha256=new_hash, phash=ph)
     print(f"[hero] Updated hero from {src.name}")
     return 0
 
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Mira — Vignette Mask Cache
+--------------------------
+Gemeinsamer Vignetten-Generator für portrait_adaptor.py und portrait_state.py.
+
+Die Maske hängt nur von Bildgröße und Stärke ab. Statt bei jedem Lauf eine
+Ellipse zu zeichnen und mit einem großen GaussianBlur (~12 % der kurzen Seite)
+weichzuzeichnen, wird sie
+  - analytisch als radialer Abfall mit NumPy berechnet (falls verfügbar),
+    sonst über den bisherigen PIL-Weg (Ellipse + Blur),
+  - im Speicher gehalten (pro Prozess) und
+  - auf Platte abgelegt: <MIRA_CACHE_DIR>/vignette/v<MASK_VERSION>_<w>x<h>_a<alpha>.(npy|png)
+
+Schlüssel: (w, h, alpha) mit alpha = int(255 * strength) — dieselbe
+Quantisierung, die der Composite-Schritt ohnehin verwendet.
+"""
+
+from __future__ import annotations
+import os
+from pathlib import Path
+from lazy_import import lazy, available
+
+Image = lazy("PIL.Image")
+ImageOps = lazy("PIL.ImageOps")
+ImageFilter = lazy("PIL.ImageFilter")
+ImageDraw = lazy("PIL.ImageDraw")
+np = lazy("numpy") if available("numpy") else None  # NumPy optional → PIL-Fallback
+
+CACHE_DIR = Path(os.getenv("MIRA_CACHE_DIR", ".cache/mira")) / "vignette"
+
+# Ellipsen-Geometrie wie im ursprünglichen Zeichenweg (Bounding-Box in Bildanteilen)
+ELLIPSE_BOX = (0.08, 0.06, 0.92, 0.94)
+BLUR_FRACTION = 0.12
+MASK_VERSION = 2  # erhöhen, wenn sich die Maskenberechnung ändert (alte Cache-Dateien ungültig)
+
+_MEM: dict[tuple[int, int, int], Image.Image] = {}
+
+def quantize_strength(strength: float) -> int:
+    """Stärke [0..1] → Alpha-Byte (0..255), Cache-Schlüssel."""
+    return max(0, min(255, int(255 * float(strength))))
+
+def _cache_path(w: int, h: int, alpha: int) -> Path:
+    ext = "npy" if np is not None else "png"
+    return CACHE_DIR / f"v{MASK_VERSION}_{w}x{h}_a{alpha}.{ext}"
+
+def _mask_pil(w: int, h: int, alpha: int) -> Image.Image:
+    # Bisheriger Weg: helle Ellipse, Gaussian-Blur, invertieren, skalieren
+    x0, y0, x1, y1 = ELLIPSE_BOX
+    e = Image.new("L", (w, h), 0)
+    ImageDraw.Draw(e).ellipse((int(w*x0), int(h*y0), int(w*x1), int(h*y1)), fill=255)
+    e = e.filter(ImageFilter.GaussianBlur(radius=int(min(w, h) * BLUR_FRACTION)))
+    vign = ImageOps.invert(e)
+    return vign.point(lambda p: int(p * (alpha/255)))
+
+def _mask_numpy(w: int, h: int, alpha: int) -> Image.Image:
+    # Analytisch: Abstand zum Ellipsenrand, weicher Übergang ~ Gauß-CDF
+    x0, y0, x1, y1 = ELLIPSE_BOX
+    cx, cy = (x0 + x1) / 2 * w, (y0 + y1) / 2 * h
+    rx, ry = (x1 - x0) / 2 * w, (y1 - y0) / 2 * h
+    sigma = max(1.0, int(min(w, h) * BLUR_FRACTION))
+
+    xs = (np.arange(w, dtype=np.float32) + 0.5 - cx)
+    ys = (np.arange(h, dtype=np.float32) + 0.5 - cy)[:, None]
+    r = np.sqrt(xs * xs + ys * ys)                        # Abstand zum Zentrum
+    d = np.sqrt((xs / rx) ** 2 + (ys / ry) ** 2)          # normierter Ellipsenradius
+    # vorzeichenbehafteter Randabstand entlang des Strahls: r - r/d;
+    # im Zentrum (d = 0, bei ungerader Breite und Höhe) der Grenzwert −min(rx, ry)
+    s = np.where(d > 0, r - r / np.maximum(d, 1e-6), -min(rx, ry))
+    # logistische Näherung der Normal-CDF (Phi(x) ≈ 1/(1+exp(-1.702x)))
+    outside = 1.0 / (1.0 + np.exp(-1.702 * s / sigma))
+    mask = np.floor(outside * 255.0 * (alpha / 255.0)).astype(np.uint8)
+    return Image.fromarray(mask)
+
+def _load_disk(p: Path) -> Image.Image | None:
+    try:
+        if p.suffix == ".npy":
+            return Image.fromarray(np.load(p))
+        with Image.open(p) as im:
+            return im.convert("L")
+    except Exception:
+        return None
+
+def _store_disk(p: Path, mask: Image.Image):
+    try:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(p.name + ".tmp")
+        if p.suffix == ".npy":
+            with tmp.open("wb") as f:
+                np.save(f, np.asarray(mask))
+        else:
+            mask.save(tmp, format="PNG")
+        os.replace(tmp, p)
+    except Exception:
+        pass  # Cache ist optional
+
+def vignette_mask(w: int, h: int, strength: float) -> Image.Image:
+    """L-Maske (0 = unverändert, 255 = schwarz) für Bildgröße und Stärke."""
+    alpha = quantize_strength(strength)
+    key = (int(w), int(h), alpha)
+    mask = _MEM.get(key)
+    if mask is not None:
+        return mask
+    p = _cache_path(*key)
+    mask = _load_disk(p) if p.exists() else None
+    if mask is None or mask.size != (w, h):
+        mask = _mask_numpy(*key) if np is not None else _mask_pil(*key)
+        _store_disk(p, mask)
+    _MEM[key] = mask
+    return mask
+
+def apply_vignette(img: Image.Image, strength: float) -> Image.Image:
+    """Dunkelt die Ränder über die gecachte Maske ab."""
+    if strength <= 0:
+        return img
+    w, h = img.size
+    mask = vignette_mask(w, h, strength)
+    dark = Image.new("RGB", (w, h), (0, 0, 0))
+    return Image.composite(dark, img, mask)
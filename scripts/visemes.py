@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Mira — Viseme Timeline
+----------------------
+Lippen-Sync aus der espeak-ng-Phonemausgabe derselben Synthese: tts_backend
+ruft espeak-ng mit `-x --phonout=<datei>` auf, dieselbe Prozessinstanz liefert
+Audio (stdout) und Phonem-Mnemonics (Datei). Keine zweite Analyse des Audios.
+
+Phoneme → Viseme (VISEMES), Dauer je Phonem über Gewichte (Vokal lang/kurz,
+Diphthong, Konsonant, Pause) und das Sprechtempo (wpm, gap). Ist die echte
+Audiodauer bekannt (z. B. aus audio_analysis), wird die Sprechstrecke exakt
+darauf skaliert ("timed": "audio"), sonst bleibt die Schätzung ("estimate")
+und der Player skaliert mit der tatsächlichen Länge.
+
+Ablage neben dem Audio, kompakt als parallele Arrays:
+
+  audio/latest.mp3  →  audio/latest.visemes.json
+  {"v": 1, "set": [...], "t": [start_ms, ...], "i": [viseme_index, ...],
+   "duration_ms": 5234, "timed": "estimate"}
+
+Aufruf:
+  python scripts/visemes.py <phonemes.txt> [--wpm 140] [--gap 8] [--duration 5.2]
+"""
+
+from __future__ import annotations
+import os, sys, json, argparse
+from pathlib import Path
+
+TIMELINE_VERSION = 1
+VISEMES = ("rest", "A", "E", "I", "O", "U", "MBP", "FV", "L", "S", "TD", "KG")
+_IDX = {v: i for i, v in enumerate(VISEMES)}
+
+# espeak-ng-Mnemonics (Deutsch, Kirshenbaum-nah) → Viseme; Diphthonge als zwei Hälften
+_PHONEME = {
+    "a": "A", "6": "A", "A": "A",
+    "E": "E", "e": "E", "@": "E", "3": "E",
+    "I": "I", "i": "I", "j": "I",
+    "O": "O", "o": "O", "2": "O", "9": "O", "Q": "O",
+    "U": "U", "u": "U", "Y": "U", "y": "U", "W": "U", "w": "U",
+    "p": "MBP", "b": "MBP", "m": "MBP",
+    "f": "FV", "v": "FV", "pf": "FV",
+    "l": "L",
+    "s": "S", "z": "S", "S": "S", "Z": "S", "C": "S", "T": "S", "D": "S",
+    "ts": "S", "tS": "S", "dZ": "S",
+    "t": "TD", "d": "TD", "n": "TD",
+    "k": "KG", "g": "KG", "N": "KG", "x": "KG", "h": "KG", "r": "KG", "R": "KG", "?": "KG",
+}
+_DIPHTHONG = {"aI": ("A", "I"), "aU": ("A", "U"), "OY": ("O", "I"), "eI": ("E", "I"), "oU": ("O", "U")}
+_MULTI = sorted([*_DIPHTHONG, "pf", "ts", "tS", "dZ"], key=len, reverse=True)
+_VOWELS = {"A", "E", "I", "O", "U"}
+_SKIP = set("',%=#;-!^")  # Betonung/Modifikatoren ohne eigene Dauer
+
+# relative Dauer (1.0 ≈ kurzer Vokal)
+W_VOWEL, W_LONG, W_DIPH, W_CONS = 1.0, 1.6, 1.8, 0.7
+W_PAUSE, W_CLAUSE = 1.5, 3.0
+UNITS_PER_WORD = 4.5  # mittlere Wortlänge in Einheiten → ms je Einheit aus wpm
+
+def parse(phonemes: str) -> list[tuple[str, float]]:
+    """Mnemonics → [(viseme, gewicht)], Satzgrenzen (Zeilen) und Wortgrenzen inklusive."""
+    seq: list[tuple[str, float]] = []
+    for line in phonemes.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if seq:
+            seq.append(("rest", W_CLAUSE))
+        for word in line.split():
+            if seq and seq[-1][0] != "rest":
+                seq.append(("gap", 0.0))
+            pos = 0
+            while pos < len(word):
+                ch = word[pos]
+                if ch in _SKIP:
+                    pos += 1
+                    continue
+                if ch == "_":
+                    # _ kurze Pause, _: / _! länger
+                    long = word[pos + 1:pos + 2] in (":", "!")
+                    seq.append(("rest", W_PAUSE * (2 if long else 1)))
+                    pos += 2 if long else 1
+                    continue
+                tok = next((m for m in _MULTI if word.startswith(m, pos)), ch)
+                pos += len(tok)
+                lengthened = word[pos:pos + 1] == ":"
+                if lengthened:
+                    pos += 1
+                if tok in _DIPHTHONG:
+                    a, b = _DIPHTHONG[tok]
+                    seq += [(a, W_DIPH / 2), (b, W_DIPH / 2)]
+                    continue
+                vis = _PHONEME.get(tok)
+                if vis is None:
+                    continue  # unbekanntes Zeichen: kein eigenes Segment
+                w = W_VOWEL if vis in _VOWELS else W_CONS
+                seq.append((vis, w * W_LONG if lengthened else w))
+    return seq
+
+def timeline(phonemes: str, wpm: int, gap: int | None = None, duration_s: float | None = None,
+             lead_s: float = 0.0, trail_s: float = 0.0) -> dict:
+    """Kompakte Timeline; mit duration_s exakt auf das Audio skaliert."""
+    unit_ms = 60000.0 / (max(1, int(wpm)) * UNITS_PER_WORD)
+    gap_ms = 10.0 * (gap or 0)  # espeak -g: Einheiten à 10 ms
+    segs = [("rest", gap_ms) if v == "gap" else (v, w * unit_ms) for v, w in parse(phonemes)]
+    speech_ms = sum(ms for _, ms in segs)
+    start, scale, timed = 0.0, 1.0, "estimate"
+    if duration_s and speech_ms > 0:
+        start = 1000.0 * lead_s
+        scale = max(0.0, 1000.0 * (duration_s - lead_s - trail_s)) / speech_ms
+        timed = "audio"
+    total_ms = 1000.0 * duration_s if timed == "audio" else speech_ms
+
+    t, idx = [0], [_IDX["rest"]]
+    clock = start
+    for vis, ms in segs:
+        i = _IDX[vis]
+        if ms <= 0:
+            continue
+        if i != idx[-1]:
+            at = int(round(clock))
+            if at == t[-1]:
+                idx[-1] = i          # Segment der Länge 0 ersetzen
+            else:
+                t.append(at)
+                idx.append(i)
+        clock += ms * scale
+    if idx[-1] != _IDX["rest"]:
+        t.append(int(round(clock)))
+        idx.append(_IDX["rest"])
+    return {"v": TIMELINE_VERSION, "set": list(VISEMES), "t": t, "i": idx,
+            "duration_ms": int(round(total_ms)), "timed": timed}
+
+def sidecar(audio_path) -> Path:
+    """audio/latest.mp3 → audio/latest.visemes.json"""
+    p = Path(audio_path)
+    return p.with_name(f"{p.stem}.visemes.json")
+
+def write_timeline(path, tl: dict) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(tl, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+def load_timeline(audio_path):
+    """Timeline neben dem Audio oder None."""
+    try:
+        with sidecar(audio_path).open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="espeak-ng-Phoneme (-x) → Viseme-Timeline")
+    ap.add_argument("phonemes", type=Path)
+    ap.add_argument("--wpm", type=int, default=140)
+    ap.add_argument("--gap", type=int, default=None)
+    ap.add_argument("--duration", type=float, default=None, help="Audiodauer in Sekunden")
+    args = ap.parse_args(argv)
+    tl = timeline(args.phonemes.read_text(encoding="utf-8"), args.wpm, args.gap, args.duration)
+    print(json.dumps(tl, separators=(",", ":")))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
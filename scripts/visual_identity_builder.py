@@ -2,6 +2,8 @@
 import json, os, hashlib
 from datetime import datetime, timezone
 
+from svg_template import template, write_svg, Raw
+
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 def P(*p): return os.path.join(ROOT, *p)
 
@@ -36,8 +38,29 @@ def hash_ratio(text):
     h = int(hashlib.sha256(text.encode("utf-8")).hexdigest(), 16)
     return 0.3 + (h % 400) / 1000.0  # 0.3..0.7
 
+# Statische Abschnitte einmal kompiliert; nur Maße, Farbe und Metadaten sind dynamisch
+ELLIPSE = template('<ellipse cx="{cx}" cy="{cy}" rx="{rx}" ry="{ry}" fill="{c}" fill-opacity="{op}"/>')
+SPARK = template('<circle cx="{cx}" cy="{cy}" r="{r}" fill="#cfe0ff" fill-opacity="{op}"/>')
+IDENTITY_SVG = template('''<svg xmlns="http://www.w3.org/2000/svg" width="{W}" height="{H}" viewBox="0 0 {W} {H}">
+  <defs><linearGradient id="bg" x1="0" y1="0" x2="0" y2="1">
+    <stop offset="0%" stop-color="#0b0f17"/><stop offset="100%" stop-color="#070a11"/></linearGradient></defs>
+  <rect width="100%" height="100%" fill="url(#bg)"/>
+  {shadow}
+  {hip}
+  {waist}
+  {bust}
+  {neck}
+  {head}
+  {spark}
+  {foot_l}
+  {foot_r}
+  <metadata data-source="visual_identity_builder.py"
+            data-valence="{val:.3f}" data-arousal="{aro:.3f}"
+            data-desc="{desc}"></metadata>
+</svg>''')
+
 def ell(cx, cy, rx, ry, c, op=1.0):
-    return f'<ellipse cx="{cx}" cy="{cy}" rx="{rx}" ry="{ry}" fill="{c}" fill-opacity="{op}"/>'
+    return Raw(ELLIPSE.render(cx=cx, cy=cy, rx=rx, ry=ry, c=c, op=op))
 
 def build_svg(val, aro, desc):
     W, H = 1024, 1280
@@ -53,27 +76,22 @@ def build_svg(val, aro, desc):
 
     spark = ""
     if braces:
-        for dx, dy, op, rad in [(0, -3, 0.95, 3), (10, 1, 0.8, 2), (-12, 4, 0.7, 2)]:
-            spark += f'<circle cx="{W/2+dx}" cy="{H*0.22+dy}" r="{rad}" fill="#cfe0ff" fill-opacity="{op}"/>'
-
-    svg = f'''<svg xmlns="http://www.w3.org/2000/svg" width="{W}" height="{H}" viewBox="0 0 {W} {H}">
-  <defs><linearGradient id="bg" x1="0" y1="0" x2="0" y2="1">
-    <stop offset="0%" stop-color="#0b0f17"/><stop offset="100%" stop-color="#070a11"/></linearGradient></defs>
-  <rect width="100%" height="100%" fill="url(#bg)"/>
-  {ell(W/2, H*0.86, W*0.28, H*0.04, "#2a3550", 0.32)}
-  {ell(W/2, H*0.68, W*hip*0.36,  H*0.14, col, 0.95)}
-  {ell(W/2, H*0.52, W*waist*0.36,H*0.12, col, 0.98)}
-  {ell(W/2, H*0.36, W*bust*0.36, H*0.13, col, 1.00)}
-  {ell(W/2, H*0.27, W*neck*0.20, H*0.07, col, 0.98)}
-  {ell(W/2, H*0.22, headR*0.95,  headR*0.84, col, 1.00)}
-  {spark}
-  {ell(W*0.43, H*0.88, 24, 12, col, .75)}
-  {ell(W*0.57, H*0.88, 24, 12, col, .75)}
-  <metadata data-source="visual_identity_builder.py"
-            data-valence="{val:.3f}" data-arousal="{aro:.3f}"
-            data-desc="{(desc or '').replace('"','&quot;')}"></metadata>
-</svg>'''
-    return svg
+        spark = "".join(SPARK.render(cx=W/2+dx, cy=H*0.22+dy, r=rad, op=op)
+                        for dx, dy, op, rad in [(0, -3, 0.95, 3), (10, 1, 0.8, 2), (-12, 4, 0.7, 2)])
+
+    return IDENTITY_SVG.render(
+        W=W, H=H,
+        shadow=ell(W/2, H*0.86, W*0.28, H*0.04, "#2a3550", 0.32),
+        hip=ell(W/2, H*0.68, W*hip*0.36,  H*0.14, col, 0.95),
+        waist=ell(W/2, H*0.52, W*waist*0.36, H*0.12, col, 0.98),
+        bust=ell(W/2, H*0.36, W*bust*0.36, H*0.13, col, 1.00),
+        neck=ell(W/2, H*0.27, W*neck*0.20, H*0.07, col, 0.98),
+        head=ell(W/2, H*0.22, headR*0.95,  headR*0.84, col, 1.00),
+        spark=Raw(spark),
+        foot_l=ell(W*0.43, H*0.88, 24, 12, col, .75),
+        foot_r=ell(W*0.57, H*0.88, 24, 12, col, .75),
+        val=val, aro=aro, desc=desc or "",
+    )
 
 def main():
     selfd = load_json(SELF, {})
@@ -87,12 +105,14 @@ def main():
 
     svg = build_svg(val, aro, desc)
 
-    with open(OUT, "w", encoding="utf-8") as f:
-        f.write(svg)
+    # Archivkopie nur, wenn sich das Identity-SVG tatsächlich geändert hat
+    if not write_svg(OUT, svg):
+        print("[identity] unchanged — no archive copy")
+        return
 
     ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
-    with open(os.path.join(ARCH, f"portrait-{ts}.svg"), "w", encoding="utf-8") as f:
-        f.write(svg)
+    write_svg(os.path.join(ARCH, f"portrait-{ts}.svg"), svg)
+    print(f"[identity] updated {os.path.relpath(OUT, ROOT)} + portrait-{ts}.svg")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Batch-Optimierer für autotune_prompt.py (--optimize).
+
+Statt eines gierigen Schritts aus einer einzelnen eval.json:
+  1. Render-Verträge data/render_prompts/*.json einlesen und über
+     outputs.image_rel mit den eval_render-Kennzahlen verbinden
+     (evaluate_path → eval_cache, unveränderte Renders kosten nichts).
+  2. Pro Zielkennzahl eine lineare Sensitivität je Parameter schätzen
+     (Ridge-Regression auf auf hard_bounds normierte Parameter).
+  3. Den nächsten Prompt in einem Schritt berechnen: kleinste Änderung, die
+     die Lücken zu den targets schließt — innerhalb hard_bounds und einer
+     Trust-Region pro Iteration.
+
+Parameter ohne Streuung in den Daten bleiben unverändert (keine Schätzung;
+variiert keiner, warnt optimize() — die Verträge tragen dann keine
+hard_bounds-Parameter, siehe generate_self_image.py);
+fehlende Parameterwerte werden mit dem Spaltenmittel ergänzt. Ohne Samples
+bleibt der Prompt unverändert.
+"""
+import json, glob, os, sys
+
+from eval_render import evaluate_path   # legt auch scripts/ in sys.path (lazy_import)
+from lazy_import import lazy
+
+np = lazy("numpy")  # erst beim Anpassen laden; ohne Samples bleibt NumPy ungeladen
+
+# Zielkennzahlen, die der Optimierer schließen soll (schema["targets"])
+TARGET_KEYS = ("braces_clarity", "braces_specular_ratio", "heels_visibility")
+TRUST_REGION = 0.25   # max. Änderung je Iteration, Anteil der Bound-Spanne
+RIDGE = 1e-3
+
+def _get(d, dotted, default=None):
+    for part in dotted.split("."):
+        if not isinstance(d, dict) or part not in d:
+            return default
+        d = d[part]
+    return d
+
+def param_space(bounds):
+    """[(name, yaml_pfad, kontrakt_pfade, lo, hi)] aus schema["hard_bounds"]."""
+    space = []
+    for key, (lo, hi) in bounds.get("weights", {}).items():
+        space.append((f"weights.{key}", f"weights.{key}",
+                      (f"weights.{key}", f"prompt_weights.{key}"), float(lo), float(hi)))
+    for key, ypath, cpaths in (
+        ("aperture",  "camera.aperture", ("camera.aperture",)),
+        ("cfg_scale", "cfg_scale",       ("cfg_scale", "sampler.cfg_scale")),
+        ("steps",     "steps",           ("steps", "sampler.steps")),
+    ):
+        if key in bounds:
+            lo, hi = bounds[key]
+            space.append((key, ypath, cpaths, float(lo), float(hi)))
+    return space
+
+def collect_samples(prompts_dir, schema_path, space, last=None):
+    """Verträge + Kennzahlen → (X normiert [n×p], Y [n×m], Anzahl übersprungen); ohne Samples leere Listen."""
+    paths = sorted(p for p in glob.glob(os.path.join(prompts_dir, "*.json"))
+                   if os.path.basename(p) != "latest.json")
+    if last:
+        paths = paths[-last:]
+    rows_x, rows_y, skipped = [], [], 0
+    for p in paths:
+        try:
+            with open(p, "r", encoding="utf-8") as f:
+                contract = json.load(f)
+        except Exception:
+            skipped += 1
+            continue
+        img = _get(contract, "outputs.image_rel")
+        if not img or not os.path.exists(img):
+            skipped += 1
+            continue
+        metrics, _ = evaluate_path(img, schema_path)
+        if metrics is None:
+            skipped += 1
+            continue
+        x = []
+        for _, _, cpaths, lo, hi in space:
+            v = next((_get(contract, cp) for cp in cpaths if _get(contract, cp) is not None), None)
+            x.append(float("nan") if v is None else (float(v) - lo) / (hi - lo or 1.0))
+        rows_x.append(x)
+        rows_y.append([float(metrics[k]) for k in TARGET_KEYS])
+    if not rows_x:
+        return [], [], skipped
+    return (np.array(rows_x, dtype=float).reshape(-1, len(space)),
+            np.array(rows_y, dtype=float).reshape(-1, len(TARGET_KEYS)), skipped)
+
+def fit_sensitivity(X, Y):
+    """
+    Ridge-Regression Y ≈ a + X·B auf Spalten mit Streuung.
+    Liefert B [p×m] (0 für nicht schätzbare Parameter) und Maske der aktiven Parameter.
+    """
+    n, p = X.shape
+    active = np.zeros(p, dtype=bool)
+    for j in range(p):
+        col = X[:, j]
+        ok = ~np.isnan(col)
+        active[j] = ok.sum() >= 3 and np.nanstd(col) > 1e-9
+    B = np.zeros((p, Y.shape[1]))
+    if n < 3 or not active.any():
+        return B, active
+    Xa = X[:, active]
+    mean = np.nanmean(Xa, axis=0)
+    Xa = np.where(np.isnan(Xa), mean, Xa)           # fehlend → Spaltenmittel (neutral)
+    Xc = Xa - mean
+    Yc = Y - Y.mean(axis=0)
+    k = Xc.shape[1]
+    B[active] = np.linalg.solve(Xc.T @ Xc + RIDGE * n * np.eye(k), Xc.T @ Yc)
+    return B, active
+
+def propose(y, schema, space, X, Y, B, active):
+    """Nächster Prompt (in-place auf y) + Bericht."""
+    targets = schema["targets"]
+    z0 = np.array([(float(_get(y, ypath, lo)) - lo) / (hi - lo or 1.0) for _, ypath, _, lo, hi in space])
+    # Vorhersage am aktuellen Prompt: Mittel der Daten + Sensitivität × Abstand zum Datenmittel
+    counts = (~np.isnan(X)).sum(axis=0)
+    x_mean = np.nansum(X, axis=0) / np.maximum(counts, 1)
+    pred = Y.mean(axis=0) + (np.where(active, z0 - x_mean, 0.0) @ B) if len(Y) else np.zeros(len(TARGET_KEYS))
+    # Lücken nur unter dem Ziel, relativ zum Zielwert (Skalen vergleichbar)
+    t = np.array([float(targets[k]) for k in TARGET_KEYS])
+    gap = np.clip(t - pred, 0.0, None) / np.where(t != 0, np.abs(t), 1.0)
+
+    dz = np.zeros(len(space))
+    if gap.any() and active.any():
+        Bn = B[active] / np.where(t != 0, np.abs(t), 1.0)        # [k×m], relativ
+        # min ||Bnᵀ dz - gap||² + λ||dz||²  → ein linearer Schritt
+        A = Bn @ Bn.T + RIDGE * np.eye(Bn.shape[0])
+        dz[active] = np.linalg.solve(A, Bn @ gap)
+        dz = np.clip(dz, -TRUST_REGION, TRUST_REGION)
+    z1 = np.clip(z0 + dz, 0.0, 1.0)
+
+    report = {"samples": int(len(Y)), "predicted": dict(zip(TARGET_KEYS, np.round(pred, 5).tolist())),
+              "gap_rel": dict(zip(TARGET_KEYS, np.round(gap, 4).tolist())), "changes": {}, "sensitivity": {}}
+    for j, (name, ypath, _, lo, hi) in enumerate(space):
+        if active[j]:
+            report["sensitivity"][name] = dict(zip(TARGET_KEYS, np.round(B[j] / (hi - lo or 1.0), 6).tolist()))
+        if not active[j] or abs(z1[j] - z0[j]) < 1e-9:
+            continue
+        val = lo + z1[j] * (hi - lo)
+        val = int(round(val)) if name == "steps" else round(float(val), 4)
+        parent, _, leaf = ypath.rpartition(".")
+        node = y
+        for part in filter(None, parent.split(".")):
+            if not isinstance(node.get(part), dict):
+                node[part] = {}
+            node = node[part]
+        report["changes"][name] = [_get(y, ypath), val]
+        node[leaf] = val
+    return y, report
+
+def optimize(y, schema, schema_path, prompts_dir="data/render_prompts", last=None):
+    space = param_space(schema["hard_bounds"])
+    X, Y, skipped = collect_samples(prompts_dir, schema_path, space, last=last)
+    if len(X) == 0:
+        return y, {"samples": 0, "skipped": skipped, "changes": {}, "note": "no samples, no change"}
+    B, active = fit_sensitivity(X, Y)
+    y, report = propose(y, schema, space, X, Y, B, active)
+    report["skipped"] = skipped
+    if not active.any():
+        report["warning"] = "no tunable parameter varies across samples, no change"
+        print(f"[autotune] WARN: keiner der {len(space)} hard_bounds-Parameter variiert über "
+              f"{len(X)} Verträge — nichts zu schätzen", file=sys.stderr)
+    return y, report
@@ -21,17 +21,57 @@ def delta_if_below(metric, target, base_delta, scale=1.0):
     gap = target - metric
     return base_delta * (1.0 + scale * gap)
 
+IMAGE_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+
+def load_metrics(eval_or_image, schema_path):
+    """
+    Kennzahlen aus eval.json oder direkt aus einem Render-Bild.
+    Bilder laufen über eval_render.evaluate_path (eval_cache) → unveränderte
+    Renders werden in Tuning-Schleifen nicht erneut dekodiert.
+    """
+    if eval_or_image.lower().endswith(IMAGE_EXTS):
+        from eval_render import evaluate_path
+        metrics, _ = evaluate_path(eval_or_image, schema_path)
+        if metrics is None:
+            print(f"Cannot read image: {eval_or_image}")
+            sys.exit(1)
+        return metrics
+    return json.load(open(eval_or_image, "r", encoding="utf-8"))["metrics"]
+
+def main_optimize(argv):
+    """
+    autotune_prompt.py --optimize <schema.json> <prompt_in.yaml> <prompt_out.yaml> [prompts_dir] [last_n]
+    Batch-Modus: Sensitivitäten aus vielen Renders, ein Schritt innerhalb hard_bounds.
+    """
+    if len(argv) < 3:
+        print("Usage: autotune_prompt.py --optimize <schema.json> <prompt_in.yaml> <prompt_out.yaml> [prompts_dir] [last_n]")
+        sys.exit(2)
+    from autotune_optimizer import optimize
+    schema_path, pin, pout = argv[:3]
+    prompts_dir = argv[3] if len(argv) > 3 else "data/render_prompts"
+    last = int(argv[4]) if len(argv) > 4 else None
+
+    schema = json.load(open(schema_path, "r", encoding="utf-8"))
+    y = load_yaml(pin) or {}
+    y, report = optimize(y, schema, schema_path, prompts_dir=prompts_dir, last=last)
+    y["optimization_engine"] = (y.get("optimization_engine", "") or "") + " + autotune(batch-v1)"
+    save_yaml(y, pout)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    print(f"Autotuned YAML written to: {pout}")
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--optimize":
+        return main_optimize(sys.argv[2:])
     if len(sys.argv) < 5:
-        print("Usage: autotune_prompt.py <eval.json> <schema.json> <prompt_in.yaml> <prompt_out.yaml>")
+        print("Usage: autotune_prompt.py <eval.json|render.png> <schema.json> <prompt_in.yaml> <prompt_out.yaml>")
+        print("       autotune_prompt.py --optimize <schema.json> <prompt_in.yaml> <prompt_out.yaml> [prompts_dir] [last_n]")
         sys.exit(2)
 
     eval_path, schema_path, pin, pout = sys.argv[1:5]
-    eval_data = json.load(open(eval_path, "r", encoding="utf-8"))
     schema = json.load(open(schema_path, "r", encoding="utf-8"))
     y = load_yaml(pin)
 
-    metrics = eval_data["metrics"]
+    metrics = load_metrics(eval_path, schema_path)
     targets = schema["targets"]
     bounds  = schema["hard_bounds"]
 
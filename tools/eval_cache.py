@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Persistenter Kennzahlen-Cache für eval_render.py / autotune_prompt.py.
+
+Schlüssel: sha256(Bild) + sha256(schema.json) + Evaluator-Version.
+Ablage:    <MIRA_CACHE_DIR>/eval/<schlüssel>.json  (Standard: .cache/mira)
+
+Bewusst ohne cv2/numpy-Import, damit ein Treffer ohne Dekodieren auskommt.
+"""
+import os, json, hashlib
+from pathlib import Path
+
+CACHE_DIR = Path(os.getenv("MIRA_CACHE_DIR", ".cache/mira")) / "eval"
+
+def sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def cache_key(img_path, schema_path, version):
+    raw = f"{sha256_file(img_path)}:{sha256_file(schema_path)}:{version}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def load(key):
+    try:
+        with open(CACHE_DIR / f"{key}.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+def store(key, metrics):
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        p = CACHE_DIR / f"{key}.json"
+        tmp = p.with_name(p.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(metrics, f)
+        os.replace(tmp, p)
+    except Exception:
+        pass  # Cache ist optional
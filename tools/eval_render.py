@@ -1,56 +1,84 @@
 #!/usr/bin/env python3
 import os, sys, json
-import cv2
-import numpy as np
+from pathlib import Path
+import eval_cache
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from lazy_import import lazy
+
+# Ein eval_cache-Treffer braucht kein cv2 (und damit kein numpy); fehlt cv2 ganz,
+# schlägt der Import hier sofort fehl (archive_quality_scan.py verlässt sich darauf).
+cv2 = lazy("cv2", required=True)
+
+# Erhöhen, sobald sich eine Kennzahl ändert (invalidiert eval_cache)
+EVALUATOR_VERSION = "eval_render/1"
 
 def variance_of_laplacian(gray):
-    return cv2.Laplacian(gray, cv2.CV_64F).var()
+    # CV_32F reicht (Laplace eines uint8-Bildes ist ganzzahlig, exakt darstellbar),
+    # meanStdDev rechnet intern double → gleiche Varianz bei halbem Speicher ggü. CV_64F
+    lap = cv2.Laplacian(gray, cv2.CV_32F)
+    _, std = cv2.meanStdDev(lap)
+    return float(std[0][0]) ** 2
+
+class EvalContext:
+    """
+    Einmal dekodiert, ein Graubild für alle Kennzahlen.
+    Bildband und Mund-ROI sind Views auf dieses Graubild (keine Kopien);
+    das BGR-Bild wird nach der Konvertierung nicht mehr gehalten.
+    """
+    def __init__(self, bgr):
+        self.gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+        self.h, self.w = self.gray.shape[:2]
+
+    @classmethod
+    def from_path(cls, img_path):
+        bgr = cv2.imread(img_path)
+        return cls(bgr) if bgr is not None else None
+
+    def bottom_band(self, band_ratio=0.18):
+        band_h = int(self.h * band_ratio)
+        return self.gray[self.h - band_h : self.h, :]
 
-def specular_ratio(bgr, thresh=235):
+    def mouth_roi(self):
+        """
+        Grobe, modellfreie Mund-ROI-Schätzung (zentraler Ober-Mittelbereich).
+        Robust, ohne Face-Model.
+        """
+        x1 = int(0.35 * self.w); x2 = int(0.65 * self.w)
+        y1 = int(0.35 * self.h); y2 = int(0.55 * self.h)
+        return self.gray[y1:y2, x1:x2]
+
+def specular_ratio(gray, thresh=235):
     """
     Schätzt den Anteil sehr heller Pixel als Proxy für metallische Glints.
     Höherer Wert ⇒ stärkere metallische Highlights (z. B. Brackets).
     """
-    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
     total = gray.size
-    spec = (gray >= thresh).sum()
+    spec = cv2.countNonZero(cv2.compare(gray, thresh, cv2.CMP_GE)) if total else 0
     return spec / float(total + 1e-9)
 
-def heels_visibility_mask(bgr, band_ratio=0.18, edge_thresh1=60, edge_thresh2=140):
+def heels_visibility_mask(ctx, band_ratio=0.18, edge_thresh1=60, edge_thresh2=140):
     """
     Misst Kanten- und Kontrastdichte im unteren Bildband als Proxy
     für „Heels sichtbar & reflektiert“.
     """
-    h, w = bgr.shape[:2]
-    band_h = int(h * band_ratio)
-    band = bgr[h - band_h : h, :]
-    edges = cv2.Canny(cv2.cvtColor(band, cv2.COLOR_BGR2GRAY), edge_thresh1, edge_thresh2)
+    band = ctx.bottom_band(band_ratio)
+    edges = cv2.Canny(band, edge_thresh1, edge_thresh2)
     density = edges.mean() / 255.0
-    blur = cv2.GaussianBlur(cv2.cvtColor(band, cv2.COLOR_BGR2GRAY), (5,5), 0)
+    blur = cv2.GaussianBlur(band, (5,5), 0)
     contrast = float(blur.std())
     score = 0.7 * density + 0.3 * (contrast / 64.0)
     return max(0.0, min(1.0, score))
 
-def mouth_roi_guess(bgr):
-    """
-    Grobe, modellfreie Mund-ROI-Schätzung (zentraler Ober-Mittelbereich).
-    Robust, ohne Face-Model.
-    """
-    h, w = bgr.shape[:2]
-    x1 = int(0.35 * w); x2 = int(0.65 * w)
-    y1 = int(0.35 * h); y2 = int(0.55 * h)
-    return bgr[y1:y2, x1:x2].copy()
-
-def braces_clarity_score(bgr):
+def braces_clarity_score(ctx):
     """
     Kombiniert Schärfe (Laplacian) + Spekular-Anteil in der Mund-ROI
     zu einem Klarheits-Score [0..1] für die Zahnspange.
     """
-    roi = mouth_roi_guess(bgr)
+    roi = ctx.mouth_roi()
     if roi.size == 0:
         return 0.0, 0.0
-    gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-    sharp = variance_of_laplacian(gray)
+    sharp = variance_of_laplacian(roi)
     spec  = specular_ratio(roi, thresh=240)
     # Heuristische Normalisierung
     sharp_norm = min(1.0, sharp / 220.0)
@@ -58,9 +86,39 @@ def braces_clarity_score(bgr):
     score = 0.7 * sharp_norm + 0.3 * spec_norm
     return score, sharp
 
-def global_sharpness(bgr):
-    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
-    return variance_of_laplacian(gray)
+def global_sharpness(ctx):
+    return variance_of_laplacian(ctx.gray)
+
+def evaluate(bgr_or_ctx):
+    """Alle Render-Kennzahlen für ein BGR-Bild oder einen EvalContext (gerundet, JSON-fertig)."""
+    ctx = bgr_or_ctx if isinstance(bgr_or_ctx, EvalContext) else EvalContext(bgr_or_ctx)
+    braces_score, mouth_sharp = braces_clarity_score(ctx)
+    spec_ratio = specular_ratio(ctx.gray)
+    heels_score = heels_visibility_mask(ctx)
+    sharp_all = global_sharpness(ctx)
+    return {
+        "braces_clarity": round(braces_score, 4),
+        "braces_specular_ratio": round(spec_ratio, 5),
+        "heels_visibility": round(heels_score, 4),
+        "global_sharpness": round(sharp_all, 2),
+        "mouth_roi_sharpness": round(mouth_sharp, 2)
+    }
+
+def evaluate_path(img_path, schema_path):
+    """
+    Kennzahlen für eine Bilddatei; konsultiert eval_cache vor dem Dekodieren.
+    Liefert (metrics, cached) oder (None, False), wenn das Bild unlesbar ist.
+    """
+    key = eval_cache.cache_key(img_path, schema_path, EVALUATOR_VERSION)
+    hit = eval_cache.load(key)
+    if hit is not None:
+        return hit, True
+    ctx = EvalContext.from_path(img_path)
+    if ctx is None:
+        return None, False
+    metrics = {k: float(v) for k, v in evaluate(ctx).items()}
+    eval_cache.store(key, metrics)
+    return metrics, False
 
 def main():
     if len(sys.argv) < 3:
@@ -70,8 +128,11 @@ def main():
     img_path = sys.argv[1]
     schema_path = sys.argv[2]
 
-    bgr = cv2.imread(img_path)
-    if bgr is None:
+    if not os.path.exists(img_path):
+        print(json.dumps({"ok": False, "error": f"Cannot read image: {img_path}"}))
+        sys.exit(1)
+    metrics, cached = evaluate_path(img_path, schema_path)
+    if metrics is None:
         print(json.dumps({"ok": False, "error": f"Cannot read image: {img_path}"}))
         sys.exit(1)
 
@@ -79,21 +140,11 @@ def main():
         schema = json.load(f)
     targets = schema["targets"]
 
-    braces_score, mouth_sharp = braces_clarity_score(bgr)
-    spec_ratio = specular_ratio(bgr)
-    heels_score = heels_visibility_mask(bgr)
-    sharp_all = global_sharpness(bgr)
-
     result = {
         "ok": True,
-        "metrics": {
-            "braces_clarity": round(braces_score, 4),
-            "braces_specular_ratio": round(spec_ratio, 5),
-            "heels_visibility": round(heels_score, 4),
-            "global_sharpness": round(sharp_all, 2),
-            "mouth_roi_sharpness": round(mouth_sharp, 2)
-        },
-        "targets": targets
+        "metrics": metrics,
+        "targets": targets,
+        "cached": cached
     }
     print(json.dumps(result, indent=2))
 